@@ -28,7 +28,6 @@ class BuildConfig:
             "icon": "assets/icon.ico" if self.platform == "windows" else "assets/icon.png",
             "hidden_imports": [
                 "selenium",
-                "webdriver_manager",
                 "tkinter",
                 "tkinter.ttk",
                 "tkinter.messagebox",
@@ -87,7 +86,6 @@ class BuildConfig:
         """获取依赖包列表"""
         return [
             "selenium>=4.15.0",
-            "webdriver-manager>=4.0.1",
             "pyinstaller>=5.0.0",
             "requests>=2.25.0"
         ]
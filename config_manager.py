@@ -41,8 +41,21 @@ class ConfigManager:
         return {
             "twitter": {
                 "username": "",  # 要监听的Twitter用户名（不带@）
+                "usernames": [],  # 额外监听的用户名列表，与username共用一个浏览器
+                "lists": [],  # 监听的Twitter列表（列表ID或链接），一次加载覆盖列表全部成员，新推文按作者通知（仅浏览器引擎）
+                "searches": [],  # 监听的搜索语句（按"最新"排序），例如 "keyword" 或 "from:a OR from:b"（仅浏览器引擎）
+                "search_combine_accounts": False,  # 把 username/usernames 合并为 from:a OR from:b 搜索，减少页面加载（结果含回复、不含转推）
+                "max_tabs": 4,  # 多账户监听时的标签页池大小
+                "state_db_path": "data/tweet_state.db",  # 已见推文记录数据库（留空则不持久化）
+                "engine": "browser",  # 监听引擎：browser（Chrome）或 http（直接请求时间线接口，不启动浏览器）
                 "auth_token": "",  # Twitter auth_token
-                "check_interval": 60  # 检查间隔（秒）
+                "check_interval": 60,  # 检查间隔（秒）
+                "adaptive_polling": {  # 自适应轮询：按账户的发推规律调整检查间隔
+                    "enabled": False,
+                    "min_interval": 30,  # 单个账户的最短检查间隔（秒）
+                    "max_interval": 600,  # 单个账户的最长检查间隔（秒）
+                    "requests_per_minute": 30  # 所有账户合计每分钟最多检查次数
+                }
             },
             "email": {
                 "provider": "163",  # 邮箱服务商：163, qq, gmail, outlook, yahoo, custom
@@ -50,18 +63,60 @@ class ConfigManager:
                 "smtp_port": 465,
                 "sender_email": "",  # 发件人邮箱地址
                 "sender_password": "",  # 邮箱密码或授权码
-                "receiver_email": "",  # 接收邮件的邮箱
+                "receiver_email": "",  # 接收邮件的邮箱（多个收件人用逗号分隔）
+                "account_recipients": {},  # 按账户指定收件人列表，例如 {"elonmusk": ["a@example.com", "b@example.com"]}，未指定的账户发给 receiver_email
+                "max_recipients_per_message": 50,  # 一次SMTP事务最多的收件人数，收件人更多时同一封邮件在同一连接上分批投递
                 "use_ssl": True,  # 是否使用SSL连接
-                "use_tls": False  # 是否使用TLS连接
+                "use_tls": False,  # 是否使用TLS连接
+                "persistent_connection": True,  # 复用已登录的SMTP连接，连续通知时省去每封邮件的握手和登录
+                "idle_timeout": 60,  # SMTP连接空闲多少秒后关闭
+                "digest": {  # 汇总模式：短时间内的多条新推文合并成一封邮件，避免被邮箱服务商限流
+                    "enabled": False,
+                    "window": 60,  # 第一条新推文之后最多等待多少秒再发送汇总邮件
+                    "max_tweets": 10,  # 一封汇总邮件最多包含的推文数，达到后立即发送
+                    "default_policy": "digest",  # 账户的默认策略：digest（汇总）或 immediate（立即发送）
+                    "account_policies": {}  # 单独指定某些账户的策略，例如 {"elonmusk": "immediate"}
+                }
             },
             "browser": {
                 "headless": False,  # 是否无头模式
-                "chrome_driver_path": ""  # ChromeDriver路径（留空则自动下载）
+                "chrome_driver_path": "",  # ChromeDriver路径（留空则自动下载）
+                "user_data_dir": "",  # Chrome用户数据目录，保存登录状态以加快重启（留空则每次使用临时配置）
+                "capture_mode": "dom",  # 推文获取方式：dom（解析页面）、network（读取时间线接口响应）或 live（页面内实时推送）
+                "live_refresh_interval": 300,  # live模式下整页刷新兜底的间隔（秒）
+                "block_resources": True,  # 屏蔽图片、视频、字体和统计请求，节省带宽和CPU
+                "blocked_urls": None,  # 自定义屏蔽的URL模式列表（null 使用内置列表）
+                "transfer_baseline_polls": 1,  # 开启屏蔽时前几次刷新不屏蔽，用于对比屏蔽前后的传输量（0 表示不测量）
+                "max_memory_mb": 400,  # Chrome进程树内存上限（MB），超过后自动重建浏览器（0 表示不限制）
+                "recycle_after_polls": 0,  # 每检查多少次重建一次浏览器（0 表示不定期重建）
+                "wait_timeouts": {  # 各等待阶段的超时时间（秒）
+                    "page_ready": 15,
+                    "login": 10,
+                    "tweets": 10,
+                    "network_idle": 2,
+                    "page_load": 30,
+                    "poll": 120  # 单次检查超过该时间视为浏览器卡死，由看门狗强制重建
+                }
             },
             "system": {
                 "language": "zh_CN",  # 界面语言：zh_CN 或 en_US
                 "auto_start": False,  # 是否开机自启动
-                "minimize_to_tray": True  # 是否最小化到系统托盘
+                "minimize_to_tray": True,  # 是否最小化到系统托盘
+                "worker_processes": 0,  # 服务器模式下把账户分片到多个工作进程（每个进程一个浏览器，0 或 1 表示单进程）
+                "executor_workers": 4,  # 服务器模式下健康检查等阻塞操作的线程数上限
+                "notification_workers": 1,  # 发送邮件通知的工作线程数
+                "notification_queue_size": 100,  # 待发送通知队列的容量，满时丢弃并记录（启用发件箱时暂存在发件箱中）
+                "notification_outbox_path": "data/outbox.db",  # 持久化发件箱：发送失败的通知重试，重启后继续发送（留空则不启用）
+                "notification_max_attempts": 8,  # 每条通知最多尝试发送的次数，超过后移入发件箱的死信表
+                "notification_retry_base_delay": 30,  # 第一次重试前的等待时间（秒），之后每次翻倍并加随机抖动
+                "notification_retry_max_delay": 3600,  # 重试等待时间的上限（秒）
+                "config_reload_interval": 30  # 服务器模式下检查配置文件修改的间隔（秒，0 表示不重新加载）
+            },
+            "cluster": {  # 多节点部署：多个容器通过共享卷上的租约表分配账户
+                "enabled": False,
+                "lease_db_path": "data/leases.db",  # 租约数据库（各节点共享，state_db_path 也应共享）
+                "node_id": "",  # 节点ID（留空则使用主机名和进程号）
+                "lease_ttl": 60  # 租约有效期（秒），节点失联超过该时间后其账户由其他节点接手
             }
         }
     
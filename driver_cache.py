@@ -0,0 +1,334 @@
+"""
+ChromeDriver本地缓存模块
+按Chrome主版本号缓存已下载的ChromeDriver，启动时不访问网络（本地没有任何ChromeDriver的冷启动除外），新版本在后台下载
+"""
+import os
+import json
+import time
+import shutil
+import zipfile
+import platform
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from typing import Optional, Dict, Any
+
+DEFAULT_CACHE_DIR = "drivers"
+INDEX_FILENAME = "index.json"
+
+# Chrome for Testing 的版本查询和下载地址
+LATEST_RELEASE_URL = "https://googlechromelabs.github.io/chrome-for-testing/LATEST_RELEASE_"
+DOWNLOAD_URL = "https://storage.googleapis.com/chrome-for-testing-public/{version}/{platform}/chromedriver-{platform}.zip"
+
+# 后台检查新版本的最短间隔（秒）
+REFRESH_INTERVAL = 24 * 3600
+
+# 冷启动（本地没有任何ChromeDriver）时同步下载的单次请求超时（秒）
+STARTUP_DOWNLOAD_TIMEOUT = 15
+
+_index_lock = threading.Lock()
+_refreshing = set()
+
+
+def get_chrome_version() -> Optional[str]:
+    """获取Chrome浏览器版本（只读取本地信息，不访问网络）"""
+    system = platform.system()
+
+    def version_from_binary(path: str) -> Optional[str]:
+        result = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10)
+        if result.returncode == 0:
+            # 格式: Google Chrome 120.0.6099.130
+            return result.stdout.strip().split()[-1]
+        return None
+
+    try:
+        if system == "Windows":
+            # Windows下通过注册表获取Chrome版本
+            try:
+                import winreg
+                key_path = r"SOFTWARE\Google\Chrome\BLBeacon"
+                key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path)
+                version, _ = winreg.QueryValueEx(key, "version")
+                winreg.CloseKey(key)
+                return version
+            except Exception:
+                # 尝试通过命令行获取
+                paths = [
+                    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+                    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+                    os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe")
+                ]
+                for path in paths:
+                    if os.path.exists(path):
+                        version = version_from_binary(path)
+                        if version:
+                            return version
+
+        elif system == "Darwin":  # macOS
+            return version_from_binary("/Applications/Google Chrome.app/Contents/MacOS/Google Chrome")
+
+        elif system == "Linux":
+            for binary in ("google-chrome", "google-chrome-stable", "chromium", "chromium-browser"):
+                if shutil.which(binary):
+                    version = version_from_binary(binary)
+                    if version:
+                        return version
+
+    except Exception as e:
+        print(f"获取Chrome版本失败: {e}")
+
+    return None
+
+
+def major_version(version: str) -> str:
+    """取版本号中的主版本号"""
+    return version.split('.')[0]
+
+
+def _driver_platform() -> Optional[str]:
+    """Chrome for Testing 的平台名称；没有对应的构建（例如 Linux aarch64）时返回 None"""
+    system = platform.system()
+    machine = platform.machine().lower()
+    if system == "Windows":
+        return "win64" if machine.endswith('64') else "win32"
+    if system == "Darwin":
+        return "mac-arm64" if machine in ('arm64', 'aarch64') else "mac-x64"
+    if system == "Linux" and machine in ('x86_64', 'amd64'):
+        return "linux64"
+    return None
+
+
+def _driver_filename() -> str:
+    return "chromedriver.exe" if platform.system() == "Windows" else "chromedriver"
+
+
+def load_index(cache_dir: str = DEFAULT_CACHE_DIR) -> Dict[str, Dict[str, Any]]:
+    """读取版本索引：Chrome主版本号 -> {driver_version, path, checked_at}"""
+    index_path = os.path.join(cache_dir, INDEX_FILENAME)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        return index if isinstance(index, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_index(cache_dir: str, major: str, **fields):
+    """更新版本索引中的一项（先写临时文件再替换，避免写到一半被读取）"""
+    with _index_lock:
+        index = load_index(cache_dir)
+        index[major] = dict(index.get(major, {}), **fields)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(cache_dir, INDEX_FILENAME))
+
+
+def register_driver(cache_dir: str, major: str, driver_version: str, path: str):
+    """在版本索引中登记一个ChromeDriver"""
+    _update_index(cache_dir, major, driver_version=driver_version,
+                  path=os.path.relpath(path, cache_dir), checked_at=time.time())
+
+
+def find_cached_driver(chrome_version: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Optional[str]:
+    """
+    在本地缓存中查找与Chrome主版本号匹配的ChromeDriver
+
+    Args:
+        chrome_version: Chrome浏览器版本
+        cache_dir: 缓存目录
+
+    Returns:
+        ChromeDriver的绝对路径，没有缓存时返回 None
+    """
+    entry = load_index(cache_dir).get(major_version(chrome_version))
+    if not entry or not entry.get('path'):
+        return None
+    path = os.path.abspath(os.path.join(cache_dir, entry['path']))
+    return path if os.path.isfile(path) else None
+
+
+def find_any_cached_driver(cache_dir: str = DEFAULT_CACHE_DIR) -> Optional[str]:
+    """检测不到Chrome版本时，使用缓存中主版本号最高的ChromeDriver"""
+    index = load_index(cache_dir)
+    for major in sorted(index, key=lambda m: int(m) if m.isdigit() else -1, reverse=True):
+        relative_path = index[major].get('path')
+        if relative_path:
+            path = os.path.abspath(os.path.join(cache_dir, relative_path))
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def fetch_latest_driver_version(major: str, timeout: float = 10) -> Optional[str]:
+    """查询某个Chrome主版本对应的最新ChromeDriver版本（需要网络）"""
+    try:
+        with urllib.request.urlopen(f"{LATEST_RELEASE_URL}{major}", timeout=timeout) as response:
+            return response.read().decode('utf-8').strip()
+    except Exception as e:
+        print(f"无法获取ChromeDriver版本信息: {e}")
+        return None
+
+
+def download_driver(chrome_version: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                    timeout: float = 60) -> Optional[str]:
+    """
+    下载与Chrome版本匹配的ChromeDriver并登记到版本索引
+
+    每个ChromeDriver版本解压到单独的子目录，不影响正在使用的旧版本。
+
+    Args:
+        chrome_version: Chrome浏览器版本
+        cache_dir: 缓存目录
+        timeout: 单次网络请求的超时时间（秒）
+
+    Returns:
+        ChromeDriver的绝对路径，失败时返回 None
+    """
+    major = major_version(chrome_version)
+    if int(major) < 115:
+        # 旧版本不在 Chrome for Testing 中发布
+        print("Chrome版本较旧，请手动下载ChromeDriver")
+        return None
+
+    driver_version = fetch_latest_driver_version(major, timeout)
+    if not driver_version:
+        return None
+    print(f"找到ChromeDriver版本: {driver_version}")
+
+    driver_platform = _driver_platform()
+    if not driver_platform:
+        print(f"Chrome for Testing 没有 {platform.system()} {platform.machine()} 平台的ChromeDriver，请手动安装")
+        return None
+    download_url = DOWNLOAD_URL.format(version=driver_version, platform=driver_platform)
+    print(f"正在下载ChromeDriver: {download_url}")
+
+    version_dir = os.path.join(cache_dir, driver_version)
+    final_path = os.path.join(version_dir, _driver_filename())
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=cache_dir) as tmp_dir:
+            zip_path = os.path.join(tmp_dir, "chromedriver.zip")
+            with urllib.request.urlopen(download_url, timeout=timeout) as response, open(zip_path, 'wb') as f:
+                shutil.copyfileobj(response, f)
+
+            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+                zip_ref.extractall(tmp_dir)
+
+            for root, dirs, files in os.walk(tmp_dir):
+                if _driver_filename() in files:
+                    os.makedirs(version_dir, exist_ok=True)
+                    shutil.move(os.path.join(root, _driver_filename()), final_path)
+                    break
+            else:
+                print("❌ 未找到chromedriver文件")
+                return None
+
+        # 设置执行权限（Linux/Mac）
+        if platform.system() != "Windows":
+            os.chmod(final_path, 0o755)
+
+        register_driver(cache_dir, major, driver_version, final_path)
+        print(f"✅ ChromeDriver已缓存: {os.path.abspath(final_path)}")
+        return os.path.abspath(final_path)
+
+    except Exception as e:
+        print(f"❌ 下载失败: {e}")
+        return None
+
+
+def refresh_in_background(chrome_version: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                          min_interval: float = REFRESH_INTERVAL) -> Optional[threading.Thread]:
+    """
+    在后台线程中检查并下载更新的ChromeDriver，下次启动时生效
+
+    距上次检查不足 min_interval 秒时不检查；同一主版本同时只有一个后台线程。
+
+    Returns:
+        启动的线程，无需检查时返回 None
+    """
+    major = major_version(chrome_version)
+    entry = load_index(cache_dir).get(major, {})
+    if time.time() - entry.get('checked_at', 0) < min_interval:
+        return None
+
+    with _index_lock:
+        if (cache_dir, major) in _refreshing:
+            return None
+        _refreshing.add((cache_dir, major))
+
+    def refresh():
+        try:
+            latest = fetch_latest_driver_version(major)
+            if not latest:
+                return
+            if latest == entry.get('driver_version') and find_cached_driver(chrome_version, cache_dir):
+                _update_index(cache_dir, major, checked_at=time.time())
+                return
+            print(f"🔄 后台更新ChromeDriver: {entry.get('driver_version')} -> {latest}")
+            download_driver(chrome_version, cache_dir)
+        finally:
+            with _index_lock:
+                _refreshing.discard((cache_dir, major))
+
+    thread = threading.Thread(target=refresh, daemon=True)
+    thread.start()
+    return thread
+
+
+def resolve_driver_path(cache_dir: str = DEFAULT_CACHE_DIR, background_refresh: bool = True,
+                        download_timeout: float = STARTUP_DOWNLOAD_TIMEOUT) -> Optional[str]:
+    """
+    启动时解析ChromeDriver路径
+
+    依次尝试：与本机Chrome主版本匹配的缓存、PATH 中的 chromedriver、（检测不到Chrome版本时）缓存中的任意版本，
+    找到时立即返回，新版本检查放到后台。
+    只有冷启动（本地没有任何ChromeDriver）时才同步下载，每次网络请求最多等待 download_timeout 秒。
+    Chrome for Testing 没有本机平台的构建时（例如 Linux aarch64）只使用 PATH 中的驱动，不读写缓存。
+
+    Args:
+        cache_dir: 缓存目录
+        background_refresh: 是否在后台检查新版本
+        download_timeout: 冷启动下载时单次网络请求的超时时间（秒）
+
+    Returns:
+        ChromeDriver的绝对路径，无法解析时返回 None
+    """
+    if not _driver_platform():
+        path_driver = shutil.which(_driver_filename())
+        if path_driver:
+            print(f"✅ 使用PATH中的ChromeDriver: {path_driver}")
+        else:
+            print(f"⚠️ Chrome for Testing 没有 {platform.system()} {platform.machine()} 平台的ChromeDriver，"
+                  f"请通过系统包管理器安装 chromedriver")
+        return path_driver
+
+    chrome_version = get_chrome_version()
+    if chrome_version:
+        cached_path = find_cached_driver(chrome_version, cache_dir)
+        if cached_path:
+            print(f"✅ 使用缓存的ChromeDriver: {cached_path}")
+            if background_refresh:
+                refresh_in_background(chrome_version, cache_dir)
+            return cached_path
+
+    path_driver = shutil.which(_driver_filename())
+    if path_driver:
+        print(f"✅ 使用PATH中的ChromeDriver: {path_driver}")
+        # 在后台缓存与Chrome匹配的版本，下次启动优先使用
+        if chrome_version and background_refresh:
+            refresh_in_background(chrome_version, cache_dir)
+        return path_driver
+
+    if not chrome_version:
+        cached_path = find_any_cached_driver(cache_dir)
+        if cached_path:
+            print(f"⚠️ 未检测到Chrome版本，使用缓存的ChromeDriver: {cached_path}")
+            return cached_path
+        print("⚠️ 未检测到Chrome版本，本地也没有ChromeDriver")
+        return None
+
+    print(f"📥 本地没有任何ChromeDriver，下载与Chrome {major_version(chrome_version)} 匹配的版本...")
+    return download_driver(chrome_version, cache_dir, timeout=download_timeout)
@@ -2,18 +2,42 @@
 邮件发送模块
 使用163邮箱SMTP服务器发送邮件
 """
+import re
 import smtplib
+import time
 import uuid
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+def parse_recipients(receivers: Union[str, List[str], None]) -> List[str]:
+    """
+    解析收件人：支持逗号、分号或空白分隔的字符串，也支持列表；去掉空项和重复项，保持原有顺序
+    
+    Args:
+        receivers: 收件人字符串或列表
+    
+    Returns:
+        收件人邮箱列表
+    """
+    if not receivers:
+        return []
+    if isinstance(receivers, str):
+        receivers = [receivers]
+    addresses = []
+    for receiver in receivers:
+        addresses.extend(re.split(r'[,;\s]+', receiver))
+    return list(dict.fromkeys(address for address in addresses if address))
 
 
 class EmailSender:
     def __init__(self, smtp_server: str, smtp_port: int, sender_email: str, sender_password: str, 
-                 use_ssl: bool = True, use_tls: bool = False):
+                 use_ssl: bool = True, use_tls: bool = False, persistent: bool = False,
+                 idle_timeout: float = 60, timeout: float = 30, max_recipients: int = 50):
         """
         初始化邮件发送器
         
@@ -24,6 +48,10 @@ class EmailSender:
             sender_password: 发送者邮箱密码或授权码
             use_ssl: 是否使用SSL连接
             use_tls: 是否使用TLS连接
+            persistent: 是否复用已登录的连接（连续发送时省去每封邮件的TLS握手和登录）
+            idle_timeout: 持久连接空闲多少秒后关闭
+            timeout: 网络操作超时时间（秒）
+            max_recipients: 一次SMTP事务最多的收件人数，收件人更多时同一封邮件分批投递
         """
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
@@ -31,41 +59,206 @@ class EmailSender:
         self.sender_password = sender_password
         self.use_ssl = use_ssl
         self.use_tls = use_tls
+        self.persistent = persistent
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.max_recipients = max(1, max_recipients)
+        
+        # 持久连接及其最近使用时间；多个通知线程共用时串行发送
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self._idle_timer: Optional[threading.Timer] = None
+        
+        # 统计：建立连接（握手+登录）次数、发送次数、最近一封邮件的发送耗时（秒）
+        self.connect_count = 0
+        self.send_count = 0
+        self.last_send_seconds: Optional[float] = None
+        # 最近一次发送失败的原因（用于发件箱记录重试原因）
+        self.last_error: Optional[str] = None
     
-    def send_notification(self, receiver_email: str, twitter_username: str, 
-                         tweet_content: str, tweet_url: Optional[str] = None) -> bool:
+    def _connect(self) -> smtplib.SMTP:
+        """建立连接并登录"""
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        self.connect_count += 1
+        return server
+    
+    def _is_alive(self, server: smtplib.SMTP) -> bool:
+        """用 NOOP 探测连接是否仍然可用"""
+        try:
+            return server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def _get_connection(self) -> smtplib.SMTP:
+        """取得可用的持久连接：空闲过久或 NOOP 探测失败时重新连接"""
+        if self._server is not None:
+            idle = time.time() - self._last_used
+            if idle > self.idle_timeout or not self._is_alive(self._server):
+                self._close_connection()
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+    
+    def _close_connection(self):
+        """关闭持久连接（服务器已断开时忽略错误）"""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+    
+    def _schedule_idle_close(self):
+        """空闲 idle_timeout 秒后关闭持久连接，避免占用服务器连接数"""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(self.idle_timeout, self._close_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+    
+    def _close_if_idle(self):
+        with self._lock:
+            if self._server is not None and time.time() - self._last_used >= self.idle_timeout:
+                self._close_connection()
+    
+    def _recipients(self, message, receiver_email: Union[str, List[str]]) -> List[str]:
+        """解析收件人并设置 To 头：只有一位收件人时显示其地址，多位时不互相公开"""
+        recipients = parse_recipients(receiver_email)
+        if not recipients:
+            raise ValueError("没有收件人")
+        message['To'] = recipients[0] if len(recipients) == 1 else 'undisclosed-recipients:;'
+        return recipients
+    
+    @staticmethod
+    def _describe(recipients: List[str]) -> str:
+        """日志中的收件人（人数多时只显示数量）"""
+        return ', '.join(recipients) if len(recipients) <= 3 else f"{recipients[0]} 等 {len(recipients)} 位收件人"
+    
+    def _deliver(self, message, recipients: Optional[List[str]] = None) -> Dict[str, tuple]:
         """
-        发送Twitter新帖子通知邮件
+        发送一封邮件
+        
+        非持久模式每封邮件单独连接；持久模式复用连接，服务器已断开时重新连接并重发一次。
+        指定收件人时邮件只生成一次，按 max_recipients 分批在同一个连接上投递（收件人只出现在信封中，相当于密送）。
+        
+        Returns:
+            被服务器拒绝的收件人及原因（部分拒绝时其余收件人仍会收到）
+        """
+        start = time.time()
+        refused: Dict[str, tuple] = {}
+        if recipients:
+            # 与 send_message 相同，按SMTP要求使用CRLF换行
+            data = message.as_bytes(policy=message.policy.clone(linesep='\r\n'))
+            batches = [recipients[index:index + self.max_recipients]
+                       for index in range(0, len(recipients), self.max_recipients)]
+        else:
+            data = None
+            batches = [None]
+        
+        def send(server, batch):
+            if batch is None:
+                refused.update(server.send_message(message))
+            else:
+                try:
+                    refused.update(server.sendmail(self.sender_email, batch, data))
+                except smtplib.SMTPRecipientsRefused as e:
+                    # 这一批全部被拒绝，继续投递其余批次
+                    refused.update(e.recipients)
+        
+        if not self.persistent:
+            with self._connect() as server:
+                for batch in batches:
+                    send(server, batch)
+        else:
+            with self._lock:
+                try:
+                    # 只在第一批之前探测连接，之后的批次直接使用
+                    server = self._get_connection()
+                    for batch in batches:
+                        try:
+                            send(server, batch)
+                        except smtplib.SMTPServerDisconnected:
+                            # 只重发断开时正在投递的一批，已投递的收件人不会重复收到
+                            print("🔄 SMTP连接已断开，重新连接...")
+                            self._close_connection()
+                            server = self._get_connection()
+                            send(server, batch)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused):
+                    # smtplib 已发送 RSET，连接仍可继续使用
+                    raise
+                except Exception:
+                    # 超时等错误后连接状态未知，下次重新连接
+                    self._close_connection()
+                    raise
+                finally:
+                    self._last_used = time.time()
+            self._schedule_idle_close()
+        self.send_count += 1
+        self.last_send_seconds = time.time() - start
+        if recipients and len(refused) >= len(recipients):
+            raise smtplib.SMTPRecipientsRefused(refused)
+        if refused:
+            print(f"⚠️ 以下收件人被服务器拒绝：{', '.join(refused)}")
+        return refused
+    
+    def close(self):
+        """关闭持久连接"""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+        with self._lock:
+            self._close_connection()
+    
+    def _build_message(self, receiver_email: Union[str, List[str]], subject: str, message=None):
+        """
+        填写邮件头（发件人、收件人、主题、回复地址、日期和Message-ID）
         
         Args:
-            receiver_email: 接收者邮箱
-            twitter_username: Twitter用户名
-            tweet_content: 推文内容
-            tweet_url: 推文链接（可选）
+            receiver_email: 接收者邮箱（多位收件人可以用列表或逗号分隔）
+            subject: 邮件主题
+            message: 邮件对象（可选），默认创建 MIMEMultipart
         
         Returns:
-            是否发送成功
+            (邮件对象, 收件人列表)
         """
-        try:
-            # 创建邮件对象
+        if message is None:
             message = MIMEMultipart()
-            
-            # 设置邮件头 - 严格按照RFC标准格式
-            # From字段必须使用有效的邮箱地址格式
-            message['From'] = self.sender_email
-            message['To'] = receiver_email
-            message['Subject'] = f"🔔 @{twitter_username} 发布了新推文"
-            
-            # 添加额外的邮件头信息
-            message['Reply-To'] = self.sender_email
-            message['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
-            # 生成唯一的Message-ID，避免特殊字符
-            message['Message-ID'] = f"<{uuid.uuid4().hex}@{self.smtp_server.split('.')[0]}.com>"
-            
-            # 构建邮件正文
-            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            html_content = f"""
+        
+        # 设置邮件头 - 严格按照RFC标准格式
+        # From字段必须使用有效的邮箱地址格式
+        message['From'] = self.sender_email
+        recipients = self._recipients(message, receiver_email)
+        message['Subject'] = subject
+        
+        # 添加额外的邮件头信息
+        message['Reply-To'] = self.sender_email
+        message['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
+        # 生成唯一的Message-ID，避免特殊字符
+        message['Message-ID'] = f"<{uuid.uuid4().hex}@{self.smtp_server.split('.')[0]}.com>"
+        return message, recipients
+    
+    @staticmethod
+    def _render_html(title: str, body_html: str) -> str:
+        """
+        生成HTML邮件正文（通知和汇总邮件共用同一套样式）
+        
+        Args:
+            title: 顶部标题
+            body_html: 正文区域的HTML
+        """
+        return f"""
             <html>
             <head>
                 <style>
@@ -74,8 +267,9 @@ class EmailSender:
                     .header {{ background-color: #1DA1F2; color: white; padding: 15px; border-radius: 10px 10px 0 0; }}
                     .content {{ background-color: #f5f8fa; padding: 20px; border: 1px solid #e1e8ed; border-radius: 0 0 10px 10px; }}
                     .tweet-box {{ background-color: white; padding: 15px; border-radius: 10px; margin: 15px 0; border: 1px solid #e1e8ed; }}
-                    .username {{ font-weight: bold; color: #1DA1F2; font-size: 18px; }}
-                    .tweet-content {{ margin-top: 10px; line-height: 1.6; color: #14171a; }}
+                    .username {{ font-weight: bold; color: #1DA1F2; font-size: 18px; margin-bottom: 10px; }}
+                    .account {{ margin-top: 20px; }}
+                    .tweet-content {{ line-height: 1.6; color: #14171a; }}
                     .time {{ color: #657786; font-size: 12px; margin-top: 10px; }}
                     .link {{ margin-top: 15px; }}
                     .link a {{ background-color: #1DA1F2; color: white; padding: 10px 20px; text-decoration: none; border-radius: 20px; display: inline-block; }}
@@ -84,21 +278,46 @@ class EmailSender:
             <body>
                 <div class="container">
                     <div class="header">
-                        <h2>🐦 Twitter 新推文通知</h2>
+                        <h2>{title}</h2>
+                    </div>
+                    <div class="content">{body_html}
                     </div>
-                    <div class="content">
+                </div>
+            </body>
+            </html>
+            """
+    
+    def send_notification(self, receiver_email: Union[str, List[str]], twitter_username: str, 
+                         tweet_content: str, tweet_url: Optional[str] = None) -> bool:
+        """
+        发送Twitter新帖子通知邮件
+        
+        多位收件人共用同一封邮件和同一个SMTP连接，按 max_recipients 分批投递。
+        
+        Args:
+            receiver_email: 接收者邮箱（多位收件人可以用列表或逗号分隔）
+            twitter_username: Twitter用户名
+            tweet_content: 推文内容
+            tweet_url: 推文链接（可选）
+        
+        Returns:
+            是否发送成功
+        """
+        try:
+            # 创建邮件对象
+            message, recipients = self._build_message(receiver_email, f"🔔 @{twitter_username} 发布了新推文")
+            
+            # 构建邮件正文
+            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            html_content = self._render_html("🐦 Twitter 新推文通知", f"""
                         <p>您关注的用户发布了新推文：</p>
                         <div class="tweet-box">
                             <div class="username">@{twitter_username}</div>
                             <div class="tweet-content">{tweet_content}</div>
                             <div class="time">检测时间：{current_time}</div>
                             {"<div class='link'><a href='" + tweet_url + "'>查看原推文</a></div>" if tweet_url else ""}
-                        </div>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
+                        </div>""")
             
             # 同时添加纯文本版本
             text_content = f"""
@@ -117,27 +336,89 @@ Twitter 新推文通知
             message.attach(MIMEText(html_content, 'html', 'utf-8'))
             
             # 发送邮件
-            if self.use_ssl:
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                    if self.use_tls:
-                        server.starttls()
-                    server.login(self.sender_email, self.sender_password)
-                    server.send_message(message)
-            else:
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    if self.use_tls:
-                        server.starttls()
-                    server.login(self.sender_email, self.sender_password)
-                    server.send_message(message)
+            self._deliver(message, recipients)
             
-            print(f"✅ 邮件发送成功！接收者：{receiver_email}")
+            print(f"✅ 邮件发送成功！接收者：{self._describe(recipients)}")
+            self.last_error = None
             return True
             
         except Exception as e:
             print(f"❌ 邮件发送失败：{str(e)}")
+            self.last_error = str(e) or e.__class__.__name__
             return False
     
-    def test_connection(self, receiver_email: str) -> bool:
+    def send_digest(self, receiver_email: Union[str, List[str]], tweets: List[Tuple[str, Dict[str, Any]]]) -> bool:
+        """
+        把多条新推文合并成一封汇总邮件发送（一次SMTP事务）
+        
+        Args:
+            receiver_email: 接收者邮箱（多位收件人可以用列表或逗号分隔）
+            tweets: (Twitter用户名, 推文) 列表，推文包含 text 和可选的 url；同一账户的推文按顺序排在一起
+        
+        Returns:
+            是否发送成功
+        """
+        try:
+            # 按账户分组，保持各账户第一次出现的顺序
+            grouped: Dict[str, List[Dict[str, Any]]] = {}
+            for twitter_username, tweet in tweets:
+                grouped.setdefault(twitter_username, []).append(tweet)
+            accounts = '、'.join(f"@{username}" for username in grouped)
+            
+            message, recipients = self._build_message(
+                receiver_email, f"🔔 {accounts} 发布了 {len(tweets)} 条新推文"
+            )
+            
+            current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            html_sections = []
+            text_sections = []
+            for twitter_username, account_tweets in grouped.items():
+                tweet_boxes = "".join(
+                    f"""
+                        <div class="tweet-box">
+                            <div class="tweet-content">{tweet['text']}</div>
+                            {"<div class='link'><a href='" + tweet['url'] + "'>查看原推文</a></div>" if tweet.get('url') else ""}
+                        </div>"""
+                    for tweet in account_tweets
+                )
+                html_sections.append(f"""
+                        <div class="username account">@{twitter_username}（{len(account_tweets)} 条）</div>{tweet_boxes}""")
+                text_sections.append(f"@{twitter_username}（{len(account_tweets)} 条）：\n\n" + "\n\n".join(
+                    tweet['text'] + (f"\n推文链接：{tweet['url']}" if tweet.get('url') else "")
+                    for tweet in account_tweets
+                ))
+            
+            html_content = self._render_html("🐦 Twitter 新推文汇总", f"""
+                        <p>您关注的用户发布了 {len(tweets)} 条新推文：</p>{"".join(html_sections)}
+                        <div class="time">检测时间：{current_time}</div>""")
+            
+            separator = "\n\n" + "-" * 40 + "\n\n"
+            text_content = f"""
+Twitter 新推文汇总
+
+{accounts} 发布了 {len(tweets)} 条新推文：
+
+{separator.join(text_sections)}
+
+检测时间：{current_time}
+            """
+            
+            message.attach(MIMEText(text_content, 'plain', 'utf-8'))
+            message.attach(MIMEText(html_content, 'html', 'utf-8'))
+            
+            self._deliver(message, recipients)
+            
+            print(f"✅ 汇总邮件发送成功（{len(tweets)} 条推文）！接收者：{self._describe(recipients)}")
+            self.last_error = None
+            return True
+            
+        except Exception as e:
+            print(f"❌ 汇总邮件发送失败：{str(e)}")
+            self.last_error = str(e) or e.__class__.__name__
+            return False
+    
+    def test_connection(self, receiver_email: Union[str, List[str]]) -> bool:
         """
         测试邮件连接和发送
         
@@ -150,33 +431,12 @@ Twitter 新推文通知
         try:
             # 创建测试邮件
             message = MIMEText('这是一封测试邮件，用于验证邮箱配置是否正确。\n如果您收到这封邮件，说明配置成功！', 'plain', 'utf-8')
-            
-            # 设置邮件头 - 严格按照RFC标准格式
-            message['From'] = self.sender_email
-            message['To'] = receiver_email
-            message['Subject'] = 'Twitter监控器 - 邮箱配置测试'
-            
-            # 添加额外的邮件头信息
-            message['Reply-To'] = self.sender_email
-            message['Date'] = datetime.now().strftime('%a, %d %b %Y %H:%M:%S %z')
-            # 生成唯一的Message-ID，避免特殊字符
-            message['Message-ID'] = f"<{uuid.uuid4().hex}@{self.smtp_server.split('.')[0]}.com>"
+            message, recipients = self._build_message(receiver_email, 'Twitter监控器 - 邮箱配置测试', message)
             
             # 发送邮件
-            if self.use_ssl:
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                    if self.use_tls:
-                        server.starttls()
-                    server.login(self.sender_email, self.sender_password)
-                    server.send_message(message)
-            else:
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    if self.use_tls:
-                        server.starttls()
-                    server.login(self.sender_email, self.sender_password)
-                    server.send_message(message)
+            self._deliver(message, recipients)
             
-            print(f"✅ 测试邮件发送成功！请检查 {receiver_email} 邮箱")
+            print(f"✅ 测试邮件发送成功！请检查 {self._describe(recipients)} 邮箱")
             return True
             
         except Exception as e:
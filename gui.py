@@ -4,12 +4,19 @@ GUI界面模块
 """
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import functools
 import threading
 import time
 from datetime import datetime
 from config_manager import ConfigManager
 from twitter_monitor import TwitterMonitor
+from http_monitor import HttpTwitterMonitor
+from tweet_store import TweetStore
+from poll_scheduler import PollScheduler
+from monitor_core import MonitorCore
 from email_sender import EmailSender
+from notification_queue import NotificationQueue, uses_digest
+from outbox import NotificationOutbox
 
 
 class TwitterMonitorGUI:
@@ -37,6 +44,11 @@ class TwitterMonitorGUI:
         
         # 监控器实例
         self.monitor = None
+        self.core = None
+        # 新推文通知队列：监听回调只入队，邮件由工作线程发送
+        self.notifications = None
+        # 通知邮件发送器（复用SMTP连接），开始监控时按界面上的邮箱设置创建
+        self.email_sender = None
         self.monitor_thread = None
         self.is_monitoring = False
         
@@ -645,7 +657,10 @@ Twitter Monitor v1.0
         self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
     
     def log(self, message: str):
-        """添加日志"""
+        """添加日志（可以从任意线程调用，非Tk线程时转到Tk线程中执行）"""
+        if threading.current_thread() is not threading.main_thread():
+            self.root.after(0, self.log, message)
+            return
         timestamp = datetime.now().strftime("%H:%M:%S")
         self.log_text.insert(tk.END, f"[{timestamp}] {message}\n")
         self.log_text.see(tk.END)
@@ -789,25 +804,18 @@ Twitter Monitor v1.0
         threading.Thread(target=test, daemon=True).start()
     
     def on_new_tweet(self, username: str, tweet: dict):
-        """新推文回调函数"""
+        """新推文回调函数：只放入通知队列，不等待邮件发送"""
         self.log(f"🆕 发现新推文: {tweet['text'][:100]}...")
         
-        # 发送邮件通知
-        smtp_server = self.smtp_server_entry.get().strip()
-        smtp_port = int(self.smtp_port_entry.get().strip())
-        sender_email = self.sender_email_entry.get().strip()
-        sender_password = self.email_password_entry.get().strip()
-        receiver_email = self.receiver_email_entry.get().strip()
-        
-        email_sender = EmailSender(
-            smtp_server,
-            smtp_port,
-            sender_email,
-            sender_password,
-            self.use_ssl_var.get(),
-            self.use_tls_var.get()
-        )
+        if self.notifications:
+            self.notifications.put(username, tweet)
+    
+    def send_notification(self, email_sender: EmailSender, receiver_email: str, username: str, tweet: dict) -> bool:
+        """
+        发送新推文的邮件通知（在通知队列的工作线程中执行），失败时抛出 RuntimeError
         
+        发送器和收件人在开始监控时确定，工作线程不读取界面控件。
+        """
         if email_sender.send_notification(
             receiver_email,
             username,
@@ -815,8 +823,18 @@ Twitter Monitor v1.0
             tweet.get('url')
         ):
             self.log("✅ 邮件通知已发送")
-        else:
-            self.log("❌ 邮件发送失败")
+            return True
+        self.log("❌ 邮件发送失败")
+        # 抛出失败原因，由通知队列记录到发件箱并安排重试
+        raise RuntimeError(email_sender.last_error or "邮件发送失败")
+    
+    def send_digest(self, email_sender: EmailSender, receiver_email: str, tweets: list) -> bool:
+        """把多条新推文合并成一封汇总邮件发送（在通知队列的工作线程中执行），失败时抛出 RuntimeError"""
+        if email_sender.send_digest(receiver_email, tweets):
+            self.log(f"✅ 汇总邮件通知已发送（{len(tweets)} 条推文）")
+            return True
+        self.log("❌ 汇总邮件发送失败")
+        raise RuntimeError(email_sender.last_error or "汇总邮件发送失败")
     
     def start_monitoring(self):
         """开始监控"""
@@ -884,16 +902,81 @@ Twitter Monitor v1.0
         if not chrome_driver_path:
             chrome_driver_path = None
         
-        # 创建监控器
-        self.monitor = TwitterMonitor(auth_token, headless, chrome_driver_path)
+        # 已见推文持久化存储
+        state_db_path = self.config_manager.config['twitter'].get('state_db_path', 'data/tweet_state.db')
+        tweet_store = TweetStore(state_db_path) if state_db_path else None
+        
+        # 创建监控器：browser 使用Chrome，http 直接请求时间线接口
+        if self.config_manager.config['twitter'].get('engine', 'browser') == 'http':
+            self.monitor = HttpTwitterMonitor(auth_token, tweet_store=tweet_store)
+        else:
+            self.monitor = TwitterMonitor(
+                auth_token, headless, chrome_driver_path,
+                tweet_store=tweet_store,
+                capture_mode=self.config_manager.config['browser'].get('capture_mode', 'dom'),
+                wait_timeouts=self.config_manager.config['browser'].get('wait_timeouts'),
+                live_refresh_interval=self.config_manager.config['browser'].get('live_refresh_interval', 300),
+                block_resources=self.config_manager.config['browser'].get('block_resources', True),
+                blocked_urls=self.config_manager.config['browser'].get('blocked_urls'),
+                user_data_dir=self.config_manager.config['browser'].get('user_data_dir') or None,
+                max_memory_mb=self.config_manager.config['browser'].get('max_memory_mb', 400),
+                recycle_after_polls=self.config_manager.config['browser'].get('recycle_after_polls', 0),
+                transfer_baseline_polls=self.config_manager.config['browser'].get('transfer_baseline_polls', 1)
+            )
+        
+        # 自适应轮询：按账户的发推规律调整检查间隔
+        adaptive_config = self.config_manager.config['twitter'].get('adaptive_polling', {})
+        scheduler = None
+        if adaptive_config.get('enabled', False):
+            scheduler = PollScheduler(
+                min_interval=adaptive_config.get('min_interval', 30),
+                max_interval=adaptive_config.get('max_interval', 600),
+                default_interval=check_interval,
+                requests_per_minute=adaptive_config.get('requests_per_minute', 30)
+            )
+        
+        system_config = self.config_manager.config.get('system', {})
+        # 发送失败的通知按退避时间重试，上次运行未发送完的通知在启动后继续发送
+        outbox_path = system_config.get('notification_outbox_path', 'data/outbox.db')
+        outbox = NotificationOutbox(
+            outbox_path,
+            max_attempts=system_config.get('notification_max_attempts', 8),
+            base_delay=system_config.get('notification_retry_base_delay', 30),
+            max_delay=system_config.get('notification_retry_max_delay', 3600)
+        ) if outbox_path else None
+        # 邮箱设置在Tk线程中读取一次：Tk不是线程安全的，通知工作线程不访问界面控件
+        email_config = self.config_manager.config['email']
+        self.email_sender = EmailSender(
+            smtp_server, smtp_port, sender_email, sender_password,
+            self.use_ssl_var.get(), self.use_tls_var.get(),
+            persistent=email_config.get('persistent_connection', True),
+            idle_timeout=email_config.get('idle_timeout', 60),
+            max_recipients=email_config.get('max_recipients_per_message', 50)
+        )
+        # 汇总模式：短时间内的多条新推文合并成一封邮件
+        digest_config = email_config.get('digest', {})
+        self.notifications = NotificationQueue(
+            functools.partial(self.send_notification, self.email_sender, receiver_email),
+            workers=system_config.get('notification_workers', 1),
+            maxsize=system_config.get('notification_queue_size', 100),
+            outbox=outbox,
+            send_digest_func=functools.partial(self.send_digest, self.email_sender, receiver_email),
+            digest_window=digest_config.get('window', 60),
+            digest_max=digest_config.get('max_tweets', 10),
+            digest_policy=lambda name: uses_digest(digest_config, name)
+        )
+        self.notifications.start()
+        
+        # 在新线程中运行异步监控核心（Tk主循环占用主线程）
+        self.core = MonitorCore(self.monitor)
         
-        # 在新线程中启动监控
         def monitor_thread():
             try:
-                self.monitor.start_monitoring(
-                    username,
+                self.core.start(
+                    [username],
                     check_interval,
-                    self.on_new_tweet
+                    self.on_new_tweet,
+                    scheduler=scheduler
                 )
             except Exception as e:
                 self.log(f"❌ 监控出错: {str(e)}")
@@ -905,10 +988,26 @@ Twitter Monitor v1.0
     
     def stop_monitoring(self):
         """停止监控"""
+        if self.core:
+            self.core.stop()
         if self.monitor:
             self.log("⏹️ 正在停止监控...")
             self.monitor.monitoring = False
             self.monitor.stop_monitoring()
+        if self.notifications:
+            # 在后台发送完剩余的通知并关闭SMTP连接，不阻塞界面
+            notifications, email_sender = self.notifications, self.email_sender
+            
+            def drain():
+                notifications.stop()
+                if notifications.outbox:
+                    notifications.outbox.close()
+                if email_sender:
+                    email_sender.close()
+            
+            threading.Thread(target=drain, daemon=True).start()
+        # 下次开始监控时按当时的邮箱设置重新创建发送器
+        self.email_sender = None
         
         self.on_monitoring_stopped()
     
@@ -0,0 +1,383 @@
+"""
+HTTP监听模块
+不启动浏览器，直接用auth_token调用时间线接口检测新推文
+"""
+import json
+import time
+import secrets
+from typing import Optional, List, Dict, Any
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from tweet_parser import parse_timeline_response, is_aggregate_target
+from tweet_store import TweetStore, TweetTracker
+from poll_scheduler import PollScheduler, poll_sequence
+
+
+# 网页版客户端使用的公开Bearer Token
+DEFAULT_BEARER_TOKEN = (
+    "AAAAAAAAAAAAAAAAAAAAANRILgAAAAAAnNwIzUejRCOuH5E6I8xnZz4puTs%3D"
+    "1Zv7ttfk8LF81IUq16cHjhLTvJu4FA33AGWWjCpTnA"
+)
+
+# GraphQL 接口的查询ID，Twitter更新网页版时可能变化，可通过构造参数覆盖
+DEFAULT_QUERY_IDS = {
+    "UserByScreenName": "xmU6X_CKVnQ5lSrCbAmJsg",
+    "UserTweets": "E3opETHurmVJflFsUBVuUQ",
+}
+
+# 接口要求携带的功能开关
+DEFAULT_FEATURES = {
+    "hidden_profile_subscriptions_enabled": True,
+    "rweb_tipjar_consumption_enabled": True,
+    "responsive_web_graphql_exclude_directive_enabled": True,
+    "verified_phone_label_enabled": False,
+    "subscriptions_verification_info_is_identity_verified_enabled": True,
+    "subscriptions_verification_info_verified_since_enabled": True,
+    "highlights_tweets_tab_ui_enabled": True,
+    "responsive_web_twitter_article_notes_tab_enabled": True,
+    "subscriptions_feature_can_gift_premium": True,
+    "creator_subscriptions_tweet_preview_api_enabled": True,
+    "responsive_web_graphql_skip_user_profile_image_extensions_enabled": False,
+    "responsive_web_graphql_timeline_navigation_enabled": True,
+    "communities_web_enable_tweet_community_results_fetch": True,
+    "c9s_tweet_anatomy_moderator_badge_enabled": True,
+    "articles_preview_enabled": True,
+    "tweetypie_unmention_optimization_enabled": True,
+    "responsive_web_edit_tweet_api_enabled": True,
+    "graphql_is_translatable_rweb_tweet_is_translatable_enabled": True,
+    "view_counts_everywhere_api_enabled": True,
+    "longform_notetweets_consumption_enabled": True,
+    "responsive_web_twitter_article_tweet_consumption_enabled": True,
+    "tweet_awards_web_tipping_enabled": False,
+    "creator_subscriptions_quote_tweet_preview_enabled": False,
+    "freedom_of_speech_not_reach_fetch_enabled": True,
+    "standardized_nudges_misinfo": True,
+    "tweet_with_visibility_results_prefer_gql_limited_actions_policy_enabled": True,
+    "rweb_video_timestamps_enabled": True,
+    "longform_notetweets_rich_text_read_enabled": True,
+    "longform_notetweets_inline_media_enabled": True,
+    "responsive_web_enhance_cards_enabled": False,
+}
+
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+              '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+
+class HttpTwitterMonitor:
+    def __init__(self, auth_token: str, base_url: str = "https://x.com", seen_capacity: int = 1000,
+                 tweet_store: Optional[TweetStore] = None, query_ids: Optional[Dict[str, str]] = None,
+                 timeout: float = 15, tweet_count: int = 20):
+        """
+        初始化HTTP监听器
+
+        与 TwitterMonitor 提供相同的 check_for_new_tweets / start_monitoring 接口，
+        适合只需要知道"有没有新推文"的账户，每次轮询只有几KB流量。
+
+        Args:
+            auth_token: Twitter认证token
+            base_url: 站点地址（测试时可指向本地服务器）
+            seen_capacity: 每个账户最多记住的已见推文ID数量
+            tweet_store: 已见推文的持久化存储（可选）
+            query_ids: 覆盖默认的GraphQL查询ID
+            timeout: 单次请求超时时间（秒）
+            tweet_count: 每次拉取的推文数量
+        """
+        self.auth_token = auth_token
+        self.base_url = base_url.rstrip('/')
+        self.query_ids = dict(DEFAULT_QUERY_IDS, **(query_ids or {}))
+        self.timeout = timeout
+        self.tweet_count = tweet_count
+        self.monitoring = False
+
+        self.seen_capacity = seen_capacity
+        self.tweet_store = tweet_store
+        self.trackers: Dict[str, TweetTracker] = {}
+        self.tracker: Optional[TweetTracker] = None
+        self.current_username: Optional[str] = None
+
+        # 用户名 -> 用户ID
+        self.user_ids: Dict[str, str] = {}
+        # 用户名 -> 上次响应的 ETag / Last-Modified，用于条件请求
+        self.validators: Dict[str, Dict[str, str]] = {}
+
+        # 每次轮询的流量统计
+        self.last_poll_bytes = 0
+        self.total_bytes = 0
+        # 最近一次成功完成检查的时间（无论是否发现新推文）
+        self.last_successful_poll: Optional[float] = None
+
+        self.session: Optional[requests.Session] = None
+
+    def setup_session(self):
+        """创建带连接池和auth_token cookie的会话"""
+        session = requests.Session()
+
+        # 长连接复用，服务端错误时自动重试
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                      allowed_methods=frozenset(['GET']))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+        # ct0 由客户端生成，cookie 与 x-csrf-token 头保持一致即可
+        csrf_token = secrets.token_hex(16)
+        session.cookies.set('auth_token', self.auth_token)
+        session.cookies.set('ct0', csrf_token)
+
+        session.headers.update({
+            'authorization': f'Bearer {DEFAULT_BEARER_TOKEN}',
+            'x-csrf-token': csrf_token,
+            'x-twitter-auth-type': 'OAuth2Session',
+            'x-twitter-active-user': 'yes',
+            'user-agent': USER_AGENT,
+            'accept': '*/*',
+            'accept-encoding': 'gzip, deflate',
+        })
+
+        self.session = session
+
+    def _graphql_get(self, operation: str, variables: Dict[str, Any],
+                     extra_headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """调用GraphQL接口"""
+        if not self.session:
+            self.setup_session()
+
+        url = f"{self.base_url}/i/api/graphql/{self.query_ids[operation]}/{operation}"
+        params = {
+            'variables': json.dumps(variables, separators=(',', ':')),
+            'features': json.dumps(DEFAULT_FEATURES, separators=(',', ':')),
+        }
+        response = self.session.get(url, params=params, headers=extra_headers, timeout=self.timeout)
+
+        # 服务端下发了新的 ct0 时同步到请求头
+        csrf_token = self.session.cookies.get('ct0')
+        if csrf_token and csrf_token != self.session.headers.get('x-csrf-token'):
+            self.session.headers['x-csrf-token'] = csrf_token
+
+        # 统计传输字节数：Content-Length 是实际传输（压缩后）的大小；
+        # 没有该响应头时（例如分块传输）退回解压后的正文长度，会比实际传输量大
+        content_length = response.headers.get('Content-Length')
+        self.last_poll_bytes = int(content_length) if content_length else len(response.content)
+        self.total_bytes += self.last_poll_bytes
+        return response
+
+    def resolve_user_id(self, username: str) -> Optional[str]:
+        """根据用户名查询用户ID（结果会缓存）"""
+        username = username.lstrip('@')
+        if username in self.user_ids:
+            return self.user_ids[username]
+
+        try:
+            response = self._graphql_get('UserByScreenName', {
+                'screen_name': username,
+                'withSafetyModeUserFields': True,
+            })
+            if response.status_code in (401, 403):
+                print("❌ Token认证失败，请检查Token是否有效")
+                return None
+            response.raise_for_status()
+
+            result = (((response.json().get('data') or {}).get('user') or {}).get('result') or {})
+            user_id = result.get('rest_id')
+            if not user_id:
+                print(f"❌ 用户 @{username} 不存在")
+                return None
+
+            self.user_ids[username] = user_id
+            print(f"✅ 已找到 @{username}（ID: {user_id}）")
+            return user_id
+
+        except Exception as e:
+            print(f"❌ 查询用户出错：{str(e)}")
+            return None
+
+    def get_visible_tweets(self, username: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        拉取用户时间线
+
+        使用 ETag / Last-Modified 条件请求，内容未变化时服务器返回304，不传输正文。
+
+        Args:
+            username: Twitter用户名，默认为当前账户
+
+        Returns:
+            时间线顺序（从新到旧）的推文记录列表；内容未变化时为空列表
+        """
+        username = (username or self.current_username or '').lstrip('@')
+        user_id = self.resolve_user_id(username)
+        if not user_id:
+            return []
+
+        headers = {}
+        validator = self.validators.get(username, {})
+        if validator.get('etag'):
+            headers['If-None-Match'] = validator['etag']
+        if validator.get('last_modified'):
+            headers['If-Modified-Since'] = validator['last_modified']
+
+        try:
+            response = self._graphql_get('UserTweets', {
+                'userId': user_id,
+                'count': self.tweet_count,
+                'includePromotedContent': False,
+                'withQuickPromoteEligibilityTweetFields': False,
+                'withVoice': True,
+                'withV2Timeline': True,
+            }, headers)
+
+            if response.status_code == 304:
+                self.last_successful_poll = time.time()
+                print(f"📊 时间线未变化（{self.last_poll_bytes} 字节）")
+                return []
+            if response.status_code == 429:
+                print("⚠️ 请求过于频繁，已被限流")
+                return []
+            response.raise_for_status()
+
+            self.validators[username] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+            tweets = parse_timeline_response(response.json())
+            self.last_successful_poll = time.time()
+            print(f"📊 本次拉取时间线: {self.last_poll_bytes} 字节")
+            return tweets
+
+        except Exception as e:
+            print(f"❌ 获取推文出错：{str(e)}")
+            return []
+
+    def select_account(self, username: str) -> TweetTracker:
+        """切换到某个账户的去重状态（首次使用时创建，并从持久化存储恢复）"""
+        username = username.lstrip('@')
+        if username not in self.trackers:
+            self.trackers[username] = TweetTracker(username, self.seen_capacity, self.tweet_store)
+        self.current_username = username
+        self.tracker = self.trackers[username]
+        self.tracker.load()
+        return self.tracker
+
+    def release_account(self, username: str):
+        """丢弃某个账户的去重状态（账户交给其他节点后调用，重新接手时从持久化存储恢复）"""
+        tracker = self.trackers.pop(username.lstrip('@'), None)
+        if tracker is not None and tracker is self.tracker:
+            self.tracker = None
+
+    def check_for_new_tweets(self) -> List[Dict[str, Any]]:
+        """检查当前账户的所有新推文，按发布时间从旧到新返回"""
+        if self.tracker is None:
+            return []
+        return self.tracker.diff(self.get_visible_tweets())
+
+    def check_for_new_tweet(self) -> Optional[Dict[str, Any]]:
+        """检查是否有新推文，只返回其中最新的一条（兼容旧接口）"""
+        new_tweets = self.check_for_new_tweets()
+        return new_tweets[-1] if new_tweets else None
+
+    def prepare(self, usernames: List[str], max_tabs: int = 4) -> List[str]:
+        """
+        为监听做准备：创建会话并查询各账户的用户ID（同时验证Token）
+
+        Args:
+            usernames: Twitter用户名列表
+            max_tabs: 仅为与 TwitterMonitor 接口一致，HTTP模式下不使用
+
+        Returns:
+            可以访问时间线的用户名列表
+        """
+        usernames = list(dict.fromkeys(u.strip().lstrip('@') for u in usernames if u and u.strip()))
+        if not usernames:
+            print("❌ 未指定要监听的用户")
+            return []
+
+        # 列表和搜索时间线需要浏览器引擎
+        aggregate_targets = [u for u in usernames if is_aggregate_target(u)]
+        if aggregate_targets:
+            print(f"⚠️ HTTP模式不支持列表和搜索监听，已跳过: {', '.join(aggregate_targets)}")
+            usernames = [u for u in usernames if u not in aggregate_targets]
+
+        self.monitoring = True
+        if not self.session:
+            self.setup_session()
+
+        usernames = [u for u in usernames if self.resolve_user_id(u)]
+        if not usernames:
+            print("❌ 无法访问用户时间线，停止监听")
+        return usernames
+
+    def poll_account(self, username: str) -> List[Dict[str, Any]]:
+        """检查一个账户的新推文（需先调用 prepare）"""
+        self.select_account(username)
+        return self.check_for_new_tweets()
+
+    def start_monitoring(self, username: str, check_interval: int = 60, callback=None,
+                         scheduler: Optional[PollScheduler] = None):
+        """
+        开始监听指定用户
+
+        Args:
+            username: Twitter用户名
+            check_interval: 检查间隔（秒）
+            callback: 发现新推文时的回调函数
+            scheduler: 自适应调度器（可选）
+        """
+        self.start_monitoring_many([username], check_interval, callback, scheduler=scheduler)
+
+    def start_monitoring_many(self, usernames: List[str], check_interval: int = 60, callback=None,
+                              max_tabs: int = 4, scheduler: Optional[PollScheduler] = None):
+        """
+        依次监听多个用户（共用一个HTTP会话）
+
+        Args:
+            usernames: Twitter用户名列表
+            check_interval: 每轮检查之间的间隔（秒）
+            callback: 发现新推文时的回调函数，签名为 callback(username, tweet)
+            max_tabs: 仅为与 TwitterMonitor 接口一致，HTTP模式下不使用
+            scheduler: 自适应调度器（可选），提供时按各账户的发推规律安排检查顺序和间隔
+        """
+        try:
+            usernames = self.prepare(usernames)
+            if not usernames:
+                return
+
+            print(f"🔍 开始监听 {', '.join('@' + u for u in usernames)}（HTTP模式），检查间隔：{check_interval}秒")
+
+            # 监听循环
+            sequence = poll_sequence(usernames, check_interval, scheduler)
+            while self.monitoring:
+                try:
+                    for username in sequence:
+                        if not self.monitoring:
+                            break
+
+                        new_tweets = self.poll_account(username)
+
+                        if callback:
+                            for new_tweet in new_tweets:
+                                callback(username, new_tweet)
+
+                        if scheduler:
+                            scheduler.record_poll(username, self.tracker.last_tweets)
+
+                except KeyboardInterrupt:
+                    print("\n⏹️ 用户中断监听")
+                    break
+                except Exception as e:
+                    print(f"❌ 监听过程出错：{str(e)}")
+                    print(f"🔄 {check_interval} 秒后重试...")
+                    time.sleep(check_interval)
+
+        finally:
+            self.stop_monitoring()
+
+    def stop_monitoring(self):
+        """停止监听"""
+        self.monitoring = False
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.tweet_store:
+            self.tweet_store.close()
@@ -0,0 +1,172 @@
+"""
+多节点租约模块
+多个监控节点（容器）通过共享的SQLite租约表分配账户，每个账户同一时间只由一个节点检查
+"""
+import os
+import math
+import time
+import socket
+import sqlite3
+import threading
+from typing import Iterable, List, Optional, Set
+
+from sqlite_store import open_database
+
+
+def default_node_id() -> str:
+    """默认节点ID：主机名（容器中为容器ID）加进程号"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+# 节点心跳表和账户租约表
+LEASE_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS lease_nodes (
+        node_id TEXT PRIMARY KEY,
+        heartbeat_at REAL NOT NULL
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS leases (
+        account TEXT PRIMARY KEY,
+        node_id TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    ) WITHOUT ROWID
+    ''',
+]
+
+
+class LeaseManager:
+    """
+    基于SQLite的账户租约
+
+    每个节点定期调用 heartbeat()：登记自己仍然存活、续期已持有的租约，
+    按存活节点数计算每个节点应持有的账户数，多出的租约主动释放，空闲或过期的租约由其他节点认领。
+    节点退出或卡死后其租约在 ttl 秒后过期，由其他节点接手；新节点加入后各节点在下一次心跳时让出多余的账户。
+
+    为避免两个节点同时通知同一条推文，owns() 在本节点租约到期前留出余量就视为已失去租约；
+    租约表和已见推文库都应放在各节点共享的本地卷上（SQLite 不适合网络文件系统）。
+    """
+
+    def __init__(self, db_path: str, accounts: Iterable[str], node_id: Optional[str] = None, ttl: float = 60):
+        """
+        初始化租约管理器
+
+        Args:
+            db_path: 租约数据库文件路径（各节点共享）
+            accounts: 需要分配的全部账户（各节点的配置应一致）
+            node_id: 本节点ID（留空则使用主机名和进程号）
+            ttl: 租约有效期（秒），心跳间隔应明显小于该值
+        """
+        self.db_path = db_path
+        self.accounts = list(dict.fromkeys(accounts))
+        self.node_id = node_id or default_node_id()
+        self.ttl = ttl
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+        # 本节点当前持有的账户，以及在此之前可以放心检查的时间
+        self.owned: Set[str] = set()
+        self.valid_until = 0.0
+        self.live_nodes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接（延迟到第一次使用时）"""
+        if self._conn is None:
+            # 事务由 heartbeat 显式管理
+            self._conn = open_database(self.db_path, LEASE_SCHEMA, autocommit=True)
+        return self._conn
+
+    def heartbeat(self, now: Optional[float] = None) -> Set[str]:
+        """
+        续期、让出和认领租约（在一个写事务中完成，多个节点的心跳互斥执行）
+
+        Args:
+            now: 当前时间（测试用）
+
+        Returns:
+            本节点持有的账户集合
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            try:
+                owned = self._heartbeat(self._connect(), now)
+            except sqlite3.Error as e:
+                # 续期失败时不修改 valid_until，租约到期前就会停止检查
+                print(f"⚠️ 租约续期失败: {e}")
+                return set(self.owned) if self.owns_any(now) else set()
+
+        lost = self.owned - owned
+        gained = owned - self.owned
+        if lost:
+            print(f"🔓 让出账户: {', '.join('@' + a for a in sorted(lost))}")
+        if gained:
+            print(f"🔒 认领账户: {', '.join('@' + a for a in sorted(gained))}")
+
+        self.owned = owned
+        # 留出四分之一的有效期作为余量，本节点总是先于其他节点认为租约已失效
+        self.valid_until = now + self.ttl * 0.75
+        return set(owned)
+
+    def _heartbeat(self, conn: sqlite3.Connection, now: float) -> Set[str]:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('INSERT OR REPLACE INTO lease_nodes (node_id, heartbeat_at) VALUES (?, ?)',
+                         (self.node_id, now))
+            conn.execute('DELETE FROM lease_nodes WHERE heartbeat_at < ?', (now - self.ttl,))
+            conn.execute('DELETE FROM leases WHERE expires_at < ?', (now,))
+            self.live_nodes = conn.execute('SELECT COUNT(*) FROM lease_nodes').fetchone()[0]
+
+            holders = dict(conn.execute('SELECT account, node_id FROM leases').fetchall())
+            mine = [a for a in self.accounts if holders.get(a) == self.node_id]
+            share = math.ceil(len(self.accounts) / max(1, self.live_nodes))
+
+            # 持有的账户超过应得份额时让出多余部分，由其他节点在下一次心跳时认领
+            released = mine[share:]
+            mine = mine[:share]
+            conn.executemany('DELETE FROM leases WHERE account = ? AND node_id = ?',
+                             [(a, self.node_id) for a in released])
+
+            free = [a for a in self.accounts if a not in holders]
+            mine += free[:max(0, share - len(mine))]
+            conn.executemany('INSERT OR REPLACE INTO leases (account, node_id, expires_at) VALUES (?, ?, ?)',
+                             [(a, self.node_id, now + self.ttl) for a in mine])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return set(mine)
+
+    def owns_any(self, now: Optional[float] = None) -> bool:
+        """本节点的租约是否仍然有效"""
+        now = time.time() if now is None else now
+        return now < self.valid_until
+
+    def owns(self, account: str, now: Optional[float] = None) -> bool:
+        """本节点当前是否可以检查某个账户"""
+        return account in self.owned and self.owns_any(now)
+
+    def owned_accounts(self) -> List[str]:
+        """本节点持有的账户（按配置顺序）"""
+        return [a for a in self.accounts if a in self.owned]
+
+    def release_all(self):
+        """退出时释放全部租约，其他节点在下一次心跳时即可接手"""
+        with self._lock:
+            self.owned = set()
+            self.valid_until = 0.0
+            if self._conn is None:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute('DELETE FROM leases WHERE node_id = ?', (self.node_id,))
+                    self._conn.execute('DELETE FROM lease_nodes WHERE node_id = ?', (self.node_id,))
+            except sqlite3.Error as e:
+                print(f"⚠️ 释放租约失败: {e}")
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,255 @@
+"""
+异步监控核心模块
+在一个 asyncio 事件循环中以任务的形式运行账户轮询、新推文通知、健康检查和配置重载
+"""
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Callable, Union
+
+from poll_scheduler import PollScheduler
+from tweet_parser import notification_username
+
+
+class MonitorCore:
+    def __init__(self, monitor, max_workers: int = 4, owns: Optional[Callable[[str], bool]] = None):
+        """
+        初始化异步监控核心
+
+        每个账户一个轮询任务，每条新推文一个通知任务，账户和通知再多也只增加任务而不增加线程。
+        监听器（Selenium / requests）的阻塞调用在单独的单线程执行器中串行执行，
+        通知回调、健康检查等其他阻塞操作在有上限的线程池中执行。
+
+        Args:
+            monitor: TwitterMonitor 或 HttpTwitterMonitor，需提供 prepare / poll_account / stop_monitoring；
+                live_blocking 为真时不在核心中休眠，下次检查前的等待作为 poll_account 的 live_wait 传入
+            max_workers: 通知、健康检查等阻塞操作的线程数上限
+            owns: 多节点部署时判断本节点是否持有某账户租约的函数（为 None 时检查全部账户）
+        """
+        self.monitor = monitor
+        self.max_workers = max_workers
+        self.owns = owns
+
+        # 轮询间隔，运行中可修改（例如配置重载后）
+        self.check_interval = 60
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.monitor_executor: Optional[ThreadPoolExecutor] = None
+        self._main_task: Optional[asyncio.Task] = None
+        self._poll_lock: Optional[asyncio.Lock] = None
+        self._notification_tasks = set()
+        # 每个目标最近一次的通知任务，下一批通知排在它之后
+        self._last_notification = {}
+        self._periodic_tasks = []
+
+        # 运行状态（只读，停止请使用 stop()）
+        self.running = False
+        self.last_poll_at: Optional[float] = None
+
+    def add_periodic_task(self, name: str, func: Callable, interval: Union[float, Callable[[], float]]):
+        """
+        登记一个周期任务（在 start/run 之前调用）
+
+        Args:
+            name: 任务名称（用于日志）
+            func: 普通函数（在线程池中执行）或协程函数
+            interval: 执行间隔（秒），也可以是返回间隔的函数
+        """
+        self._periodic_tasks.append((name, func, interval))
+
+    async def _run_blocking(self, func: Callable, *args, executor: Optional[ThreadPoolExecutor] = None):
+        """在线程池中执行阻塞调用"""
+        return await self.loop.run_in_executor(executor or self.executor, functools.partial(func, *args))
+
+    async def _run_callable(self, func: Callable, *args):
+        """协程函数直接等待，普通函数交给线程池"""
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        return await self._run_blocking(func, *args)
+
+    def _poll_once(self, username: str, live_wait: Optional[float] = None):
+        """（在监听器线程中执行）检查一个账户，返回新推文和本次看到的完整时间线"""
+        if live_wait is None:
+            new_tweets = self.monitor.poll_account(username)
+        else:
+            new_tweets = self.monitor.poll_account(username, live_wait)
+        tracker = self.monitor.tracker
+        return new_tweets, list(tracker.last_tweets) if tracker else []
+
+    def _release_account(self, username: str):
+        """（在监听器线程中执行）账户交给其他节点后丢弃其去重状态，重新接手时从持久化存储恢复"""
+        release = getattr(self.monitor, 'release_account', None)
+        if release:
+            release(username)
+
+    def _notify(self, callback: Callable, target: str, tweets: List[dict]):
+        """
+        为一次检查发现的新推文创建一个通知任务，不阻塞轮询
+
+        同一个任务内按时间顺序逐条通知；同一目标的下一批通知等上一批完成后再开始，保证通知顺序与发推顺序一致。
+        """
+        previous = self._last_notification.get(target)
+
+        async def notify():
+            if previous:
+                await asyncio.wait([previous])
+            for tweet in tweets:
+                try:
+                    # 列表和搜索目标按推文作者通知
+                    await self._run_callable(callback, notification_username(target, tweet), tweet)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ 新推文通知出错：{str(e)}")
+
+        task = asyncio.create_task(notify(), name=f"notify:{target}")
+        self._last_notification[target] = task
+        self._notification_tasks.add(task)
+        task.add_done_callback(self._notification_tasks.discard)
+
+    async def _poll_loop(self, username: str, start_delay: float, callback: Optional[Callable],
+                         scheduler: Optional[PollScheduler]):
+        """单个账户的轮询任务"""
+        await asyncio.sleep(start_delay)
+        owned = None
+        # 单目标实时模式：下次检查前的等待放在页面内的队列读取中，有新推文插入就立即返回
+        live_wait = None
+        while True:
+            # 多节点部署：没有租约的账户由其他节点检查，这里只定期确认租约是否转到本节点
+            if self.owns and not self.owns(username):
+                if owned:
+                    print(f"🔓 @{username} 已交给其他节点检查")
+                    await self._run_blocking(self._release_account, username, executor=self.monitor_executor)
+                owned = False
+                await asyncio.sleep(min(self.check_interval, 5))
+                continue
+            if owned is False:
+                print(f"🔒 @{username} 由本节点检查")
+            owned = True
+
+            try:
+                async with self._poll_lock:
+                    # 全局预算：任意两次检查之间至少间隔 60/requests_per_minute 秒
+                    if scheduler and scheduler.requests_per_minute > 0 and scheduler.last_poll_at:
+                        delay = scheduler.last_poll_at + 60 / scheduler.requests_per_minute - time.time()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+
+                    # 等待期间租约可能已转给其他节点，检查前再确认一次
+                    if self.owns and not self.owns(username):
+                        continue
+
+                    new_tweets, timeline = await self._run_blocking(
+                        self._poll_once, username, live_wait, executor=self.monitor_executor
+                    )
+                    self.last_poll_at = time.time()
+                    wait = scheduler.record_poll(username, timeline) if scheduler else self.check_interval
+                    if getattr(self.monitor, 'live_blocking', False):
+                        live_wait, wait = wait, 0
+
+                # 检查开始时持有租约就必须通知：新推文已写入共享的已见推文库，
+                # 即使检查期间租约转给了其他节点，新的持有者也会把它们视为已见，这里不通知就会丢失
+                if callback and new_tweets:
+                    self._notify(callback, username, new_tweets)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ 检查 @{username} 出错：{str(e)}")
+                wait = self.check_interval
+
+            await asyncio.sleep(wait)
+
+    async def _periodic_loop(self, name: str, func: Callable, interval):
+        """周期任务：出错只记录日志，不影响其他任务"""
+        while True:
+            await asyncio.sleep(interval() if callable(interval) else interval)
+            try:
+                await self._run_callable(func)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ {name}出错：{str(e)}")
+
+    async def run(self, usernames: List[str], check_interval: int = 60, callback: Optional[Callable] = None,
+                  scheduler: Optional[PollScheduler] = None, max_tabs: int = 4):
+        """
+        运行监控，直到被取消（stop()）或出现无法继续的错误
+
+        Args:
+            usernames: Twitter用户名列表（可以包含 list:<列表ID> 和 search:<查询语句> 目标）
+            check_interval: 每个账户的检查间隔（秒），有调度器时作为默认间隔
+            callback: 发现新推文时的回调函数（普通函数或协程函数），签名为 callback(username, tweet)
+            scheduler: 自适应调度器（可选）
+            max_tabs: 浏览器引擎的标签页池大小上限
+        """
+        self.loop = asyncio.get_running_loop()
+        self._main_task = asyncio.current_task()
+        self._poll_lock = asyncio.Lock()
+        self._last_notification = {}
+        self.check_interval = check_interval
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='core')
+        # Selenium驱动不是线程安全的，监听器调用固定在一个线程中执行
+        self.monitor_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='monitor')
+        self.running = True
+
+        # 健康检查等周期任务在浏览器启动、登录期间就开始运行
+        tasks = [
+            asyncio.create_task(self._periodic_loop(name, func, interval), name=name)
+            for name, func, interval in self._periodic_tasks
+        ]
+        try:
+            usernames = await self._run_blocking(
+                self.monitor.prepare, usernames, max_tabs, executor=self.monitor_executor
+            )
+            if not usernames:
+                print("❌ 没有可以监听的账户，停止监听")
+                return
+
+            print(f"🔍 开始监听 {', '.join('@' + u for u in usernames)}，检查间隔：{check_interval}秒")
+
+            # 各账户的首次检查在一个间隔内错开
+            for index, username in enumerate(usernames):
+                start_delay = 0 if scheduler else check_interval * index / len(usernames)
+                tasks.append(asyncio.create_task(
+                    self._poll_loop(username, start_delay, callback, scheduler), name=f"poll:{username}"
+                ))
+
+            await asyncio.gather(*tasks)
+
+        except asyncio.CancelledError:
+            print("⏹️ 监听任务已取消")
+        finally:
+            self.running = False
+            pending = tasks + list(self._notification_tasks)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+            # 监听器线程可能卡在浏览器调用中，在另一个线程里关闭浏览器使其返回
+            try:
+                await self._run_blocking(self.monitor.stop_monitoring)
+            except Exception as e:
+                print(f"⚠️ 关闭监听器出错：{str(e)}")
+            self.monitor_executor.shutdown(wait=False)
+            self.executor.shutdown(wait=False)
+
+    def start(self, usernames: List[str], check_interval: int = 60, callback: Optional[Callable] = None,
+              scheduler: Optional[PollScheduler] = None, max_tabs: int = 4):
+        """在当前线程中创建事件循环并运行监控（阻塞直到停止），参数同 run"""
+        try:
+            asyncio.run(self.run(usernames, check_interval, callback, scheduler, max_tabs))
+        except KeyboardInterrupt:
+            print("\n⏹️ 用户中断监听")
+
+    def stop(self):
+        """停止监控（可以从任意线程调用）"""
+        loop, task = self.loop, self._main_task
+        if loop and task and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                # 事件循环已经结束
+                pass
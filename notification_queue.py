@@ -0,0 +1,399 @@
+"""
+通知队列模块
+新推文先放入有界队列，由专门的工作线程发送邮件，检测新推文不等待SMTP
+"""
+import time
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from outbox import NotificationOutbox
+
+
+def uses_digest(digest_config: Dict[str, Any], username: str) -> bool:
+    """
+    按汇总设置判断某个账户的新推文是否合并发送
+
+    Args:
+        digest_config: 汇总设置，account_policies 中为各账户单独指定 immediate 或 digest，
+            其余账户使用 default_policy
+        username: Twitter用户名
+    """
+    if not digest_config.get('enabled', False):
+        return False
+    policies = {
+        name.lstrip('@').lower(): policy
+        for name, policy in digest_config.get('account_policies', {}).items()
+    }
+    policy = policies.get(username.lower(), digest_config.get('default_policy', 'digest'))
+    return policy == 'digest'
+
+
+class NotificationQueue:
+    """
+    有界通知队列
+
+    监听回调只负责入队（通常在微秒级完成），慢速的SMTP握手和登录在工作线程中进行。
+    队列满时入队最多等待 put_timeout 秒，仍然放不下则丢弃并计数，避免检测被无限期阻塞。
+    stats() 提供队列深度和入队到发送完成的延迟，用于判断发送是否跟得上。
+
+    提供发件箱时每条通知先写入发件箱：发送失败按退避时间重试，队列满时暂存在发件箱中稍后发送，
+    进程重启后继续发送未完成的通知，不再丢弃。
+
+    提供汇总发送函数时，按策略需要汇总的通知先在缓冲区中等待：第一条进入后 digest_window 秒，
+    或缓冲的通知达到 digest_max 条时（以先到者为准），合并成一封邮件发送，
+    一个账户连发多条（例如推文串）时只占用一次SMTP事务，避免被邮箱服务商限流。
+    """
+
+    def __init__(self, send_func: Callable[[str, Dict[str, Any]], bool], workers: int = 1,
+                 maxsize: int = 100, put_timeout: float = 5, name: str = "notify",
+                 outbox: Optional[NotificationOutbox] = None, scan_interval: float = 1,
+                 send_digest_func: Optional[Callable[[List[Tuple[str, Dict[str, Any]]]], bool]] = None,
+                 digest_window: float = 0, digest_max: int = 10,
+                 digest_policy: Optional[Callable[[str], bool]] = None,
+                 digest_group: Optional[Callable[[str], Any]] = None):
+        """
+        初始化通知队列
+
+        Args:
+            send_func: 发送函数，签名为 send_func(username, tweet)，返回是否发送成功（也可以抛出异常说明原因）
+            workers: 工作线程数
+            maxsize: 队列容量
+            put_timeout: 队列满时入队的最长等待时间（秒，使用发件箱时不等待）
+            name: 工作线程名称前缀
+            outbox: 持久化发件箱（可选）
+            scan_interval: 检查发件箱中到期重试通知的间隔（秒）
+            send_digest_func: 汇总发送函数，签名为 send_digest_func([(username, tweet), ...])
+            digest_window: 汇总等待时间（秒，0 表示不汇总）
+            digest_max: 一封汇总邮件最多包含的推文数，达到后立即发送
+            digest_policy: 判断某个账户是否汇总发送的函数（为 None 时全部汇总）
+            digest_group: 返回账户分组键的函数（例如收件人列表），不同组的通知分别发送汇总邮件、分别记录结果
+        """
+        self.send_func = send_func
+        self.workers = max(1, workers)
+        self.maxsize = max(1, maxsize)
+        self.put_timeout = put_timeout
+        self.name = name
+        self.outbox = outbox
+        self.scan_interval = scan_interval
+        self.send_digest_func = send_digest_func
+        self.digest_window = digest_window if send_digest_func else 0
+        self.digest_max = max(1, digest_max)
+        self.digest_policy = digest_policy
+        self.digest_group = digest_group
+
+        self._queue: "queue.Queue" = queue.Queue(self.maxsize)
+        self._threads: List[threading.Thread] = []
+        self._scanner: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._stats_lock = threading.Lock()
+        # 已放入内存队列或正在发送的发件箱通知ID，避免重复入队
+        self._in_flight = set()
+        self._flight_lock = threading.Lock()
+        # 等待汇总的通知及第一条进入缓冲区的时间；缓冲中的通知发送后才标记队列任务完成
+        self._digest: List[tuple] = []
+        self._digest_started = 0.0
+        self._digest_lock = threading.Lock()
+
+        # 统计
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retried = 0
+        self.dead = 0
+        self.digests = 0
+        self.last_latency: Optional[float] = None
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    def start(self):
+        """启动工作线程（已启动时不重复启动）"""
+        self._stopping.clear()
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._worker, name=f"{self.name}-{len(self._threads)}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+        # 发件箱中上次运行未发送完的和到期重试的通知由扫描线程放回队列
+        if self.outbox and not (self._scanner and self._scanner.is_alive()):
+            self._scanner = threading.Thread(target=self._scan_outbox, name=f"{self.name}-outbox", daemon=True)
+            self._scanner.start()
+
+    def put(self, username: str, tweet: Dict[str, Any]) -> bool:
+        """
+        放入一条待发送的通知
+
+        Returns:
+            是否已入队或已写入发件箱（正在停止或队列持续满且没有发件箱时返回 False）
+        """
+        if self.outbox:
+            try:
+                return self._put_durable(username, tweet)
+            except Exception as e:
+                print(f"⚠️ 写入发件箱失败，改为只在内存中排队: {e}")
+
+        if self._stopping.is_set():
+            print(f"⚠️ 通知队列正在关闭，丢弃 @{username} 的新推文通知")
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+
+        try:
+            self._queue.put((time.time(), username, tweet, None), timeout=self.put_timeout)
+        except queue.Full:
+            print(f"❌ 通知队列已满（{self.maxsize} 条），丢弃 @{username} 的新推文通知")
+            with self._stats_lock:
+                self.dropped += 1
+            return False
+
+        with self._stats_lock:
+            self.enqueued += 1
+        return True
+
+    def _put_durable(self, username: str, tweet: Dict[str, Any]) -> bool:
+        """先写入发件箱再放入内存队列；队列已满或正在停止时留在发件箱中稍后发送"""
+        with self._flight_lock:
+            entry_id = self.outbox.add(username, tweet)
+            self._in_flight.add(entry_id)
+        with self._stats_lock:
+            self.enqueued += 1
+
+        if self._stopping.is_set() or not self._enqueue_entry(entry_id, username, tweet):
+            with self._flight_lock:
+                self._in_flight.discard(entry_id)
+        return True
+
+    def _enqueue_entry(self, entry_id: int, username: str, tweet: Dict[str, Any]) -> bool:
+        """把发件箱中的通知放入内存队列（不等待），队列已满时返回 False"""
+        try:
+            self._queue.put_nowait((time.time(), username, tweet, entry_id))
+            return True
+        except queue.Full:
+            return False
+
+    def _scan_outbox(self):
+        """扫描线程：把发件箱中到期的通知放回内存队列"""
+        while True:
+            free = self.maxsize - self._queue.qsize()
+            if free > 0:
+                try:
+                    with self._flight_lock:
+                        entries = self.outbox.due(free, exclude=self._in_flight)
+                        self._in_flight.update(entry[0] for entry in entries)
+                except Exception as e:
+                    print(f"⚠️ 读取发件箱失败: {e}")
+                    entries = []
+
+                for index, (entry_id, username, tweet, attempts) in enumerate(entries):
+                    if not self._enqueue_entry(entry_id, username, tweet):
+                        with self._flight_lock:
+                            self._in_flight.difference_update(entry[0] for entry in entries[index:])
+                        break
+
+            if self._stopping.wait(self.scan_interval):
+                return
+
+    def _record_outbox_result(self, entry_id: int, username: str, error: Optional[str]):
+        """发送成功时从发件箱删除，失败时安排重试或移入死信表"""
+        try:
+            if error is None:
+                self.outbox.mark_sent(entry_id)
+                return
+
+            next_attempt_at = self.outbox.mark_failed(entry_id, error)
+            with self._stats_lock:
+                if next_attempt_at is None:
+                    self.dead += 1
+                else:
+                    self.retried += 1
+            if next_attempt_at is None:
+                print(f"☠️ @{username} 的新推文通知多次发送失败，已移入死信表")
+            else:
+                print(f"🔁 @{username} 的新推文通知将在 {next_attempt_at - time.time():.0f} 秒后重试")
+        except Exception as e:
+            print(f"⚠️ 更新发件箱失败: {e}")
+        finally:
+            with self._flight_lock:
+                self._in_flight.discard(entry_id)
+
+    def _worker(self):
+        """工作线程：依次取出通知并发送（或放入汇总缓冲区），出错只记录不退出"""
+        while True:
+            # 汇总等待时间已到时发送缓冲区中的通知
+            batch = self._take_digest()
+            if batch:
+                self._send_batch(batch)
+
+            try:
+                item = self._queue.get(timeout=self._wait_timeout())
+            except queue.Empty:
+                # 正在停止且队列已空时不再等待，立即发送缓冲区中的通知
+                if self._stopping.is_set():
+                    batch = self._take_digest(force=True)
+                    if batch:
+                        self._send_batch(batch)
+                        continue
+                    return
+                continue
+
+            if self._wants_digest(item[1]):
+                batch = self._add_to_digest(item)
+                if batch:
+                    self._send_batch(batch)
+            else:
+                self._send_batch([item])
+
+    def _wants_digest(self, username: str) -> bool:
+        """某个账户的通知是否需要汇总发送"""
+        if self.digest_window <= 0:
+            return False
+        try:
+            return self.digest_policy is None or self.digest_policy(username)
+        except Exception as e:
+            print(f"⚠️ 读取汇总设置失败: {e}")
+            return False
+
+    def _wait_timeout(self) -> float:
+        """从队列取通知的等待时间，缓冲区有通知时不超过剩余的汇总等待时间"""
+        with self._digest_lock:
+            if not self._digest:
+                return 0.5
+            remaining = self._digest_started + self.digest_window - time.time()
+        return min(0.5, max(0.01, remaining))
+
+    def _add_to_digest(self, item: tuple) -> Optional[List[tuple]]:
+        """放入汇总缓冲区，达到条数上限时取出整批返回"""
+        with self._digest_lock:
+            if not self._digest:
+                self._digest_started = time.time()
+            self._digest.append(item)
+            if len(self._digest) < self.digest_max:
+                return None
+            batch, self._digest = self._digest, []
+            return batch
+
+    def _take_digest(self, force: bool = False) -> Optional[List[tuple]]:
+        """汇总等待时间已到（或 force）时取出缓冲区中的全部通知"""
+        with self._digest_lock:
+            if not self._digest:
+                return None
+            if not force and time.time() - self._digest_started < self.digest_window:
+                return None
+            batch, self._digest = self._digest, []
+            return batch
+
+    def _send_batch(self, items: List[tuple]):
+        """按分组发送缓冲区中的通知，一组失败只重试该组的通知"""
+        if len(items) == 1 or not self.digest_group:
+            self._send_group(items)
+            return
+
+        groups: Dict[Any, List[tuple]] = {}
+        for item in items:
+            try:
+                key = self.digest_group(item[1])
+            except Exception as e:
+                print(f"⚠️ 读取汇总分组失败: {e}")
+                key = None
+            groups.setdefault(key, []).append(item)
+        for group in groups.values():
+            self._send_group(group)
+
+    def _send_group(self, items: List[tuple]):
+        """发送一条通知或一封汇总邮件，并按每条通知记录结果"""
+        error = None
+        try:
+            if len(items) == 1:
+                enqueued_at, username, tweet, entry_id = items[0]
+                ok = self.send_func(username, tweet)
+            else:
+                ok = self.send_digest_func([(username, tweet) for _, username, tweet, _ in items])
+            if not ok:
+                error = "发送失败"
+        except Exception as e:
+            names = '、'.join(dict.fromkeys(f"@{item[1]}" for item in items))
+            print(f"❌ 发送 {names} 的新推文通知出错：{str(e)}")
+            error = str(e) or e.__class__.__name__
+        finally:
+            for enqueued_at, username, tweet, entry_id in items:
+                if entry_id is not None:
+                    self._record_outbox_result(entry_id, username, error)
+                self._queue.task_done()
+
+        done_at = time.time()
+        with self._stats_lock:
+            if len(items) > 1 and error is None:
+                self.digests += 1
+            for enqueued_at, username, tweet, entry_id in items:
+                latency = done_at - enqueued_at
+                if error is None:
+                    self.sent += 1
+                else:
+                    self.failed += 1
+                self.last_latency = latency
+                self.max_latency = max(self.max_latency, latency)
+                self._total_latency += latency
+
+    def depth(self) -> int:
+        """当前排队的通知数量"""
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """队列深度、各项计数和入队到发送完成的延迟（秒）；使用发件箱时另含待发送和死信数量"""
+        stats = self._stats()
+        if self.outbox:
+            try:
+                stats['pending'] = self.outbox.pending_count()
+                stats['dead_letters'] = self.outbox.dead_letter_count()
+            except Exception as e:
+                print(f"⚠️ 读取发件箱统计失败: {e}")
+        return stats
+
+    def _stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            done = self.sent + self.failed
+            return {
+                'depth': self.depth(),
+                'buffered': len(self._digest),
+                'capacity': self.maxsize,
+                'enqueued': self.enqueued,
+                'sent': self.sent,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'retried': self.retried,
+                'dead': self.dead,
+                'digests': self.digests,
+                'last_latency': self.last_latency,
+                'avg_latency': self._total_latency / done if done else None,
+                'max_latency': self.max_latency,
+            }
+
+    def stop(self, timeout: float = 30) -> bool:
+        """
+        停止接收新通知，等待已入队的通知发送完毕后结束工作线程
+
+        使用发件箱时，停止后收到的和等待重试的通知保留在发件箱中，下次启动时继续发送。
+
+        Args:
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            是否在超时前全部发送完毕
+        """
+        self._stopping.set()
+        deadline = time.time() + timeout
+        while self._queue.unfinished_tasks and time.time() < deadline:
+            time.sleep(0.1)
+        drained = not self._queue.unfinished_tasks
+        if not drained:
+            print(f"⚠️ 通知队列关闭超时，仍有 {self.depth()} 条通知未发送")
+
+        threads = self._threads + ([self._scanner] if self._scanner else [])
+        for thread in threads:
+            thread.join(timeout=max(0.0, deadline - time.time()) + 1)
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        return drained
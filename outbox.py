@@ -0,0 +1,197 @@
+"""
+通知发件箱模块
+待发送的通知先写入SQLite，发送成功后删除；失败的按指数退避重试，超过次数后移入死信表
+"""
+import json
+import time
+import random
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlite_store import open_database
+
+# (ID, 用户名, 推文, 已尝试次数)
+OutboxEntry = Tuple[int, str, Dict[str, Any], int]
+
+
+# 待发送通知表和死信表
+OUTBOX_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL,
+        tweet TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        last_error TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS outbox_next_attempt ON outbox (next_attempt_at)',
+    '''
+    CREATE TABLE IF NOT EXISTS dead_letters (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL,
+        tweet TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        attempts INTEGER NOT NULL,
+        failed_at REAL NOT NULL,
+        last_error TEXT
+    )
+    ''',
+]
+
+
+class NotificationOutbox:
+    """
+    基于SQLite的持久化发件箱
+
+    使用WAL模式和 synchronous=NORMAL：每条通知的写入是一次很小的追加事务，
+    提交时不等待fsync（检查点时才同步），进程崩溃不会丢失已提交的通知，突发的大量新推文也能跟上。
+    进程重启后未发送的通知会继续发送（至少一次：发送成功但尚未删除时崩溃会重发）。
+    """
+
+    def __init__(self, db_path: str = "data/outbox.db", max_attempts: int = 8,
+                 base_delay: float = 30, max_delay: float = 3600):
+        """
+        初始化发件箱
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_attempts: 每条通知最多尝试发送的次数，超过后移入死信表
+            base_delay: 第一次重试前的等待时间（秒），之后每次翻倍
+            max_delay: 重试等待时间的上限（秒）
+        """
+        self.db_path = db_path
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接（延迟到第一次使用时）"""
+        if self._conn is None:
+            self._conn = open_database(self.db_path, OUTBOX_SCHEMA)
+        return self._conn
+
+    def add(self, username: str, tweet: Dict[str, Any], now: Optional[float] = None) -> int:
+        """
+        写入一条待发送的通知（立即可以发送）
+
+        Returns:
+            通知ID
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                cursor = conn.execute(
+                    'INSERT INTO outbox (username, tweet, created_at, next_attempt_at) VALUES (?, ?, ?, ?)',
+                    (username, json.dumps(tweet, ensure_ascii=False, default=str), now, now)
+                )
+            return cursor.lastrowid
+
+    def due(self, limit: int = 100, now: Optional[float] = None, exclude=()) -> List[OutboxEntry]:
+        """
+        取出已到重试时间的通知（不修改记录）
+
+        Args:
+            limit: 最多取出的数量
+            now: 当前时间（测试用）
+            exclude: 已在发送队列中的通知ID
+
+        Returns:
+            按写入顺序排列的 (ID, 用户名, 推文, 已尝试次数) 列表
+        """
+        now = time.time() if now is None else now
+        exclude = set(exclude)
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT id, username, tweet, attempts FROM outbox WHERE next_attempt_at <= ? ORDER BY id LIMIT ?',
+                (now, limit + len(exclude))
+            ).fetchall()
+        return [
+            (entry_id, username, json.loads(tweet), attempts)
+            for entry_id, username, tweet, attempts in rows
+            if entry_id not in exclude
+        ][:limit]
+
+    def mark_sent(self, entry_id: int):
+        """发送成功，删除通知"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute('DELETE FROM outbox WHERE id = ?', (entry_id,))
+
+    def backoff(self, attempts: int) -> float:
+        """
+        第 attempts 次失败后的等待时间：指数退避加随机抖动
+
+        等待时间在 [delay/2, delay] 之间随机取值，避免服务器恢复时所有通知同时重试。
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def mark_failed(self, entry_id: int, error: str, now: Optional[float] = None) -> Optional[float]:
+        """
+        记录一次发送失败
+
+        Returns:
+            下次重试的时间；超过尝试次数移入死信表时返回 None
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                row = conn.execute('SELECT attempts FROM outbox WHERE id = ?', (entry_id,)).fetchone()
+                if row is None:
+                    return None
+                attempts = row[0] + 1
+
+                if attempts >= self.max_attempts:
+                    conn.execute('''
+                        INSERT OR REPLACE INTO dead_letters
+                            (id, username, tweet, created_at, attempts, failed_at, last_error)
+                        SELECT id, username, tweet, created_at, ?, ?, ? FROM outbox WHERE id = ?
+                    ''', (attempts, now, error, entry_id))
+                    conn.execute('DELETE FROM outbox WHERE id = ?', (entry_id,))
+                    return None
+
+                next_attempt_at = now + self.backoff(attempts)
+                conn.execute(
+                    'UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?',
+                    (attempts, next_attempt_at, error, entry_id)
+                )
+                return next_attempt_at
+
+    def pending_count(self) -> int:
+        """尚未发送成功的通知数量"""
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """最近移入死信表的通知"""
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT id, username, tweet, attempts, failed_at, last_error FROM dead_letters '
+                'ORDER BY failed_at DESC LIMIT ?', (limit,)
+            ).fetchall()
+        return [
+            {'id': entry_id, 'username': username, 'tweet': json.loads(tweet), 'attempts': attempts,
+             'failed_at': failed_at, 'last_error': last_error}
+            for entry_id, username, tweet, attempts, failed_at, last_error in rows
+        ]
+
+    def dead_letter_count(self) -> int:
+        """死信表中的通知数量"""
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM dead_letters').fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
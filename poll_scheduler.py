@@ -0,0 +1,199 @@
+"""
+自适应轮询调度模块
+根据每个账户的发推规律调整检查间隔，并控制全局请求频率
+"""
+import time
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
+
+
+def _parse_timestamp(timestamp: Optional[str]) -> Optional[float]:
+    """将推文的ISO时间转换为Unix时间戳"""
+    if not timestamp:
+        return None
+    try:
+        parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class AccountCadence:
+    """单个账户的发推规律：按小时（UTC）统计的发推次数和发推间隔的EWMA"""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.hour_histogram = [0.0] * 24
+        self.ewma_gap: Optional[float] = None
+        self.last_tweet_time: Optional[float] = None
+        # 下次应检查的时间
+        self.next_poll_at = 0.0
+
+    def observe(self, tweet_times: List[float]):
+        """记录新观察到的发推时间（只处理比已知最新推文更新的时间）"""
+        for tweet_time in sorted(tweet_times):
+            if self.last_tweet_time is not None and tweet_time <= self.last_tweet_time:
+                continue
+
+            hour = datetime.fromtimestamp(tweet_time, tz=timezone.utc).hour
+            self.hour_histogram[hour] += 1
+
+            if self.last_tweet_time is not None:
+                gap = tweet_time - self.last_tweet_time
+                if self.ewma_gap is None:
+                    self.ewma_gap = gap
+                else:
+                    self.ewma_gap = self.alpha * gap + (1 - self.alpha) * self.ewma_gap
+            self.last_tweet_time = tweet_time
+
+    def hour_activity(self, hour: int) -> Optional[float]:
+        """某个小时的发推量相对于平均每小时发推量的倍数，样本太少时返回 None"""
+        total = sum(self.hour_histogram)
+        if total < 5:
+            return None
+        return self.hour_histogram[hour] / (total / 24)
+
+
+class PollScheduler:
+    def __init__(self, min_interval: float = 30, max_interval: float = 600, default_interval: float = 60,
+                 requests_per_minute: float = 30, polls_per_gap: float = 4, ewma_alpha: float = 0.3):
+        """
+        初始化轮询调度器
+
+        发推频繁、当前处于活跃时段的账户检查得更勤，安静的账户检查得更少，
+        所有账户合计的请求数不超过全局预算。
+
+        Args:
+            min_interval: 单个账户的最短检查间隔（秒）
+            max_interval: 单个账户的最长检查间隔（秒）
+            default_interval: 还没有足够数据时的检查间隔（秒）
+            requests_per_minute: 所有账户合计每分钟最多检查次数
+            polls_per_gap: 在账户平均发推间隔内检查的次数
+            ewma_alpha: 发推间隔EWMA的平滑系数
+        """
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.default_interval = default_interval
+        self.requests_per_minute = requests_per_minute
+        self.polls_per_gap = polls_per_gap
+        self.ewma_alpha = ewma_alpha
+
+        self.accounts: Dict[str, AccountCadence] = {}
+        self.last_poll_at = 0.0
+
+    def _cadence(self, username: str) -> AccountCadence:
+        if username not in self.accounts:
+            self.accounts[username] = AccountCadence(self.ewma_alpha)
+        return self.accounts[username]
+
+    def add_accounts(self, usernames: List[str]):
+        """登记要调度的账户"""
+        for username in usernames:
+            self._cadence(username)
+
+    def observe(self, username: str, tweets: List[Dict[str, Any]]):
+        """根据时间线上的推文更新账户的发推规律（忽略置顶和转推，它们的时间不代表发推时间）"""
+        tweet_times = [
+            _parse_timestamp(tweet.get('timestamp'))
+            for tweet in tweets
+            if not tweet.get('is_pinned') and not tweet.get('is_retweet')
+        ]
+        self._cadence(username).observe([t for t in tweet_times if t is not None])
+
+    def interval_for(self, username: str, now: Optional[float] = None) -> float:
+        """
+        计算账户当前的检查间隔（未考虑全局预算）
+
+        以平均发推间隔的 1/polls_per_gap 为基础，活跃时段缩短、安静时段拉长，
+        最近刚发过推的账户按活跃处理。
+        """
+        now = time.time() if now is None else now
+        cadence = self._cadence(username)
+        if cadence.ewma_gap is None:
+            return min(max(self.default_interval, self.min_interval), self.max_interval)
+
+        interval = cadence.ewma_gap / self.polls_per_gap
+
+        activity = cadence.hour_activity(datetime.fromtimestamp(now, tz=timezone.utc).hour)
+        if activity is not None:
+            interval *= min(4.0, 1 / max(activity, 0.25))
+
+        # 距上一条推文不到一个平均间隔：可能正在连续发推
+        if cadence.last_tweet_time is not None and now - cadence.last_tweet_time < cadence.ewma_gap:
+            interval /= 2
+
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def budget_factor(self, now: Optional[float] = None) -> float:
+        """所有账户按各自间隔检查时超出全局预算的倍数（不超出时为1）"""
+        if not self.accounts or self.requests_per_minute <= 0:
+            return 1.0
+        rate_per_minute = sum(60 / self.interval_for(username, now) for username in self.accounts)
+        return max(1.0, rate_per_minute / self.requests_per_minute)
+
+    def record_poll(self, username: str, tweets: Optional[List[Dict[str, Any]]] = None,
+                    now: Optional[float] = None) -> float:
+        """
+        记录一次检查并安排该账户的下次检查
+
+        Args:
+            username: Twitter用户名
+            tweets: 本次检查看到的推文（用于学习发推规律）
+            now: 当前时间（测试用）
+
+        Returns:
+            该账户下次检查前的等待时间（秒）
+        """
+        now = time.time() if now is None else now
+        if tweets:
+            self.observe(username, tweets)
+
+        interval = self.interval_for(username, now) * self.budget_factor(now)
+        self._cadence(username).next_poll_at = now + interval
+        self.last_poll_at = now
+        return interval
+
+    def next_account(self, now: Optional[float] = None) -> Tuple[Optional[str], float]:
+        """
+        选出下一个要检查的账户
+
+        Returns:
+            (用户名, 需要等待的秒数)；没有账户时用户名为 None
+        """
+        if not self.accounts:
+            return None, self.default_interval
+
+        now = time.time() if now is None else now
+        username = min(self.accounts, key=lambda name: self.accounts[name].next_poll_at)
+        due = self.accounts[username].next_poll_at
+
+        # 任意两次检查之间至少间隔 60/requests_per_minute 秒
+        if self.requests_per_minute > 0 and self.last_poll_at:
+            due = max(due, self.last_poll_at + 60 / self.requests_per_minute)
+
+        return username, max(0.0, due - now)
+
+
+def poll_sequence(usernames: List[str], check_interval: float, scheduler: Optional[PollScheduler] = None):
+    """
+    按顺序产出下一个要检查的账户，需要等待时先休眠
+
+    没有调度器时每轮依次检查所有账户，每轮之间固定休眠 check_interval 秒；
+    有调度器时按各账户的下次检查时间和全局预算决定顺序与等待时间。
+    调用方在每次检查后应调用 scheduler.record_poll。
+    """
+    if scheduler is None:
+        while True:
+            yield from usernames
+            print(f"⏰ 等待 {check_interval} 秒后进行下一轮检查...")
+            time.sleep(check_interval)
+
+    scheduler.add_accounts(usernames)
+    while True:
+        username, wait = scheduler.next_account()
+        if wait > 0:
+            print(f"⏰ 等待 {wait:.0f} 秒后检查 @{username}...")
+            time.sleep(wait)
+        yield username
@@ -7,15 +7,176 @@ import signal
 import sys
 import logging
 import threading
+import multiprocessing
+import queue
 import psutil
 import os
+import json
+import socket
 from datetime import datetime
 from config_manager import ConfigManager
 from twitter_monitor import TwitterMonitor
-from email_sender import EmailSender
+from http_monitor import HttpTwitterMonitor
+from tweet_store import TweetStore
+from tweet_parser import list_target, search_target, search_targets_for_accounts, is_aggregate_target
+from poll_scheduler import PollScheduler
+from monitor_core import MonitorCore
+from lease_manager import LeaseManager, default_node_id
+from email_sender import EmailSender, parse_recipients
+from notification_queue import NotificationQueue, uses_digest
+from outbox import NotificationOutbox
 from i18n import i18n
 
 
+def create_monitor(config, user_data_suffix=""):
+    """
+    根据配置创建监听器：browser 使用Chrome，http 直接请求时间线接口
+    
+    Args:
+        config: 完整配置
+        user_data_suffix: Chrome用户数据目录的后缀（多个进程不能共用同一个目录）
+    """
+    twitter_config = config['twitter']
+    browser_config = config['browser']
+    
+    # 已见推文持久化存储，重启后从上次停止的位置继续
+    state_db_path = twitter_config.get('state_db_path', 'data/tweet_state.db')
+    tweet_store = TweetStore(state_db_path) if state_db_path else None
+    
+    if twitter_config.get('engine', 'browser') == 'http':
+        return HttpTwitterMonitor(twitter_config['auth_token'], tweet_store=tweet_store)
+    
+    user_data_dir = browser_config.get('user_data_dir') or None
+    if user_data_dir and user_data_suffix:
+        user_data_dir = user_data_dir.rstrip('/\\') + user_data_suffix
+    
+    return TwitterMonitor(
+        twitter_config['auth_token'], browser_config['headless'], browser_config.get('chrome_driver_path'),
+        tweet_store=tweet_store,
+        capture_mode=browser_config.get('capture_mode', 'dom'),
+        wait_timeouts=browser_config.get('wait_timeouts'),
+        live_refresh_interval=browser_config.get('live_refresh_interval', 300),
+        block_resources=browser_config.get('block_resources', True),
+        blocked_urls=browser_config.get('blocked_urls'),
+        user_data_dir=user_data_dir,
+        max_memory_mb=browser_config.get('max_memory_mb', 400),
+        recycle_after_polls=browser_config.get('recycle_after_polls', 0),
+        transfer_baseline_polls=browser_config.get('transfer_baseline_polls', 1)
+    )
+
+
+def create_scheduler(config):
+    """根据配置创建自适应轮询调度器，未启用时返回 None"""
+    adaptive_config = config['twitter'].get('adaptive_polling', {})
+    if not adaptive_config.get('enabled', False):
+        return None
+    return PollScheduler(
+        min_interval=adaptive_config.get('min_interval', 30),
+        max_interval=adaptive_config.get('max_interval', 600),
+        default_interval=config['twitter']['check_interval'],
+        requests_per_minute=adaptive_config.get('requests_per_minute', 30)
+    )
+
+
+def create_lease_manager(config, usernames, node_suffix=""):
+    """
+    多节点部署时创建账户租约管理器，未启用时返回 None
+    
+    Args:
+        config: 完整配置
+        usernames: 全部账户（各节点配置一致）
+        node_suffix: 节点ID后缀（同一容器中的多个工作进程各自作为一个节点）
+    """
+    cluster_config = config.get('cluster', {})
+    if not cluster_config.get('enabled', False):
+        return None
+    return LeaseManager(
+        cluster_config.get('lease_db_path', 'data/leases.db'),
+        usernames,
+        node_id=(cluster_config.get('node_id') or default_node_id()) + node_suffix,
+        ttl=cluster_config.get('lease_ttl', 60)
+    )
+
+
+def create_outbox(config):
+    """
+    创建持久化通知发件箱，未配置路径时返回 None
+    
+    多节点部署时每个节点使用自己的发件箱（路径加上节点ID或主机名），
+    避免多个节点重复发送同一条通知；主机名在容器重启后不变，重启后仍能继续发送。
+    """
+    system_config = config.get('system', {})
+    db_path = system_config.get('notification_outbox_path', 'data/outbox.db')
+    if not db_path:
+        return None
+    
+    cluster_config = config.get('cluster', {})
+    if cluster_config.get('enabled', False):
+        root, ext = os.path.splitext(db_path)
+        db_path = f"{root}-{cluster_config.get('node_id') or socket.gethostname()}{ext}"
+    return NotificationOutbox(
+        db_path,
+        max_attempts=system_config.get('notification_max_attempts', 8),
+        base_delay=system_config.get('notification_retry_base_delay', 30),
+        max_delay=system_config.get('notification_retry_max_delay', 3600)
+    )
+
+
+def shard_accounts(usernames, worker_processes):
+    """把账户轮流分配到各工作进程，返回非空的分片列表"""
+    shards = [usernames[index::worker_processes] for index in range(worker_processes)]
+    return [shard for shard in shards if shard]
+
+
+def run_shard_worker(shard_id, usernames, config, event_queue):
+    """
+    工作进程入口：监听一个分片的账户，新推文和检查进度通过队列上报给监督者进程
+    
+    Args:
+        shard_id: 分片编号
+        usernames: 该分片的账户
+        config: 完整配置
+        event_queue: 上报事件的队列，事件为 ('tweet', shard_id, username, tweet) 或 ('poll', shard_id, 时间)
+    """
+    # Ctrl+C 由监督者进程处理；收到 SIGTERM 时正常停止以关闭浏览器
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    monitor = create_monitor(config, f"-shard{shard_id}")
+    # 多节点部署时每个工作进程作为一个节点，通过租约表与其他进程和容器分配账户
+    lease_manager = create_lease_manager(config, usernames, f"-shard{shard_id}")
+    if lease_manager:
+        lease_manager.heartbeat()
+    core = MonitorCore(
+        monitor,
+        max_workers=config.get('system', {}).get('executor_workers', 4),
+        owns=lease_manager.owns if lease_manager else None
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: core.stop())
+    
+    def report_progress():
+        # 没有分到账户的节点没有检查活动，但仍是正常状态
+        idle = lease_manager is not None and not lease_manager.owned
+        event_queue.put(('poll', shard_id, time.time() if idle else monitor.last_successful_poll))
+    
+    # 每次检查的进度由监督者进程用于健康检查
+    check_interval = config['twitter']['check_interval']
+    core.add_periodic_task("上报检查进度", report_progress, max(5, check_interval // 2))
+    if lease_manager:
+        core.add_periodic_task("租约续期", lease_manager.heartbeat, lease_manager.ttl / 3)
+    try:
+        core.start(
+            usernames,
+            check_interval,
+            lambda username, tweet: event_queue.put(('tweet', shard_id, username, tweet)),
+            scheduler=create_scheduler(config),
+            max_tabs=config['twitter'].get('max_tabs', 4)
+        )
+    finally:
+        if lease_manager:
+            lease_manager.release_all()
+            lease_manager.close()
+
+
 class TwitterMonitorServer:
     def __init__(self, config_path=None, language="zh_CN"):
         """初始化服务器模式"""
@@ -29,8 +190,21 @@ class TwitterMonitorServer:
         self.config_manager = ConfigManager()
         self.config = self.config_manager.config
         
-        # 监控器实例
+        # 监控器实例及驱动它的异步核心
         self.monitor = None
+        self.core = None
+        # 多节点部署时的账户租约
+        self.lease_manager = None
+        # 新推文通知队列：监听回调只入队，邮件由工作线程发送
+        self.notifications = None
+        # 通知邮件发送器（复用SMTP连接）及创建它时的邮箱设置
+        self.email_sender = None
+        self.email_settings = None
+        self.email_sender_lock = threading.Lock()
+        # 多进程模式下的工作进程（分片编号 -> 进程）和事件队列
+        self.shard_processes = {}
+        self.event_queue = None
+        self.scheduler = None
         self.monitoring = False
         
         # 心跳监控相关
@@ -45,9 +219,10 @@ class TwitterMonitorServer:
         self.last_check_time = time.time()
         self.health_check_interval = 10  # 健康检查间隔（秒）
         
+        # 配置文件的修改时间，用于判断是否需要重新加载
+        self.config_mtime = None
+        
         # 监控状态
-        self.monitor_thread = None
-        self.monitor_thread_start_time = None
         self.last_tweet_check_time = None
         self.consecutive_failures = 0
         self.max_consecutive_failures = 5
@@ -98,38 +273,95 @@ class TwitterMonitorServer:
         self.stop_monitoring()
         sys.exit(0)
     
-    def start_heartbeat(self):
-        """启动心跳监控"""
-        self.logger.info("💓 心跳监控已启动")
+    def _heartbeat_tick(self) -> bool:
+        """执行一次心跳检查，返回是否正常"""
+        try:
+            # 检查程序状态
+            self._check_program_health()
+            
+            # 更新心跳时间
+            self.last_heartbeat = time.time()
+            
+            # 记录心跳状态
+            self.logger.info(f"💓 心跳正常 - 监控运行中{self._notification_summary()}")
+            
+            # 重置错误计数
+            self.error_count = 0
+            return True
+            
+        except Exception as e:
+            self.error_count += 1
+            error_msg = f"心跳检查出错: {str(e)}"
+            self.logger.error(f"❌ {error_msg}")
+            
+            # 如果错误次数过多，发送紧急通知
+            if self.error_count >= self.max_errors:
+                self._send_emergency_notification(error_msg)
+            return False
+    
+    def _notification_summary(self) -> str:
+        """通知队列的积压和发送延迟（用于心跳日志）"""
+        if not self.notifications:
+            return ""
+        stats = self.notifications.stats()
+        summary = f"，通知队列 {stats['depth']}/{stats['capacity']}，已发送 {stats['sent']}，失败 {stats['failed']}"
+        if stats['dropped']:
+            summary += f"，丢弃 {stats['dropped']}"
+        if stats['digests']:
+            summary += f"，汇总邮件 {stats['digests']}"
+        if stats.get('pending'):
+            summary += f"，发件箱待发送 {stats['pending']}"
+        if stats.get('dead_letters'):
+            summary += f"，死信 {stats['dead_letters']}"
+        if stats['avg_latency'] is not None:
+            summary += f"，平均延迟 {stats['avg_latency']:.1f}秒（最长 {stats['max_latency']:.1f}秒）"
+        if stats['depth'] >= stats['capacity'] * 0.8:
+            self.logger.warning("⚠️ 通知队列接近满载，邮件发送跟不上新推文")
+        return summary
+    
+    def _reload_config(self):
+        """配置文件修改后重新加载；邮箱设置和检查间隔立即生效，其余设置需要重启"""
+        config_file = self.config_manager.config_file
+        try:
+            mtime = os.path.getmtime(config_file)
+        except OSError:
+            return
+        if self.config_mtime is None:
+            self.config_mtime = mtime
+            return
+        if mtime == self.config_mtime:
+            return
         
-        while self.monitoring:
-            try:
-                # 检查程序状态
-                self._check_program_health()
-                
-                # 更新心跳时间
-                self.last_heartbeat = time.time()
-                
-                # 记录心跳状态
-                self.logger.info("💓 心跳正常 - 监控运行中")
-                
-                # 重置错误计数
-                self.error_count = 0
-                
-                # 等待下次心跳
-                time.sleep(self.heartbeat_interval)
-                
-            except Exception as e:
-                self.error_count += 1
-                error_msg = f"心跳检查出错: {str(e)}"
-                self.logger.error(f"❌ {error_msg}")
-                
-                # 如果错误次数过多，发送紧急通知
-                if self.error_count >= self.max_errors:
-                    self._send_emergency_notification(error_msg)
-                
-                # 等待一段时间后继续
-                time.sleep(5)
+        # 直接解析文件：load_config 解析失败时返回默认配置，不能用来替换正在使用的配置。
+        # 文件保存到一半或格式错误时保留当前配置，也不记录修改时间，下次检查时重试
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                new_config = json.load(f)
+            if not isinstance(new_config, dict):
+                raise ValueError("配置文件的顶层不是对象")
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"⚠️ 配置文件无法解析，继续使用当前配置: {e}")
+            return
+        self.config_mtime = mtime
+        
+        old_twitter = self.config['twitter']
+        new_twitter = new_config.get('twitter', {})
+        
+        # 就地更新，已持有 self.config 引用的代码也能看到新值
+        self.config['email'] = new_config.get('email', self.config['email'])
+        check_interval = new_twitter.get('check_interval', old_twitter['check_interval'])
+        if check_interval != old_twitter['check_interval']:
+            old_twitter['check_interval'] = check_interval
+            self.heartbeat_interval = max(10, check_interval // 2)
+            if self.core:
+                self.core.check_interval = check_interval
+            self.logger.info(f"🔄 检查间隔已更新为 {check_interval} 秒")
+        
+        for key in ('username', 'usernames', 'lists', 'searches', 'search_combine_accounts',
+                    'auth_token', 'engine'):
+            if new_twitter.get(key) != old_twitter.get(key):
+                self.logger.warning(f"⚠️ 配置项 twitter.{key} 已修改，重启后生效")
+        self.logger.info("🔄 配置已重新加载")
     
     def _check_program_health(self):
         """检查程序健康状态"""
@@ -139,26 +371,15 @@ class TwitterMonitorServer:
         if current_time - self.last_heartbeat > self.heartbeat_interval * 2:
             raise Exception("心跳间隔异常")
         
-        # 2. 检查监控线程状态
-        if self.monitor_thread:
-            if not self.monitor_thread.is_alive():
-                raise Exception("监控线程已停止运行")
-            
-            # 检查线程运行时间
-            if self.monitor_thread_start_time:
-                thread_runtime = current_time - self.monitor_thread_start_time
-                if thread_runtime > 3600:  # 1小时
-                    self.logger.warning(f"监控线程运行时间过长: {thread_runtime:.0f}秒")
-        
-        # 3. 检查监控器实例状态
+        # 2. 检查监控器实例状态
         if self.monitor:
             if not hasattr(self.monitor, 'monitoring') or not self.monitor.monitoring:
                 raise Exception("监控器状态异常")
         
-        # 4. 检查进程资源使用
+        # 3. 检查进程资源使用
         self._check_process_health()
         
-        # 5. 检查监控活动
+        # 4. 检查监控活动
         self._check_monitoring_activity()
     
     def _check_process_health(self):
@@ -187,10 +408,18 @@ class TwitterMonitorServer:
         """检查监控活动状态"""
         current_time = time.time()
         
+        # 监听器每次成功检查（无论是否发现新推文）都会更新 last_successful_poll
+        last_poll = getattr(self.monitor, 'last_successful_poll', None) if self.monitor else None
+        if last_poll:
+            self.last_tweet_check_time = max(self.last_tweet_check_time or 0, last_poll)
+        
         # 检查是否有正常的推文检查活动
         if self.last_tweet_check_time:
             time_since_last_check = current_time - self.last_tweet_check_time
             expected_interval = self.config['twitter']['check_interval']
+            if self.scheduler:
+                # 自适应调度时单个账户的间隔最长可到 max_interval
+                expected_interval = max(expected_interval, self.scheduler.max_interval)
             
             # 如果超过预期检查间隔的2倍，可能有问题
             if time_since_last_check > expected_interval * 2:
@@ -301,42 +530,87 @@ Twitter Monitor v1.0
             info.append(f"CPU使用率: {cpu_percent:.1f}%")
             info.append(f"内存使用: {memory_mb:.1f}MB")
             
-            # 线程信息
-            if self.monitor_thread:
-                info.append(f"监控线程状态: {'运行中' if self.monitor_thread.is_alive() else '已停止'}")
-            
             return "\n".join(info)
             
         except Exception as e:
             return f"获取系统信息失败: {e}"
     
     def on_new_tweet(self, username: str, tweet: dict):
-        """新推文回调函数"""
-        # 更新最后检查时间
-        self.last_tweet_check_time = time.time()
-        
+        """新推文回调函数：只放入通知队列，不等待邮件发送"""
         self.logger.info(f"🆕 发现新推文: {tweet['text'][:100]}...")
         
-        # 发送邮件通知
+        if self.notifications:
+            self.notifications.put(username, tweet)
+        else:
+            self._send_notification(username, tweet)
+    
+    def _recipients_for(self, username: str) -> list:
+        """某个账户的新推文通知的收件人：account_recipients 中指定的列表，未指定时为 receiver_email"""
         email_config = self.config['email']
-        email_sender = EmailSender(
-            email_config['smtp_server'],
-            int(email_config['smtp_port']),
-            email_config['sender_email'],
-            email_config['sender_password'],
-            email_config.get('use_ssl', True),
-            email_config.get('use_tls', False)
-        )
+        account_recipients = {
+            name.lstrip('@').lower(): receivers
+            for name, receivers in email_config.get('account_recipients', {}).items()
+        }
+        return parse_recipients(account_recipients.get(username.lower()) or email_config['receiver_email'])
+    
+    def _send_notification(self, username: str, tweet: dict) -> bool:
+        """发送新推文的邮件通知（在通知队列的工作线程中执行），失败时抛出 RuntimeError"""
+        email_sender = self._get_email_sender()
         
         if email_sender.send_notification(
-            email_config['receiver_email'],
+            self._recipients_for(username),
             username,
             tweet['text'],
             tweet.get('url')
         ):
             self.logger.info("✅ 邮件通知已发送")
-        else:
-            self.logger.error("❌ 邮件发送失败")
+            return True
+        self.logger.error("❌ 邮件发送失败")
+        # 抛出失败原因，由通知队列记录到发件箱并安排重试
+        raise RuntimeError(email_sender.last_error or "邮件发送失败")
+    
+    def _send_digest(self, tweets: list) -> bool:
+        """
+        把多条新推文合并成一封汇总邮件发送（在通知队列的工作线程中执行），失败时抛出 RuntimeError
+        
+        通知队列已按收件人分组，同一批推文的收件人相同。
+        """
+        email_sender = self._get_email_sender()
+        
+        if email_sender.send_digest(self._recipients_for(tweets[0][0]), tweets):
+            self.logger.info(f"✅ 汇总邮件通知已发送（{len(tweets)} 条推文）")
+            return True
+        self.logger.error("❌ 汇总邮件发送失败")
+        raise RuntimeError(email_sender.last_error or "汇总邮件发送失败")
+    
+    def _uses_digest(self, username: str) -> bool:
+        """按当前邮箱配置判断账户的新推文是否汇总发送（配置重新加载后立即生效）"""
+        return uses_digest(self.config['email'].get('digest', {}), username)
+    
+    def _get_email_sender(self) -> EmailSender:
+        """按当前邮箱配置取得发送器；配置不变时复用同一个发送器及其持久连接"""
+        email_config = self.config['email']
+        settings = (
+            email_config['smtp_server'],
+            int(email_config['smtp_port']),
+            email_config['sender_email'],
+            email_config['sender_password'],
+            email_config.get('use_ssl', True),
+            email_config.get('use_tls', False)
+        )
+        with self.email_sender_lock:
+            if self.email_sender is None or self.email_settings != settings:
+                # 配置重载后邮箱设置变化，关闭旧连接
+                if self.email_sender:
+                    self.email_sender.close()
+                self.email_sender = EmailSender(
+                    *settings,
+                    persistent=email_config.get('persistent_connection', True),
+                    idle_timeout=email_config.get('idle_timeout', 60),
+                    max_recipients=email_config.get('max_recipients_per_message', 50)
+                )
+                self.email_settings = settings
+            return self.email_sender
     
     def start_monitoring(self):
         """开始监控"""
@@ -344,13 +618,29 @@ Twitter Monitor v1.0
             # 获取配置
             twitter_config = self.config['twitter']
             username = twitter_config['username']
+            usernames = [username] + list(twitter_config.get('usernames', []))
+            usernames = list(dict.fromkeys(u.strip().lstrip('@') for u in usernames if u and u.strip()))
+            # 列表模式：每个列表一次加载覆盖全部成员，新推文按作者通知
+            for list_ref in twitter_config.get('lists', []):
+                target = list_target(list_ref)
+                if target:
+                    usernames.append(target)
+                else:
+                    self.logger.warning(f"⚠️ 无法识别的列表: {list_ref}")
+            # 搜索模式：把全部账户合并为 from:a OR from:b 查询，或监听自定义的搜索语句
+            if twitter_config.get('search_combine_accounts', False):
+                accounts = [u for u in usernames if not is_aggregate_target(u)]
+                usernames = [u for u in usernames if is_aggregate_target(u)] + search_targets_for_accounts(accounts)
+            for query in twitter_config.get('searches', []):
+                target = search_target(query)
+                if target:
+                    usernames.append(target)
+            usernames = list(dict.fromkeys(usernames))
             auth_token = twitter_config['auth_token']
             check_interval = twitter_config['check_interval']
-            headless = self.config['browser']['headless']
-            chrome_driver_path = self.config['browser'].get('chrome_driver_path')
             
             # 验证配置
-            if not username:
+            if not usernames:
                 raise ValueError("Twitter用户名未配置")
             if not auth_token:
                 raise ValueError("Twitter Auth Token未配置")
@@ -358,35 +648,203 @@ Twitter Monitor v1.0
             # 更新心跳间隔
             self.heartbeat_interval = max(10, check_interval // 2)
             
-            self.logger.info(f"🚀 开始监控 @{username}")
+            self.logger.info(f"🚀 开始监控 {', '.join('@' + u for u in usernames)}")
             self.logger.info(f"检查间隔: {check_interval}秒")
             self.logger.info(f"心跳间隔: {self.heartbeat_interval}秒")
             
-            # 创建监控器
-            self.monitor = TwitterMonitor(auth_token, headless, chrome_driver_path)
+            if twitter_config.get('engine', 'browser') == 'http':
+                self.logger.info("监听引擎: HTTP")
+            
+            # 自适应轮询：按各账户的发推规律调整检查间隔
+            self.scheduler = create_scheduler(self.config)
+            if self.scheduler:
+                self.logger.info("自适应轮询: 已启用")
             self.monitoring = True
             
-            # 启动心跳监控（在后台线程中）
-            heartbeat_thread = threading.Thread(target=self.start_heartbeat, daemon=True)
-            heartbeat_thread.start()
+            system_config = self.config.get('system', {})
+            # 发送失败的通知按退避时间重试，上次运行未发送完的通知在启动后继续发送
+            outbox = create_outbox(self.config)
+            if outbox:
+                self.logger.info(f"通知发件箱: {outbox.db_path}")
+            # 汇总模式：等待时间和条数在启动时读取，是否启用和各账户的策略随配置重新加载生效
+            digest_config = self.config['email'].get('digest', {})
+            if digest_config.get('enabled', False):
+                self.logger.info(f"汇总通知: {digest_config.get('window', 60)}秒或{digest_config.get('max_tweets', 10)}条")
+            self.notifications = NotificationQueue(
+                self._send_notification,
+                workers=system_config.get('notification_workers', 1),
+                maxsize=system_config.get('notification_queue_size', 100),
+                outbox=outbox,
+                send_digest_func=self._send_digest,
+                digest_window=digest_config.get('window', 60),
+                digest_max=digest_config.get('max_tweets', 10),
+                digest_policy=self._uses_digest,
+                # 收件人不同的账户分别汇总，一组发送失败不会让已送达的组重发
+                digest_group=lambda name: tuple(self._recipients_for(name))
+            )
+            self.notifications.start()
+            # 从启动开始计时，一直没有成功检查也会被健康检查发现
+            self.last_tweet_check_time = time.time()
+            
+            # 多进程模式：账户分片到多个工作进程，每个进程有自己的浏览器
+            worker_processes = self.config.get('system', {}).get('worker_processes', 0)
+            if worker_processes > 1 and len(usernames) > 1:
+                self.run_supervisor(usernames, worker_processes)
+                return
+            
+            # 创建监控器：browser 使用Chrome，http 直接请求时间线接口
+            self.monitor = create_monitor(self.config)
+            
+            # 多节点部署：各节点通过租约表分配账户，只检查本节点持有租约的账户
+            self.lease_manager = create_lease_manager(self.config, usernames)
+            if self.lease_manager:
+                owned = self.lease_manager.heartbeat()
+                self.logger.info(f"多节点模式: 节点 {self.lease_manager.node_id}，"
+                                 f"存活节点 {self.lease_manager.live_nodes} 个，本节点持有 {len(owned)} 个账户")
             
-            # 开始监控
-            self.monitor.start_monitoring(
-                username,
-                check_interval,
-                self.on_new_tweet
+            # 轮询、通知、心跳和配置重载都作为同一个事件循环中的任务运行
+            self.core = MonitorCore(
+                self.monitor,
+                max_workers=system_config.get('executor_workers', 4),
+                owns=self.lease_manager.owns if self.lease_manager else None
             )
+            self.core.add_periodic_task("心跳检查", self._heartbeat_tick, lambda: self.heartbeat_interval)
+            reload_interval = system_config.get('config_reload_interval', 30)
+            if reload_interval:
+                self.core.add_periodic_task("配置重载", self._reload_config, reload_interval)
+            if self.lease_manager:
+                self.core.add_periodic_task("租约续期", self._lease_tick, self.lease_manager.ttl / 3)
+            
+            # 开始监控（多个账户时共用一个浏览器的标签页池），阻塞直到停止
+            try:
+                self.core.start(
+                    usernames,
+                    check_interval,
+                    self.on_new_tweet,
+                    scheduler=self.scheduler,
+                    max_tabs=twitter_config.get('max_tabs', 4)
+                )
+            finally:
+                if self.lease_manager:
+                    # 立即释放租约，其他节点不必等待过期就能接手
+                    self.lease_manager.release_all()
+                    self.lease_manager.close()
             
         except Exception as e:
             self.logger.error(f"❌ 启动监控失败: {str(e)}")
             raise
     
+    def run_supervisor(self, usernames, worker_processes):
+        """
+        监督者模式：把账户分片到多个工作进程，在本进程中统一发送通知
+        
+        每个工作进程有自己的浏览器和事件循环，通过队列上报新推文和检查进度；
+        某个工作进程退出时只重启该分片。
+        
+        Args:
+            usernames: Twitter用户名列表
+            worker_processes: 工作进程数
+        """
+        context = multiprocessing.get_context('spawn')
+        self.event_queue = context.Queue()
+        if self.config.get('cluster', {}).get('enabled', False):
+            # 多节点部署时由租约表分配账户，每个工作进程都拿到全部账户并作为一个节点认领
+            shards = [usernames] * worker_processes
+        else:
+            shards = shard_accounts(usernames, worker_processes)
+        
+        def spawn(shard_id):
+            process = context.Process(
+                target=run_shard_worker,
+                args=(shard_id, shards[shard_id], self.config, self.event_queue),
+                name=f"shard-{shard_id}",
+                daemon=True
+            )
+            process.start()
+            self.logger.info(f"🧩 分片 {shard_id} 已启动 (PID {process.pid}): "
+                             f"{', '.join('@' + u for u in shards[shard_id])}")
+            return process
+        
+        self.shard_processes = {shard_id: spawn(shard_id) for shard_id in range(len(shards))}
+        restart_at = {}
+        next_heartbeat = time.time() + self.heartbeat_interval
+        
+        while self.monitoring:
+            # 通知阶段：处理工作进程上报的事件
+            try:
+                event = self.event_queue.get(timeout=1)
+            except queue.Empty:
+                event = None
+            
+            if event and event[0] == 'tweet':
+                _, shard_id, username, tweet = event
+                try:
+                    self.on_new_tweet(username, tweet)
+                except Exception as e:
+                    self.logger.error(f"❌ 处理新推文通知出错: {str(e)}")
+            elif event and event[0] == 'poll':
+                _, shard_id, last_poll = event
+                if last_poll:
+                    self.last_tweet_check_time = max(self.last_tweet_check_time or 0, last_poll)
+            
+            if not self.monitoring:
+                break
+            
+            # 只重启退出的分片（等待几秒，避免反复崩溃时空转）
+            now = time.time()
+            for shard_id, process in list(self.shard_processes.items()):
+                if process.is_alive():
+                    continue
+                if shard_id not in restart_at:
+                    self.logger.error(f"❌ 分片 {shard_id} 已退出 (退出码 {process.exitcode})，5秒后重启")
+                    restart_at[shard_id] = now + 5
+                elif now >= restart_at[shard_id]:
+                    del restart_at[shard_id]
+                    self.shard_processes[shard_id] = spawn(shard_id)
+            
+            if now >= next_heartbeat:
+                self._heartbeat_tick()
+                next_heartbeat = now + self.heartbeat_interval
+    
+    def _lease_tick(self):
+        """续期账户租约；本节点没有分到账户时没有检查活动，但仍是正常状态"""
+        if not self.lease_manager.heartbeat():
+            self.last_tweet_check_time = time.time()
+    
+    def _stop_shards(self):
+        """结束全部工作进程（先请求退出以便关闭浏览器，超时后强制结束）"""
+        for process in self.shard_processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.shard_processes.values():
+            process.join(timeout=15)
+            if process.is_alive():
+                process.kill()
+        self.shard_processes = {}
+    
     def stop_monitoring(self):
         """停止监控"""
+        if self.shard_processes:
+            self.logger.info("⏹️ 正在停止工作进程...")
+            self._stop_shards()
+        if self.core:
+            self.core.stop()
         if self.monitor:
             self.logger.info("⏹️ 正在停止监控...")
             self.monitor.monitoring = False
             self.monitor.stop_monitoring()
+        if self.notifications:
+            # 已发现的新推文发送完再退出
+            if self.notifications.depth():
+                self.logger.info(f"📤 正在发送剩余的 {self.notifications.depth()} 条通知...")
+            self.notifications.stop(timeout=30)
+            if self.notifications.outbox:
+                pending = self.notifications.outbox.pending_count()
+                if pending:
+                    self.logger.info(f"📥 {pending} 条通知保留在发件箱中，下次启动后继续发送")
+                self.notifications.outbox.close()
+        if self.email_sender:
+            self.email_sender.close()
         
         self.monitoring = False
         self.logger.info("✅ 监控已停止")
@@ -0,0 +1,39 @@
+"""
+SQLite连接模块
+已见推文库、通知发件箱和账户租约表共用的数据库打开方式
+"""
+import os
+import sqlite3
+from typing import Iterable
+
+# 其他线程或进程持有写锁时最多等待的秒数
+BUSY_TIMEOUT = 10
+
+
+def open_database(db_path: str, schema: Iterable[str] = (), autocommit: bool = False) -> sqlite3.Connection:
+    """
+    打开SQLite数据库并创建表
+
+    自动创建所在目录；使用WAL模式，读写可以并发，多个进程可以共用同一个数据库文件。
+    连接允许在多个线程中使用，调用方需要自行加锁。
+
+    Args:
+        db_path: 数据库文件路径
+        schema: 建表、建索引语句，打开后依次执行
+        autocommit: 为 True 时不自动开启事务，由调用方显式管理（例如 BEGIN IMMEDIATE）
+
+    Returns:
+        数据库连接
+    """
+    directory = os.path.dirname(db_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                           isolation_level=None if autocommit else '')
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    for statement in schema:
+        conn.execute(statement)
+    conn.commit()
+    return conn
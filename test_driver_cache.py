@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ChromeDriver缓存测试脚本
+在临时目录中测试版本索引的登记和查找（不访问网络）
+"""
+import os
+import tempfile
+
+
+def test_cached_lookup():
+    """测试按Chrome主版本号查找缓存"""
+    print("🔍 测试ChromeDriver缓存查找...")
+
+    try:
+        from driver_cache import register_driver, find_cached_driver, load_index, refresh_in_background
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            assert find_cached_driver("120.0.6099.130", cache_dir) is None
+            print("✅ 空缓存 - OK")
+
+            driver_dir = os.path.join(cache_dir, "120.0.6099.109")
+            os.makedirs(driver_dir)
+            driver_path = os.path.join(driver_dir, "chromedriver")
+            with open(driver_path, 'w') as f:
+                f.write("")
+            register_driver(cache_dir, "120", "120.0.6099.109", driver_path)
+
+            # 同一主版本的其他小版本也使用该驱动
+            assert find_cached_driver("120.0.6099.200", cache_dir) == os.path.abspath(driver_path)
+            assert find_cached_driver("121.0.6167.85", cache_dir) is None
+            print("✅ 主版本号匹配 - OK")
+
+            # 索引保存相对路径，缓存目录可以整体移动
+            assert load_index(cache_dir)["120"]["path"] == os.path.join("120.0.6099.109", "chromedriver")
+            print("✅ 版本索引 - OK")
+
+            # 刚检查过的版本不会再启动后台刷新
+            assert refresh_in_background("120.0.6099.130", cache_dir) is None
+            print("✅ 后台刷新间隔 - OK")
+
+            # 驱动文件被删除后不再使用缓存
+            os.remove(driver_path)
+            assert find_cached_driver("120.0.6099.130", cache_dir) is None
+            print("✅ 缺失文件检测 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ ChromeDriver缓存测试失败: {e}")
+        return False
+
+
+def test_resolve_offline():
+    """测试启动时优先使用PATH和缓存中的驱动，不访问网络"""
+    print("\n🔍 测试离线解析ChromeDriver...")
+
+    import driver_cache
+    original = (driver_cache.get_chrome_version, driver_cache.fetch_latest_driver_version,
+                driver_cache._driver_platform, driver_cache.refresh_in_background, os.environ.get('PATH', ''))
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("启动时访问了网络")
+
+    try:
+        from driver_cache import register_driver, resolve_driver_path
+
+        driver_cache.fetch_latest_driver_version = no_network
+        with tempfile.TemporaryDirectory() as cache_dir, tempfile.TemporaryDirectory() as bin_dir:
+            filename = driver_cache._driver_filename()
+            path_driver = os.path.join(bin_dir, filename)
+            with open(path_driver, 'w') as f:
+                f.write("")
+            os.chmod(path_driver, 0o755)
+            os.environ['PATH'] = bin_dir
+
+            # 检测不到Chrome版本：使用PATH中的驱动
+            driver_cache.get_chrome_version = lambda: None
+            assert os.path.abspath(resolve_driver_path(cache_dir)) == os.path.abspath(path_driver)
+            print("✅ PATH中的ChromeDriver - OK")
+
+            # PATH中没有时使用缓存中的任意版本
+            os.environ['PATH'] = ''
+            driver_dir = os.path.join(cache_dir, "120.0.6099.109")
+            os.makedirs(driver_dir)
+            cached_driver = os.path.join(driver_dir, filename)
+            with open(cached_driver, 'w') as f:
+                f.write("")
+            register_driver(cache_dir, "120", "120.0.6099.109", cached_driver)
+            assert resolve_driver_path(cache_dir) == os.path.abspath(cached_driver)
+            print("✅ 版本未知时使用缓存 - OK")
+
+            # 主版本匹配的缓存优先，不启动后台刷新（刚登记过）
+            driver_cache.get_chrome_version = lambda: "120.0.6099.200"
+            os.environ['PATH'] = bin_dir
+            assert resolve_driver_path(cache_dir) == os.path.abspath(cached_driver)
+            print("✅ 匹配的缓存优先 - OK")
+
+            # Chrome for Testing 没有本机平台的构建（例如 Linux aarch64）：只用PATH中的驱动，不在后台缓存
+            driver_cache._driver_platform = lambda: None
+            driver_cache.refresh_in_background = no_network
+            assert os.path.abspath(resolve_driver_path(cache_dir)) == os.path.abspath(path_driver)
+            print("✅ 没有对应平台的构建时使用PATH - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 离线解析ChromeDriver测试失败: {e}")
+        return False
+
+    finally:
+        (driver_cache.get_chrome_version, driver_cache.fetch_latest_driver_version,
+         driver_cache._driver_platform, driver_cache.refresh_in_background, os.environ['PATH']) = original
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 ChromeDriver缓存测试")
+    print("=" * 60)
+
+    tests = [
+        ("ChromeDriver缓存查找", test_cached_lookup),
+        ("离线解析ChromeDriver", test_resolve_offline),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -199,6 +199,23 @@ def test_error_detection_scenarios():
             print(f"    ❌ 资源使用监控异常: {e}")
             return False
         
+        # 场景3: 没有新推文但检查正常进行
+        print("  测试场景3: 无新推文时的检查活动...")
+        
+        class IdleMonitor:
+            monitoring = True
+            last_successful_poll = time.time()
+        
+        server.monitor = IdleMonitor()
+        server.consecutive_failures = 4
+        server.last_tweet_check_time = time.time() - 200
+        server._check_monitoring_activity()
+        if server.consecutive_failures == 0:
+            print("    ✅ 按最近一次成功检查判断 - OK")
+        else:
+            print("    ❌ 未使用最近一次成功检查的时间")
+            return False
+        
         return True
         
     except Exception as e:
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP监听引擎测试脚本
+使用本地模拟服务器测试时间线拉取、条件请求和新推文检测
+"""
+import copy
+import gzip
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse
+
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "user_tweets.json")
+
+
+class StubTwitterHandler(BaseHTTPRequestHandler):
+    """模拟 UserByScreenName / UserTweets 接口"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, headers=None):
+        body = gzip.compress(json.dumps(payload).encode('utf-8'))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers)
+
+        cookies = self.headers.get('Cookie', '')
+        csrf_token = self.headers.get('x-csrf-token')
+        if 'auth_token=stub_token' not in cookies or not csrf_token or f'ct0={csrf_token}' not in cookies:
+            self.send_response(403)
+            self.end_headers()
+            return
+
+        path = urlparse(self.path).path
+        if path.endswith('/UserByScreenName'):
+            self._send_json({'data': {'user': {'result': {'rest_id': '1000'}}}})
+        elif path.endswith('/UserTweets'):
+            etag = f'"v{server.version}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self._send_json(server.payload, {'ETag': etag})
+        else:
+            self.send_response(404)
+            self.end_headers()
+
+
+def start_stub_server(payload):
+    """在后台线程启动模拟服务器"""
+    server = HTTPServer(('127.0.0.1', 0), StubTwitterHandler)
+    server.payload = payload
+    server.version = 1
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_http_polling():
+    """测试HTTP引擎的轮询和新推文检测"""
+    print("🔍 测试HTTP监听引擎...")
+
+    try:
+        from http_monitor import HttpTwitterMonitor
+
+        with open(FIXTURE_PATH, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+
+        server = start_stub_server(payload)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            monitor = HttpTwitterMonitor("stub_token", base_url=base_url)
+            monitor.select_account("example")
+
+            # 首次轮询只记录初始推文
+            assert monitor.check_for_new_tweets() == []
+            assert 'gzip' in server.requests[-1].get('Accept-Encoding', '')
+            print("✅ 记录初始推文 - OK")
+
+            # 按 Content-Length 统计压缩后的传输字节数
+            assert monitor.last_poll_bytes == len(gzip.compress(json.dumps(payload).encode('utf-8')))
+            print("✅ 统计压缩后的传输字节数 - OK")
+
+            # 时间线未变化：服务器返回304
+            assert monitor.check_for_new_tweets() == []
+            assert server.requests[-1].get('If-None-Match') == '"v1"'
+            assert monitor.last_poll_bytes == 0
+            print("✅ 条件请求304 - OK")
+
+            # 新增两条推文
+            updated = copy.deepcopy(payload)
+            entries = updated['data']['user']['result']['timeline_v2']['timeline']['instructions'][2]['entries']
+            for tweet_id in (1820000000000000000, 1830000000000000000):
+                entry = copy.deepcopy(entries[0])
+                result = entry['content']['itemContent']['tweet_results']['result']
+                result['rest_id'] = str(tweet_id)
+                result['legacy']['id_str'] = str(tweet_id)
+                result['legacy']['full_text'] = f"新推文 {tweet_id}"
+                entries.insert(0, entry)
+            server.payload = updated
+            server.version = 2
+
+            new_tweets = monitor.check_for_new_tweets()
+            assert [t['id'] for t in new_tweets] == [1820000000000000000, 1830000000000000000]
+            print("✅ 检测多条新推文 - OK")
+
+            # 同一个会话复用连接
+            assert monitor.session is not None
+            print(f"✅ 累计传输 {monitor.total_bytes} 字节 - OK")
+
+            monitor.stop_monitoring()
+        finally:
+            server.shutdown()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ HTTP监听引擎测试失败: {e}")
+        return False
+
+
+def test_invalid_token():
+    """测试无效Token"""
+    print("\n🔍 测试无效Token...")
+
+    try:
+        from http_monitor import HttpTwitterMonitor
+
+        server = start_stub_server({})
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            monitor = HttpTwitterMonitor("wrong_token", base_url=base_url)
+            assert monitor.resolve_user_id("example") is None
+            print("✅ 无效Token识别 - OK")
+            monitor.stop_monitoring()
+        finally:
+            server.shutdown()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 无效Token测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 HTTP监听引擎测试")
+    print("=" * 60)
+
+    tests = [
+        ("HTTP轮询", test_http_polling),
+        ("无效Token", test_invalid_token),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
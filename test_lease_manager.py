@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多节点租约测试脚本
+在临时数据库中用固定的时间点模拟节点加入、失联和退出
+"""
+import os
+import tempfile
+
+
+def test_rebalance():
+    """测试节点加入和失联后的账户分配"""
+    print("🔍 测试租约分配...")
+
+    try:
+        from lease_manager import LeaseManager
+
+        accounts = ["a", "b", "c", "d", "e"]
+        now = 1_720_000_000
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "leases.db")
+            node1 = LeaseManager(db_path, accounts, node_id="node1", ttl=60)
+            node2 = LeaseManager(db_path, accounts, node_id="node2", ttl=60)
+
+            # 只有一个节点时认领全部账户
+            assert node1.heartbeat(now) == set(accounts)
+            assert node1.owns("a", now)
+            print("✅ 单节点认领全部账户 - OK")
+
+            # 新节点加入：先登记，原节点让出多余账户后由新节点认领
+            assert node2.heartbeat(now + 1) == set()
+            owned1 = node1.heartbeat(now + 2)
+            owned2 = node2.heartbeat(now + 3)
+            assert len(owned1) == 3 and len(owned2) == 2
+            assert owned1.isdisjoint(owned2) and owned1 | owned2 == set(accounts)
+            print("✅ 新节点加入后重新分配 - OK")
+
+            # 节点失联：停止续期后先于租约过期认为自己已失去租约
+            assert not node1.owns(sorted(owned1)[0], now + 2 + 50)
+            # 租约过期后由存活的节点接手全部账户
+            assert node2.heartbeat(now + 70) == set(accounts)
+            print("✅ 节点失联后接手 - OK")
+
+            # 正常退出时立即释放，其他节点下一次心跳即可认领
+            node2.release_all()
+            assert node1.heartbeat(now + 71) == set(accounts)
+            print("✅ 退出时释放租约 - OK")
+
+            node1.close()
+            node2.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 租约分配测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 多节点租约测试")
+    print("=" * 60)
+
+    tests = [
+        ("租约分配", test_rebalance),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,13 +35,6 @@ def test_imports():
         print("❌ selenium.webdriver - 导入失败")
         modules_ok = False
     
-    try:
-        import webdriver_manager
-        print("✅ webdriver_manager - OK")
-    except ImportError:
-        print("❌ webdriver_manager - 未安装，请运行: pip install webdriver-manager")
-        modules_ok = False
-    
     # 测试自定义模块
     try:
         import config_manager
@@ -139,8 +132,8 @@ def test_chrome_driver():
     try:
         from selenium import webdriver
         from selenium.webdriver.chrome.options import Options
-        from webdriver_manager.chrome import ChromeDriverManager
         from selenium.webdriver.chrome.service import Service
+        from driver_cache import resolve_driver_path
         
         print("正在检查Chrome驱动...")
         
@@ -152,7 +145,11 @@ def test_chrome_driver():
         
         # 尝试创建驱动（仅测试，立即关闭）
         try:
-            service = Service(ChromeDriverManager().install())
+            driver_path = resolve_driver_path(background_refresh=False)
+            if not driver_path:
+                print("❌ 未找到可用的ChromeDriver，请运行 setup_chromedriver.py")
+                return False
+            service = Service(driver_path)
             driver = webdriver.Chrome(service=service, options=options)
             driver.quit()
             print("✅ Chrome驱动 - OK")
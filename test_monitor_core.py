@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步监控核心测试脚本
+使用模拟监听器测试轮询任务、通知任务、周期任务和取消
+"""
+import asyncio
+import threading
+import time
+
+
+class FakeMonitor:
+    """模拟监听器：每个账户第二次检查时发现一条新推文"""
+
+    def __init__(self):
+        self.tracker = None
+        self.polls = {}
+        self.threads = set()
+        self.stopped = False
+
+    def prepare(self, usernames, max_tabs=4):
+        return list(usernames)
+
+    def poll_account(self, username):
+        self.threads.add(threading.current_thread().name)
+        self.polls[username] = self.polls.get(username, 0) + 1
+        if self.polls[username] == 2:
+            return [{'id': 1, 'text': f'@{username} 的新推文'}]
+        return []
+
+    def stop_monitoring(self):
+        self.stopped = True
+
+
+def test_polling_and_cancel():
+    """测试多账户轮询、通知和取消"""
+    print("🔍 测试异步轮询和取消...")
+
+    try:
+        from monitor_core import MonitorCore
+
+        monitor = FakeMonitor()
+        core = MonitorCore(monitor, max_workers=2)
+        notified = []
+        ticks = []
+
+        async def on_new_tweet(username, tweet):
+            notified.append(username)
+
+        core.add_periodic_task("测试周期任务", lambda: ticks.append(time.time()), 0.05)
+
+        thread = threading.Thread(
+            target=core.start, args=(["alice", "bob", "carol"], 0.1, on_new_tweet), daemon=True
+        )
+        thread.start()
+        time.sleep(0.5)
+        assert core.running
+        core.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive() and not core.running
+        print("✅ 取消后退出 - OK")
+
+        assert all(monitor.polls.get(name, 0) >= 2 for name in ("alice", "bob", "carol"))
+        assert sorted(notified) == ["alice", "bob", "carol"]
+        print("✅ 每个账户的新推文都已通知 - OK")
+
+        # 监听器调用固定在一个线程中
+        assert len(monitor.threads) == 1
+        print("✅ 监听器调用串行执行 - OK")
+
+        assert len(ticks) >= 3
+        print("✅ 周期任务 - OK")
+
+        assert monitor.stopped
+        print("✅ 停止时关闭监听器 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 异步轮询测试失败: {e}")
+        return False
+
+
+def test_poll_error_isolated():
+    """测试单个账户出错不影响其他账户"""
+    print("\n🔍 测试轮询出错隔离...")
+
+    try:
+        from monitor_core import MonitorCore
+
+        class FlakyMonitor(FakeMonitor):
+            def poll_account(self, username):
+                if username == "broken":
+                    raise RuntimeError("页面加载失败")
+                return super().poll_account(username)
+
+        monitor = FlakyMonitor()
+        core = MonitorCore(monitor)
+
+        async def main():
+            task = asyncio.create_task(core.run(["broken", "ok"], 0.05))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            await task
+
+        asyncio.run(main())
+        assert monitor.polls.get("ok", 0) >= 2
+        print("✅ 其他账户继续检查 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 轮询出错隔离测试失败: {e}")
+        return False
+
+
+def test_notification_order():
+    """测试通知按发推顺序逐条发送，慢速回调也不会乱序"""
+    print("\n🔍 测试通知顺序...")
+
+    try:
+        import random
+        from monitor_core import MonitorCore
+
+        class BurstMonitor(FakeMonitor):
+            def poll_account(self, username):
+                self.polls[username] = self.polls.get(username, 0) + 1
+                # 每次检查发现 4 条新推文（例如推文串）
+                start = (self.polls[username] - 1) * 4
+                return [{'id': tweet_id, 'text': ''} for tweet_id in range(start, start + 4)]
+
+        monitor = BurstMonitor()
+        core = MonitorCore(monitor, max_workers=4)
+        notified = []
+
+        def on_new_tweet(username, tweet):
+            # 普通函数在线程池中执行，随机耗时模拟邮件入队和日志
+            time.sleep(random.uniform(0, 0.02))
+            notified.append(tweet['id'])
+
+        async def main():
+            task = asyncio.create_task(core.run(["thread_author"], 0.01, on_new_tweet))
+            await asyncio.sleep(0.5)
+            task.cancel()
+            await task
+
+        asyncio.run(main())
+        assert len(notified) >= 8
+        assert notified == sorted(notified)
+        print("✅ 同一账户的通知按顺序发送 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 通知顺序测试失败: {e}")
+        return False
+
+
+def test_lease_ownership():
+    """测试只检查本节点持有租约的账户"""
+    print("\n🔍 测试多节点租约过滤...")
+
+    try:
+        from monitor_core import MonitorCore
+
+        class LeaseMonitor(FakeMonitor):
+            def __init__(self):
+                super().__init__()
+                self.released = []
+
+            def release_account(self, username):
+                self.released.append(username)
+
+        monitor = LeaseMonitor()
+        owned = {"alice", "bob"}
+        core = MonitorCore(monitor, owns=lambda username: username in owned)
+
+        async def main():
+            task = asyncio.create_task(core.run(["alice", "bob"], 0.05))
+            await asyncio.sleep(0.3)
+            # bob 交给其他节点
+            owned.discard("bob")
+            await asyncio.sleep(0.3)
+            task.cancel()
+            await task
+
+        asyncio.run(main())
+        assert monitor.polls.get("alice", 0) > monitor.polls.get("bob", 0)
+        assert monitor.released == ["bob"]
+        print("✅ 失去租约后停止检查并丢弃去重状态 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 多节点租约过滤测试失败: {e}")
+        return False
+
+
+def test_lease_lost_mid_poll():
+    """测试检查期间失去租约时仍然通知本次发现的新推文"""
+    print("\n🔍 测试检查期间失去租约...")
+
+    try:
+        from monitor_core import MonitorCore
+
+        owned = {"alice"}
+
+        class HandoverMonitor(FakeMonitor):
+            def poll_account(self, username):
+                new_tweets = super().poll_account(username)
+                # 新推文已写入共享的已见推文库，此时租约被其他节点接手
+                if new_tweets:
+                    owned.discard(username)
+                return new_tweets
+
+            def release_account(self, username):
+                pass
+
+        monitor = HandoverMonitor()
+        core = MonitorCore(monitor, owns=lambda username: username in owned)
+        notified = []
+
+        async def on_new_tweet(username, tweet):
+            notified.append(tweet['id'])
+
+        async def main():
+            task = asyncio.create_task(core.run(["alice"], 0.05, on_new_tweet))
+            await asyncio.sleep(0.3)
+            task.cancel()
+            await task
+
+        asyncio.run(main())
+        assert monitor.polls["alice"] == 2
+        assert notified == [1]
+        print("✅ 检查开始时持有租约的新推文不会丢失 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 检查期间失去租约测试失败: {e}")
+        return False
+
+
+def test_live_blocking_drain():
+    """测试单目标实时模式经由异步核心运行时，等待放在页面内的队列读取中"""
+    print("\n🔍 测试实时模式阻塞读取队列...")
+
+    try:
+        from monitor_core import MonitorCore
+        from tweet_parser import DRAIN_LIVE_QUEUE_SCRIPT
+        from twitter_monitor import TwitterMonitor
+
+        class FakeSwitchTo:
+            def window(self, handle):
+                pass
+
+        class FakeDriver:
+            """模拟浏览器：页面上没有推文，读取实时队列时在页面内阻塞（最多0.1秒）"""
+            current_window_handle = "tab-1"
+
+            def __init__(self):
+                self.switch_to = FakeSwitchTo()
+                self.drain_waits = []
+                self.script_timeout = None
+
+            def set_script_timeout(self, timeout):
+                self.script_timeout = timeout
+
+            def execute_async_script(self, script, *args):
+                if script == DRAIN_LIVE_QUEUE_SCRIPT:
+                    self.drain_waits.append(args[0])
+                    time.sleep(min(args[0] / 1000, 0.1))
+                    return []
+                return True
+
+            def execute_script(self, script, *args):
+                return []
+
+            def execute_cdp_cmd(self, command, params):
+                return {}
+
+            def find_element(self, by, value):
+                return object()
+
+            def refresh(self):
+                pass
+
+            def get_log(self, log_type):
+                return []
+
+            def quit(self):
+                pass
+
+        monitor = TwitterMonitor("test_token", True, capture_mode="live")
+        monitor.driver = FakeDriver()
+        monitor.login_with_token = lambda: True
+        monitor.navigate_to_target = lambda target: True
+        driver = monitor.driver
+        core = MonitorCore(monitor)
+
+        async def main():
+            task = asyncio.create_task(core.run(["alice"], 30))
+            await asyncio.sleep(0.6)
+            task.cancel()
+            await task
+
+        asyncio.run(main())
+        assert monitor.live_blocking
+        # 检查间隔为30秒，核心没有休眠，每次检查都在页面内等待最多30秒
+        assert len(driver.drain_waits) >= 3
+        assert all(wait == 30000 for wait in driver.drain_waits)
+        assert driver.script_timeout >= 40
+        print("✅ 读取队列时阻塞等待检查间隔 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 实时模式阻塞读取队列测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 异步监控核心测试")
+    print("=" * 60)
+
+    tests = [
+        ("异步轮询和取消", test_polling_and_cancel),
+        ("轮询出错隔离", test_poll_error_isolated),
+        ("通知顺序", test_notification_order),
+        ("多节点租约过滤", test_lease_ownership),
+        ("检查期间失去租约", test_lease_lost_mid_poll),
+        ("实时模式阻塞读取队列", test_live_blocking_drain),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
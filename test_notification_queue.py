@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知队列测试脚本
+使用模拟的慢速发送函数测试入队不阻塞、统计和关闭时发送完剩余通知
+"""
+import time
+import threading
+
+
+def test_queue_and_drain():
+    """测试入队不等待发送、关闭时发送完剩余通知"""
+    print("🔍 测试通知队列...")
+
+    try:
+        from notification_queue import NotificationQueue
+
+        sent = []
+
+        def slow_send(username, tweet):
+            # 模拟SSL握手和登录较慢的SMTP服务器
+            time.sleep(0.1)
+            sent.append(tweet['id'])
+            return tweet['id'] != 3
+
+        notifications = NotificationQueue(slow_send, workers=1, maxsize=10)
+        notifications.start()
+
+        start = time.time()
+        for tweet_id in range(5):
+            assert notifications.put("example", {'id': tweet_id, 'text': f'推文 {tweet_id}'})
+        assert time.time() - start < 0.1
+        print("✅ 入队不等待发送 - OK")
+
+        assert notifications.stop(timeout=5)
+        assert sent == [0, 1, 2, 3, 4]
+        print("✅ 关闭时发送完剩余通知 - OK")
+
+        stats = notifications.stats()
+        assert stats['enqueued'] == 5 and stats['sent'] == 4 and stats['failed'] == 1
+        assert stats['depth'] == 0
+        assert stats['max_latency'] >= 0.4 and stats['avg_latency'] > 0
+        print("✅ 发送统计和延迟 - OK")
+
+        assert not notifications.put("example", {'id': 5, 'text': '关闭后'})
+        print("✅ 关闭后拒绝入队 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 通知队列测试失败: {e}")
+        return False
+
+
+def test_backpressure():
+    """测试队列满时限时等待后丢弃"""
+    print("\n🔍 测试队列满载...")
+
+    try:
+        from notification_queue import NotificationQueue
+
+        release = threading.Event()
+        notifications = NotificationQueue(lambda username, tweet: release.wait(5), maxsize=2, put_timeout=0.1)
+        notifications.start()
+
+        results = [notifications.put("example", {'id': i, 'text': ''}) for i in range(4)]
+        # 一条正在发送，两条在队列中，最后一条放不下
+        assert results == [True, True, True, False]
+        assert notifications.stats()['dropped'] == 1 and notifications.depth() == 2
+        print("✅ 满载时丢弃并计数 - OK")
+
+        release.set()
+        assert notifications.stop(timeout=5)
+        assert notifications.stats()['sent'] == 3
+        print("✅ 恢复后全部发送 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 队列满载测试失败: {e}")
+        return False
+
+
+def test_digest():
+    """测试汇总模式：按条数或等待时间合并发送，立即发送的账户不等待"""
+    print("\n🔍 测试汇总通知...")
+
+    try:
+        from notification_queue import NotificationQueue, uses_digest
+
+        digest_config = {'enabled': True, 'default_policy': 'digest', 'account_policies': {'@Urgent': 'immediate'}}
+        assert uses_digest(digest_config, "thread_author") and not uses_digest(digest_config, "urgent")
+        assert not uses_digest({'enabled': False}, "thread_author")
+        print("✅ 按账户选择汇总或立即发送 - OK")
+
+        single, digests = [], []
+        notifications = NotificationQueue(
+            lambda username, tweet: single.append((username, tweet['id'])) or True,
+            send_digest_func=lambda tweets: digests.append([tweet['id'] for _, tweet in tweets]) or True,
+            digest_window=0.3, digest_max=4,
+            digest_policy=lambda username: uses_digest(digest_config, username)
+        )
+        notifications.start()
+
+        # 推文串：4 条达到上限立即合并发送，剩下 2 条等待时间到后发送
+        for tweet_id in range(6):
+            notifications.put("thread_author", {'id': tweet_id, 'text': f'推文串 {tweet_id}'})
+        notifications.put("urgent", {'id': 'u', 'text': '立即发送'})
+        time.sleep(0.1)
+        assert single == [("urgent", 'u')]
+        assert digests == [[0, 1, 2, 3]]
+        print("✅ 达到条数上限立即发送，立即发送的账户不等待 - OK")
+
+        time.sleep(0.4)
+        assert digests == [[0, 1, 2, 3], [4, 5]]
+        print("✅ 等待时间到后发送剩余推文 - OK")
+
+        # 关闭时缓冲区中的通知立即发送
+        notifications.put("thread_author", {'id': 6, 'text': '关闭前'})
+        notifications.put("another", {'id': 7, 'text': '关闭前'})
+        assert notifications.stop(timeout=5)
+        assert digests[-1] == [6, 7]
+        stats = notifications.stats()
+        assert stats['digests'] == 3 and stats['sent'] == 9 and stats['buffered'] == 0
+        print("✅ 关闭时发送缓冲区中的通知 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 汇总通知测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 通知队列测试")
+    print("=" * 60)
+
+    tests = [
+        ("通知队列", test_queue_and_drain),
+        ("队列满载", test_backpressure),
+        ("汇总通知", test_digest),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
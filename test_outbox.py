@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知发件箱测试脚本
+测试退避时间、死信表、重启后继续发送和通知队列的失败重试
+"""
+import os
+import time
+import tempfile
+
+
+def test_backoff_and_dead_letter():
+    """测试指数退避加抖动、超过尝试次数后移入死信表"""
+    print("🔍 测试退避和死信...")
+
+    try:
+        from outbox import NotificationOutbox
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outbox = NotificationOutbox(os.path.join(tmp_dir, "outbox.db"), max_attempts=3,
+                                        base_delay=10, max_delay=25)
+
+            for attempts, delay in ((1, 10), (2, 20), (3, 25), (10, 25)):
+                for _ in range(20):
+                    assert delay / 2 <= outbox.backoff(attempts) <= delay
+            print("✅ 退避时间翻倍、有上限且带抖动 - OK")
+
+            entry_id = outbox.add("example", {'id': '1', 'text': '新推文'}, now=1000)
+            assert [entry[0] for entry in outbox.due(now=1000)] == [entry_id]
+
+            next_attempt_at = outbox.mark_failed(entry_id, "连接超时", now=1000)
+            assert 1005 <= next_attempt_at <= 1010
+            assert outbox.due(now=1004) == []
+            assert outbox.due(now=next_attempt_at)[0][3] == 1
+            print("✅ 失败后到重试时间才再次取出 - OK")
+
+            assert outbox.mark_failed(entry_id, "连接超时", now=next_attempt_at) is not None
+            assert outbox.mark_failed(entry_id, "认证失败", now=2000) is None
+            assert outbox.pending_count() == 0
+            dead = outbox.dead_letters()
+            assert len(dead) == 1 and dead[0]['attempts'] == 3
+            assert dead[0]['last_error'] == "认证失败" and dead[0]['tweet']['text'] == '新推文'
+            print("✅ 超过尝试次数后移入死信表 - OK")
+
+            outbox.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 退避和死信测试失败: {e}")
+        return False
+
+
+def test_resume_after_restart():
+    """测试重启后继续发送未完成的通知"""
+    print("\n🔍 测试重启后继续发送...")
+
+    try:
+        from outbox import NotificationOutbox
+        from notification_queue import NotificationQueue
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "outbox.db")
+
+            # 上次运行：通知写入发件箱后进程退出，没有发送
+            outbox = NotificationOutbox(db_path)
+            notifications = NotificationQueue(lambda username, tweet: True, outbox=outbox)
+            for tweet_id in range(3):
+                assert notifications.put("example", {'id': str(tweet_id), 'text': f'推文 {tweet_id}'})
+            outbox.close()
+
+            sent = []
+
+            def send(username, tweet):
+                sent.append(tweet['id'])
+                return True
+
+            outbox = NotificationOutbox(db_path)
+            assert outbox.pending_count() == 3
+            notifications = NotificationQueue(send, outbox=outbox, scan_interval=0.05)
+            notifications.start()
+            deadline = time.time() + 5
+            while len(sent) < 3 and time.time() < deadline:
+                time.sleep(0.05)
+            notifications.stop(timeout=5)
+
+            assert sent == ['0', '1', '2']
+            assert outbox.pending_count() == 0
+            print("✅ 重启后按顺序发送完未完成的通知 - OK")
+
+            outbox.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 重启后继续发送测试失败: {e}")
+        return False
+
+
+def test_queue_retry():
+    """测试通知队列发送失败后重试"""
+    print("\n🔍 测试发送失败重试...")
+
+    try:
+        from outbox import NotificationOutbox
+        from notification_queue import NotificationQueue
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outbox = NotificationOutbox(os.path.join(tmp_dir, "outbox.db"), base_delay=0.1, max_delay=0.1)
+            attempts = []
+
+            def flaky_send(username, tweet):
+                attempts.append(time.time())
+                if len(attempts) < 3:
+                    raise RuntimeError("SMTP服务器暂时不可用")
+                return True
+
+            notifications = NotificationQueue(flaky_send, outbox=outbox, scan_interval=0.02)
+            notifications.start()
+            assert notifications.put("example", {'id': '1', 'text': '新推文'})
+            deadline = time.time() + 5
+            while outbox.pending_count() and time.time() < deadline:
+                time.sleep(0.05)
+            notifications.stop(timeout=5)
+
+            assert len(attempts) == 3 and outbox.pending_count() == 0
+            assert attempts[1] - attempts[0] >= 0.05
+            stats = notifications.stats()
+            assert stats['retried'] == 2 and stats['sent'] == 1 and stats['dead'] == 0
+            print("✅ 失败后按退避时间重试直到成功 - OK")
+
+            outbox.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 发送失败重试测试失败: {e}")
+        return False
+
+
+def test_digest_group_retry():
+    """测试汇总邮件按收件人分组发送，一组失败只重试该组"""
+    print("\n🔍 测试汇总分组重试...")
+
+    try:
+        from outbox import NotificationOutbox
+        from notification_queue import NotificationQueue
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outbox = NotificationOutbox(os.path.join(tmp_dir, "outbox.db"), base_delay=0.1, max_delay=0.1)
+            recipients = {'alice': 'team-a', 'bob': 'team-a', 'carol': 'team-b'}
+            digests = []
+
+            def send_digest(tweets):
+                group = recipients[tweets[0][0]]
+                digests.append((group, sorted(tweet['id'] for _, tweet in tweets)))
+                if group == 'team-b' and len(digests) < 3:
+                    raise RuntimeError("收件服务器暂时不可用")
+                return True
+
+            notifications = NotificationQueue(
+                lambda username, tweet: digests.append((recipients[username], [tweet['id']])) or True,
+                outbox=outbox, scan_interval=0.02,
+                send_digest_func=send_digest, digest_window=0.05, digest_max=10,
+                digest_group=lambda username: recipients[username]
+            )
+            notifications.start()
+            for tweet_id, username in enumerate(['alice', 'carol', 'bob', 'carol']):
+                notifications.put(username, {'id': tweet_id, 'text': f'推文 {tweet_id}'})
+            deadline = time.time() + 5
+            while outbox.pending_count() and time.time() < deadline:
+                time.sleep(0.05)
+            notifications.stop(timeout=5)
+
+            sent_a = [ids for group, ids in digests if group == 'team-a']
+            assert sent_a == [[0, 2]]
+            # 第一次发送给 team-b 失败，之后重试的通知都送达
+            assert sorted(i for group, ids in digests[2:] if group == 'team-b' for i in ids) == [1, 3]
+            assert outbox.pending_count() == 0
+            print("✅ 已送达的分组不重发，失败的分组单独重试 - OK")
+
+            outbox.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 汇总分组重试测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 通知发件箱测试")
+    print("=" * 60)
+
+    tests = [
+        ("退避和死信", test_backoff_and_dead_letter),
+        ("重启后继续发送", test_resume_after_restart),
+        ("发送失败重试", test_queue_retry),
+        ("汇总分组重试", test_digest_group_retry),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应轮询调度测试脚本
+使用固定的时间点测试检查间隔的学习、上下限和全局预算
+"""
+from datetime import datetime, timezone
+
+
+def make_tweets(timestamps):
+    """按从新到旧的顺序构造推文记录"""
+    return [
+        {
+            'id': index,
+            'text': f'推文 {index}',
+            'timestamp': datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+            'is_pinned': False,
+            'is_retweet': False
+        }
+        for index, ts in enumerate(sorted(timestamps, reverse=True))
+    ]
+
+
+def test_interval_learning():
+    """测试根据发推间隔调整检查间隔"""
+    print("🔍 测试发推规律学习...")
+
+    try:
+        from poll_scheduler import PollScheduler
+
+        now = 1_720_000_000
+        scheduler = PollScheduler(min_interval=30, max_interval=600, default_interval=60)
+
+        # 没有数据时使用默认间隔
+        assert scheduler.record_poll("quiet", [], now=now) == 60
+        print("✅ 默认间隔 - OK")
+
+        # 每10分钟发一条：间隔约为 600 / 4，最近刚发过推再减半
+        busy = make_tweets([now - 600 * i for i in range(1, 4)])
+        interval = scheduler.record_poll("busy", busy, now=now)
+        assert 30 <= interval <= 150
+        print(f"✅ 活跃账户间隔 {interval:.0f} 秒 - OK")
+
+        # 每天一条：间隔受 max_interval 限制
+        daily = make_tweets([now - 86400 * i for i in range(1, 4)])
+        assert scheduler.record_poll("daily", daily, now=now) == 600
+        print("✅ 最长间隔限制 - OK")
+
+        # 置顶和转推不参与学习
+        pinned = make_tweets([now - 60, now - 120])
+        for tweet in pinned:
+            tweet['is_pinned'] = True
+        assert scheduler.record_poll("pinned", pinned, now=now) == 60
+        print("✅ 忽略置顶推文 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 发推规律学习测试失败: {e}")
+        return False
+
+
+def test_global_budget():
+    """测试全局请求预算"""
+    print("\n🔍 测试全局请求预算...")
+
+    try:
+        from poll_scheduler import PollScheduler
+
+        now = 1_720_000_000
+        usernames = [f"user{i}" for i in range(10)]
+        scheduler = PollScheduler(min_interval=30, max_interval=600, default_interval=30,
+                                  requests_per_minute=10)
+        scheduler.add_accounts(usernames)
+
+        # 10个账户各30秒检查一次是每分钟20次，需放慢到2倍
+        assert scheduler.budget_factor(now) == 2.0
+        assert scheduler.record_poll("user0", [], now=now) == 60
+        print("✅ 超出预算时放慢 - OK")
+
+        # 两次检查之间至少间隔 60 / requests_per_minute 秒
+        username, wait = scheduler.next_account(now=now)
+        assert username != "user0"
+        assert wait == 6
+        print("✅ 检查间隔平摊 - OK")
+
+        # 下一个到期的账户是最久没有检查的账户
+        for index, name in enumerate(usernames[1:], start=1):
+            scheduler.record_poll(name, [], now=now + 6 * index)
+        username, wait = scheduler.next_account(now=now + 60)
+        assert username == "user0" and wait == 0
+        print("✅ 轮询顺序 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 全局请求预算测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 自适应轮询调度测试")
+    print("=" * 60)
+
+    tests = [
+        ("发推规律学习", test_interval_learning),
+        ("全局请求预算", test_global_budget),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -112,6 +112,91 @@ def test_server_mode():
         return False
 
 
+def test_shard_accounts():
+    """测试账户分片"""
+    print("\n🔍 测试账户分片...")
+    
+    try:
+        from server_mode import shard_accounts
+        
+        shards = shard_accounts(["a", "b", "c", "d", "e"], 2)
+        assert shards == [["a", "c", "e"], ["b", "d"]]
+        
+        # 进程数多于账户数时不创建空分片
+        assert shard_accounts(["a", "b"], 4) == [["a"], ["b"]]
+        
+        print("✅ 账户分片测试成功")
+        return True
+    except Exception as e:
+        print(f"❌ 账户分片测试失败: {e}")
+        return False
+
+
+def test_account_recipients():
+    """测试按账户选择收件人"""
+    print("\n🔍 测试按账户选择收件人...")
+    
+    try:
+        from server_mode import TwitterMonitorServer
+        
+        server = TwitterMonitorServer()
+        server.config['email']['receiver_email'] = "owner@example.com, team@example.com"
+        server.config['email']['account_recipients'] = {"@ElonMusk": ["a@example.com", "b@example.com"]}
+        
+        assert server._recipients_for("elonmusk") == ["a@example.com", "b@example.com"]
+        assert server._recipients_for("other") == ["owner@example.com", "team@example.com"]
+        
+        print("✅ 按账户选择收件人测试成功")
+        return True
+    except Exception as e:
+        print(f"❌ 按账户选择收件人测试失败: {e}")
+        return False
+
+
+def test_config_reload():
+    """测试配置文件格式错误时保留当前配置"""
+    print("\n🔍 测试配置重新加载...")
+    
+    try:
+        import json
+        import os
+        import tempfile
+        from server_mode import TwitterMonitorServer
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            config_file = os.path.join(tmp_dir, "config.json")
+            server = TwitterMonitorServer()
+            server.config_manager.config_file = config_file
+            server.config['email']['receiver_email'] = "owner@example.com"
+            server.config['twitter']['check_interval'] = 300
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(server.config, f)
+            server._reload_config()
+            
+            # 保存到一半的配置文件
+            with open(config_file, 'w', encoding='utf-8') as f:
+                f.write('{"twitter": {')
+            os.utime(config_file, (server.config_mtime + 10, server.config_mtime + 10))
+            server._reload_config()
+            assert server.config['email']['receiver_email'] == "owner@example.com"
+            assert server.config['twitter']['check_interval'] == 300
+            
+            # 修正后下一次检查时生效
+            server.config['email']['receiver_email'] = "new@example.com"
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(server.config, f)
+            server.config['email'] = {}
+            os.utime(config_file, (server.config_mtime + 10, server.config_mtime + 10))
+            server._reload_config()
+            assert server.config['email']['receiver_email'] == "new@example.com"
+        
+        print("✅ 配置重新加载测试成功")
+        return True
+    except Exception as e:
+        print(f"❌ 配置重新加载测试失败: {e}")
+        return False
+
+
 def test_logging():
     """测试日志系统"""
     print("\n🔍 测试日志系统...")
@@ -149,6 +234,9 @@ def main():
         ("Twitter监控器", test_twitter_monitor),
         ("国际化模块", test_i18n),
         ("服务器模式模块", test_server_mode),
+        ("账户分片", test_shard_accounts),
+        ("按账户选择收件人", test_account_recipients),
+        ("配置重新加载", test_config_reload),
         ("日志系统", test_logging),
     ]
     
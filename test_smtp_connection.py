@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SMTP连接复用测试脚本
+在本地启动一个简易SMTP服务器，比较每封邮件单独连接和复用连接的发送耗时
+"""
+import time
+import socketserver
+import threading
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """只实现发送通知用到的命令：EHLO/AUTH/MAIL/RCPT/DATA/NOOP/RSET/QUIT"""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        stub = self.server
+        stub.connections += 1
+        self.reply("220 stub ESMTP")
+        in_data = False
+        received = 0
+        data = []
+
+        for raw in self.rfile:
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+            if in_data:
+                if line == '.':
+                    in_data = False
+                    received += 1
+                    stub.messages += 1
+                    stub.last_message = "\r\n".join(data)
+                    data = []
+                    self.reply("250 OK")
+                    # 模拟服务器主动断开空闲或长时间使用的连接
+                    if stub.disconnect_after and received >= stub.disconnect_after:
+                        return
+                else:
+                    data.append(line[1:] if line.startswith('..') else line)
+                continue
+
+            command = line[:4].upper()
+            if command in ('EHLO', 'HELO'):
+                self.reply("250-stub")
+                self.reply("250 AUTH PLAIN")
+            elif command == 'AUTH':
+                # 模拟TLS握手和登录的耗时
+                time.sleep(stub.login_delay)
+                stub.logins += 1
+                self.reply("235 Authentication successful")
+            elif command == 'RCPT':
+                # 模拟不存在的邮箱被拒绝
+                if 'bad' in line:
+                    self.reply("550 Mailbox not found")
+                else:
+                    stub.recipients.append(line.split(':', 1)[1].strip(' <>'))
+                    self.reply("250 OK")
+            elif command in ('MAIL', 'RSET', 'NOOP'):
+                self.reply("250 OK")
+            elif command == 'DATA':
+                in_data = True
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("500 Unknown command")
+
+
+def start_stub_server(login_delay=0.05, disconnect_after=0):
+    """在后台线程中启动简易SMTP服务器"""
+    socketserver.ThreadingTCPServer.allow_reuse_address = True
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), StubSMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.logins = 0
+    server.messages = 0
+    server.last_message = ""
+    server.recipients = []
+    server.login_delay = login_delay
+    server.disconnect_after = disconnect_after
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def send_burst(persistent, count=10, **server_options):
+    """连续发送 count 封通知，返回 (服务器, 发送器, 总耗时)"""
+    from email_sender import EmailSender
+
+    server = start_stub_server(**server_options)
+    sender = EmailSender('127.0.0.1', server.server_address[1], 'sender@example.com', 'password',
+                         use_ssl=False, persistent=persistent, idle_timeout=5)
+    start = time.time()
+    for index in range(count):
+        assert sender.send_notification('receiver@example.com', 'example', f'第 {index} 条推文',
+                                        f'https://x.com/example/status/{index}')
+    elapsed = time.time() - start
+    return server, sender, elapsed
+
+
+def test_connection_reuse():
+    """测试持久连接只握手登录一次，并测量每封邮件的耗时"""
+    print("🔍 测试SMTP连接复用...")
+
+    try:
+        server, sender, single_elapsed = send_burst(persistent=False)
+        assert server.messages == 10 and server.logins == 10
+        server.shutdown()
+        print(f"📊 每封邮件单独连接: {single_elapsed / 10 * 1000:.1f} ms/封，{10 / single_elapsed:.1f} 封/秒")
+
+        server, sender, pooled_elapsed = send_burst(persistent=True)
+        assert server.messages == 10 and server.logins == 1 and sender.connect_count == 1
+        print(f"📊 复用连接: {pooled_elapsed / 10 * 1000:.1f} ms/封，{10 / pooled_elapsed:.1f} 封/秒")
+        assert pooled_elapsed < single_elapsed
+        print("✅ 连续发送只登录一次 - OK")
+
+        sender.close()
+        server.shutdown()
+        return True
+
+    except Exception as e:
+        print(f"❌ SMTP连接复用测试失败: {e}")
+        return False
+
+
+def test_reconnect_and_idle_close():
+    """测试服务器断开后重新连接、空闲后关闭连接"""
+    print("\n🔍 测试断线重连和空闲关闭...")
+
+    try:
+        # 服务器每发送3封就断开连接，NOOP探测失败后重新连接
+        server, sender, _ = send_burst(persistent=True, count=7, login_delay=0, disconnect_after=3)
+        assert server.messages == 7 and server.logins == 3
+        print("✅ 断线后自动重连 - OK")
+
+        sender.idle_timeout = 0.2
+        sender.send_notification('receiver@example.com', 'example', '空闲前最后一条')
+        time.sleep(0.6)
+        assert sender._server is None
+        print("✅ 空闲后关闭连接 - OK")
+
+        server.shutdown()
+        return True
+
+    except Exception as e:
+        print(f"❌ 断线重连测试失败: {e}")
+        return False
+
+
+def test_digest_message():
+    """测试多个账户的多条推文合并成一封邮件"""
+    print("\n🔍 测试汇总邮件...")
+
+    try:
+        import email
+        from email_sender import EmailSender
+
+        server = start_stub_server(login_delay=0)
+        sender = EmailSender('127.0.0.1', server.server_address[1], 'sender@example.com', 'password',
+                             use_ssl=False, persistent=True)
+        tweets = [('thread_author', {'text': f'推文串 {index}', 'url': f'https://x.com/thread_author/status/{index}'})
+                  for index in range(10)]
+        tweets.insert(3, ('another', {'text': '另一个账户的推文'}))
+        assert sender.send_digest('receiver@example.com', tweets)
+        assert server.messages == 1 and server.logins == 1
+        print("✅ 11 条推文只用一次SMTP事务 - OK")
+
+        message = email.message_from_string(server.last_message)
+        subject = str(email.header.make_header(email.header.decode_header(message['Subject'])))
+        assert '@thread_author、@another' in subject and '11 条' in subject
+        text, html = [part.get_payload(decode=True).decode('utf-8') for part in message.get_payload()]
+        assert all(f'推文串 {index}' in text and f'推文串 {index}' in html for index in range(10))
+        # 同一账户的推文排在一起
+        assert text.index('推文串 9') < text.index('@another（1 条）') < text.index('另一个账户的推文')
+        assert 'https://x.com/thread_author/status/9' in html
+        print("✅ 按账户分组渲染纯文本和HTML正文 - OK")
+
+        sender.close()
+        server.shutdown()
+        return True
+
+    except Exception as e:
+        print(f"❌ 汇总邮件测试失败: {e}")
+        return False
+
+
+def test_recipient_fan_out():
+    """测试多位收件人共用一封邮件和一个连接，按批投递"""
+    print("\n🔍 测试多收件人投递...")
+
+    try:
+        import email
+        from email_sender import EmailSender, parse_recipients
+
+        assert parse_recipients("a@example.com, b@example.com;a@example.com") == ["a@example.com", "b@example.com"]
+        assert parse_recipients(["c@example.com", " d@example.com "]) == ["c@example.com", "d@example.com"]
+        print("✅ 解析收件人列表 - OK")
+
+        server = start_stub_server(login_delay=0.05)
+        sender = EmailSender('127.0.0.1', server.server_address[1], 'sender@example.com', 'password',
+                             use_ssl=False, persistent=True, max_recipients=50)
+        recipients = [f"user{index}@example.com" for index in range(120)] + ["bad@example.com"]
+        assert sender.send_notification(recipients, 'example', '新推文', 'https://x.com/example/status/1')
+
+        # 121 位收件人分 3 批投递，只握手登录一次
+        assert server.connections == 1 and server.logins == 1 and server.messages == 3
+        assert server.recipients == recipients[:120]
+        print("✅ 一次登录、按批投递、拒绝的收件人不影响其他人 - OK")
+
+        message = email.message_from_string(server.last_message)
+        assert message['To'] == 'undisclosed-recipients:;'
+        assert 'user1@example.com' not in server.last_message
+        print("✅ 收件人互不可见 - OK")
+
+        assert not sender.send_notification(["bad@example.com"], 'example', '新推文')
+        print("✅ 全部收件人被拒绝时发送失败 - OK")
+
+        sender.close()
+        server.shutdown()
+        return True
+
+    except Exception as e:
+        print(f"❌ 多收件人投递测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 SMTP连接复用测试")
+    print("=" * 60)
+
+    tests = [
+        ("SMTP连接复用", test_connection_reuse),
+        ("断线重连和空闲关闭", test_reconnect_and_idle_close),
+        ("汇总邮件", test_digest_message),
+        ("多收件人投递", test_recipient_fan_out),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文解析测试脚本
+测试从页面脚本结果整理推文记录的逻辑（无需浏览器）
+"""
+
+
+def test_normalize_tweet_records():
+    """测试推文记录整理"""
+    print("🔍 测试推文记录整理...")
+
+    try:
+        from tweet_parser import normalize_tweet_records
+
+        raw_records = [
+            {
+                'text': '置顶的旧推文',
+                'url': '/example/status/1700000000000000000',
+                'timestamp': '2023-09-08T00:00:00.000Z',
+                'social_context': 'Pinned'
+            },
+            {
+                'text': None,
+                'url': 'https://x.com/example/status/1800000000000000000',
+                'timestamp': '2024-06-10T00:00:00.000Z',
+                'social_context': ''
+            },
+            {
+                'text': '转推内容',
+                'url': 'https://x.com/other/status/1810000000000000000',
+                'timestamp': '2024-07-01T00:00:00.000Z',
+                'social_context': 'example reposted'
+            }
+        ]
+
+        tweets = normalize_tweet_records(raw_records)
+        assert len(tweets) == 3
+
+        assert tweets[0]['is_pinned'] and not tweets[0]['is_retweet']
+        assert tweets[0]['url'] == 'https://twitter.com/example/status/1700000000000000000'
+        print("✅ 置顶推文识别 - OK")
+
+        assert tweets[1]['text'] == '[媒体内容]'
+        assert tweets[1]['timestamp'] == '2024-06-10T00:00:00.000Z'
+        print("✅ 纯媒体推文处理 - OK")
+
+        assert tweets[2]['is_retweet'] and not tweets[2]['is_pinned']
+        print("✅ 转推识别 - OK")
+
+        assert normalize_tweet_records(None) == []
+        print("✅ 空结果处理 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 推文记录整理测试失败: {e}")
+        return False
+
+
+def test_snowflake_id():
+    """测试从永久链接解析snowflake ID"""
+    print("\n🔍 测试snowflake ID解析...")
+
+    try:
+        from tweet_parser import parse_tweet_id, snowflake_to_datetime, normalize_tweet_record
+
+        assert parse_tweet_id('https://x.com/jack/status/20') == 20
+        assert parse_tweet_id('/example/status/1800000000000000000/photo/1') == 1800000000000000000
+        assert parse_tweet_id('https://x.com/example') is None
+        assert parse_tweet_id(None) is None
+        print("✅ ID解析 - OK")
+
+        # 1800000000000000000 对应 2024-06-10 UTC
+        posted_at = snowflake_to_datetime(1800000000000000000)
+        assert (posted_at.year, posted_at.month, posted_at.day) == (2024, 6, 10)
+        print("✅ ID时间位解析 - OK")
+
+        tweet = normalize_tweet_record({'text': 'hi', 'url': '/example/status/1800000000000000000'})
+        assert tweet['id'] == 1800000000000000000
+        assert tweet['timestamp'].startswith('2024-06-10')
+        print("✅ 推文记录使用数字ID - OK")
+
+        tweet = normalize_tweet_record({'text': 'hi', 'url': None})
+        assert isinstance(tweet['id'], str)
+        print("✅ 无链接时退化为文本哈希 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ snowflake ID解析测试失败: {e}")
+        return False
+
+
+def test_timeline_response():
+    """测试解析录制的UserTweets接口响应"""
+    print("\n🔍 测试时间线接口响应解析...")
+
+    try:
+        import json
+        import os
+        from tweet_parser import parse_timeline_response
+
+        fixture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "user_tweets.json")
+        with open(fixture_path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+
+        tweets = parse_timeline_response(payload)
+        assert [t['id'] for t in tweets] == [
+            1700000000000000000, 1810000000000000000, 1790000000000000000, 1800000000000000000
+        ]
+        print("✅ 推文ID和顺序 - OK")
+
+        pinned, latest, retweet, long_tweet = tweets
+        assert pinned['is_pinned'] and not latest['is_pinned']
+        print("✅ 置顶推文识别 - OK")
+
+        assert latest['timestamp'] == '2024-07-07T20:09:05+00:00'
+        assert latest['media'] == [{'type': 'photo', 'url': 'https://pbs.twimg.com/media/example.jpg'}]
+        assert latest['url'] == 'https://x.com/example/status/1810000000000000000'
+        print("✅ 时间和媒体 - OK")
+
+        assert retweet['is_retweet'] and retweet['text'] == '被转推的原推文'
+        assert retweet['url'] == 'https://x.com/other/status/1790000000000000000'
+        assert retweet['author'] == 'example'
+        print("✅ 转推解析 - OK")
+
+        # 页面解析以永久链接中的原推文ID为主键，两种方式得到的同一条转推ID一致
+        from tweet_parser import normalize_tweet_record
+        dom_retweet = normalize_tweet_record({
+            'text': '被转推的原推文',
+            'url': '/other/status/1790000000000000000',
+            'social_context': 'example reposted',
+            'social_link': '/example'
+        })
+        assert dom_retweet['id'] == retweet['id']
+        assert dom_retweet['author'] == retweet['author']
+        print("✅ 接口与页面的转推ID一致 - OK")
+
+        assert long_tweet['text'].endswith('note_tweet中的完整内容。')
+        print("✅ 长推文全文 - OK")
+
+        assert parse_timeline_response({}) == []
+        print("✅ 空响应处理 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 时间线接口响应解析测试失败: {e}")
+        return False
+
+
+def test_list_mode():
+    """测试列表模式的目标识别和作者归属"""
+    print("\n🔍 测试列表模式...")
+
+    try:
+        import json
+        import os
+        from tweet_parser import (normalize_tweet_records, parse_timeline_response, list_target,
+                                  parse_list_target, notification_username)
+
+        assert list_target("https://x.com/i/lists/1234567890") == "list:1234567890"
+        assert list_target("1234567890") == list_target("list:1234567890") == "list:1234567890"
+        assert list_target("example") is None
+        assert parse_list_target("list:42") == "42" and parse_list_target("example") is None
+        print("✅ 列表目标识别 - OK")
+
+        tweets = normalize_tweet_records([
+            {
+                'text': '成员发的推文',
+                'url': 'https://x.com/alice/status/1810000000000000000',
+                'social_context': ''
+            },
+            {
+                'text': '成员转推的推文',
+                'url': 'https://x.com/other/status/1800000000000000000',
+                'social_context': 'bob reposted',
+                'social_link': '/bob'
+            }
+        ])
+        assert [t['author'] for t in tweets] == ['alice', 'bob']
+        assert notification_username("list:42", tweets[0]) == 'alice'
+        assert notification_username("example", tweets[0]) == 'example'
+        print("✅ 按作者通知 - OK")
+
+        # 列表时间线接口与个人主页的 instructions 结构相同
+        fixture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "user_tweets.json")
+        with open(fixture_path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        timeline = payload['data']['user']['result']['timeline_v2']
+        list_payload = {'data': {'list': {'tweets_timeline': timeline}}}
+        list_tweets = parse_timeline_response(list_payload)
+        assert [t['id'] for t in list_tweets] == [t['id'] for t in parse_timeline_response(payload)]
+        assert all(t['author'] for t in list_tweets)
+        print("✅ 列表时间线接口解析 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 列表模式测试失败: {e}")
+        return False
+
+
+def test_search_mode():
+    """测试搜索目标和账户合并查询"""
+    print("\n🔍 测试搜索模式...")
+
+    try:
+        import json
+        import os
+        from tweet_parser import (search_target, parse_search_target, search_targets_for_accounts,
+                                  notification_username, parse_timeline_response)
+
+        assert search_target("  keyword ") == search_target("search:keyword") == "search:keyword"
+        assert search_target("") is None
+        assert parse_search_target("search:from:a OR from:b") == "from:a OR from:b"
+        print("✅ 搜索目标识别 - OK")
+
+        assert search_targets_for_accounts(["a", "@b"]) == ["search:from:a OR from:b"]
+        targets = search_targets_for_accounts(["alice", "bob", "carol"], max_length=25)
+        assert targets == ["search:from:alice OR from:bob", "search:from:carol"]
+        print("✅ 账户合并查询及拆分 - OK")
+
+        assert notification_username("search:keyword", {'author': 'alice'}) == 'alice'
+        print("✅ 按作者通知 - OK")
+
+        fixture_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "user_tweets.json")
+        with open(fixture_path, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        timeline = payload['data']['user']['result']['timeline_v2']
+        search_payload = {'data': {'search_by_raw_query': {'search_timeline': timeline}}}
+        assert [t['id'] for t in parse_timeline_response(search_payload)] == \
+            [t['id'] for t in parse_timeline_response(payload)]
+        print("✅ 搜索时间线接口解析 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 搜索模式测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 推文解析测试")
+    print("=" * 60)
+
+    tests = [
+        ("推文记录整理", test_normalize_tweet_records),
+        ("snowflake ID解析", test_snowflake_id),
+        ("时间线接口响应解析", test_timeline_response),
+        ("列表模式", test_list_mode),
+        ("搜索模式", test_search_mode),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
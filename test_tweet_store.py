@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+推文去重存储测试脚本
+测试已见推文集合的去重和淘汰逻辑
+"""
+
+
+def test_seen_tweet_set():
+    """测试已见推文集合"""
+    print("🔍 测试已见推文集合...")
+
+    try:
+        from tweet_store import SeenTweetSet
+
+        seen = SeenTweetSet(capacity=3)
+        seen.update([1, 2, 3])
+        assert 1 in seen and 3 in seen
+        assert len(seen) == 3
+        print("✅ 记录和查询 - OK")
+
+        # 重新出现的ID被刷新，不会先被淘汰
+        seen.add(1)
+        seen.add(4)
+        assert 2 not in seen
+        assert 1 in seen and 4 in seen
+        assert len(seen) == 3
+        print("✅ 容量上限和LRU淘汰 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 已见推文集合测试失败: {e}")
+        return False
+
+
+def test_chronological_order():
+    """测试新推文按时间排序"""
+    print("\n🔍 测试新推文排序...")
+
+    try:
+        from tweet_parser import sort_chronologically
+
+        # 页面顺序：从新到旧
+        tweets = [{'id': 30}, {'id': 20}, {'id': 10}]
+        assert [t['id'] for t in sort_chronologically(tweets)] == [10, 20, 30]
+        print("✅ 按snowflake ID排序 - OK")
+
+        tweets = [{'id': 'b'}, {'id': 'a'}]
+        assert [t['id'] for t in sort_chronologically(tweets)] == ['a', 'b']
+        print("✅ 无ID时按页面顺序反转 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 新推文排序测试失败: {e}")
+        return False
+
+
+def test_persistent_store():
+    """测试SQLite持久化存储"""
+    print("\n🔍 测试已见推文持久化存储...")
+
+    try:
+        import os
+        import tempfile
+        from tweet_store import TweetStore
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, "state", "tweets.db")
+
+            store = TweetStore(db_path)
+            assert not os.path.exists(db_path)
+            print("✅ 延迟打开数据库 - OK")
+
+            store.add_seen("example", [1800000000000000000, 1800000000000000001])
+            store.add_seen("other", ["5d41402abc4b2a76b9719d911017c592"])
+            store.close()
+
+            # 模拟进程重启
+            store = TweetStore(db_path)
+            seen_ids = store.load_seen("example")
+            assert set(seen_ids) == {1800000000000000000, 1800000000000000001}
+            assert store.load_seen("other") == ["5d41402abc4b2a76b9719d911017c592"]
+            assert store.load_seen("nobody") == []
+            print("✅ 重启后恢复记录 - OK")
+
+            journal_mode = store._connect().execute('PRAGMA journal_mode').fetchone()[0]
+            assert journal_mode.lower() == 'wal'
+            print("✅ WAL模式 - OK")
+
+            store.prune("example", keep=1)
+            assert len(store.load_seen("example")) == 1
+            print("✅ 清理旧记录 - OK")
+            store.close()
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 持久化存储测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 推文去重存储测试")
+    print("=" * 60)
+
+    tests = [
+        ("已见推文集合", test_seen_tweet_set),
+        ("新推文排序", test_chronological_order),
+        ("持久化存储", test_persistent_store),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器监听器测试脚本
+使用模拟浏览器测试浏览器回收和传输统计（不启动Chrome）
+"""
+import json
+
+
+class FakeDriver:
+    """模拟浏览器：只记录是否已关闭"""
+
+    def __init__(self):
+        self.closed = False
+
+    def get_cookies(self):
+        return []
+
+    def quit(self):
+        self.closed = True
+
+
+def test_memory_recycle_backoff():
+    """测试内存持续超限时，重建浏览器之间至少间隔设定的检查次数"""
+    print("🔍 测试内存超限重建间隔...")
+
+    try:
+        from twitter_monitor import TwitterMonitor
+
+        monitor = TwitterMonitor("test_token", True, max_memory_mb=400)
+        drivers = []
+
+        def setup_driver():
+            monitor.driver = FakeDriver()
+            drivers.append(monitor.driver)
+
+        monitor.setup_driver = setup_driver
+        monitor.login_with_token = lambda: True
+        # 刚重建的浏览器仍然超过上限
+        monitor.get_chrome_memory_mb = lambda: 900.0
+        setup_driver()
+        monitor.polls_since_recycle = monitor.memory_recycle_min_polls
+
+        recycled = [monitor.recycle_driver_if_needed() for _ in range(monitor.memory_recycle_min_polls)]
+        assert recycled == [True] + [False] * (monitor.memory_recycle_min_polls - 1)
+        assert monitor.recycle_count == 1 and len(drivers) == 2 and drivers[0].closed
+        print("✅ 连续超限只重建一次 - OK")
+
+        assert monitor.recycle_driver_if_needed()
+        assert monitor.recycle_count == 2
+        print("✅ 间隔过后再次重建 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 内存超限重建间隔测试失败: {e}")
+        return False
+
+
+def test_transfer_measurement():
+    """测试按CDP事件统计传输字节数，并对比屏蔽前后的整页加载"""
+    print("\n🔍 测试传输统计...")
+
+    try:
+        from twitter_monitor import TwitterMonitor
+
+        class NetworkDriver:
+            """刷新时产生 Network 事件：时间线接口 20KB，跨域图片 300KB（被屏蔽时只产生失败事件）"""
+            def __init__(self):
+                self.blocked_urls = ['*pbs.twimg.com/*']
+                self.log = []
+
+            def execute_cdp_cmd(self, command, params):
+                if command == 'Network.setBlockedURLs':
+                    self.blocked_urls = params['urls']
+                return {}
+
+            def _event(self, method, **params):
+                self.log.append({'message': json.dumps({'message': {'method': method, 'params': params}})})
+
+            def refresh(self):
+                self._event('Network.loadingFinished', requestId='1', encodedDataLength=20 * 1024)
+                if self.blocked_urls:
+                    self._event('Network.loadingFailed', requestId='2', blockedReason='inspector')
+                else:
+                    self._event('Network.loadingFinished', requestId='2', encodedDataLength=300 * 1024)
+
+            def get_log(self, log_type):
+                entries, self.log = self.log, []
+                return entries
+
+            def find_element(self, by, value):
+                return object()
+
+            def execute_async_script(self, script, *args):
+                return True
+
+            def execute_script(self, script, *args):
+                return []
+
+        monitor = TwitterMonitor("test_token", True, blocked_urls=['*pbs.twimg.com/*'])
+        monitor.driver = NetworkDriver()
+
+        # 第一次刷新不屏蔽资源，测量基准，结束后恢复屏蔽
+        monitor.get_visible_tweets()
+        assert monitor.last_poll_bytes == 320 * 1024
+        assert monitor.driver.blocked_urls == ['*pbs.twimg.com/*']
+
+        monitor.get_visible_tweets()
+        assert monitor.last_poll_bytes == 20 * 1024
+        assert monitor.total_bytes == 340 * 1024
+        assert monitor.page_load_transfer == {True: [20 * 1024, 1], False: [320 * 1024, 1]}
+        print("✅ 跨域资源计入传输量，基准轮询后恢复屏蔽 - OK")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ 传输统计测试失败: {e}")
+        return False
+
+
+def main():
+    """主函数"""
+    print("=" * 60)
+    print("🧪 浏览器监听器测试")
+    print("=" * 60)
+
+    tests = [
+        ("内存超限重建间隔", test_memory_recycle_backoff),
+        ("传输统计", test_transfer_measurement),
+    ]
+
+    passed = 0
+    total = len(tests)
+
+    for test_name, test_func in tests:
+        try:
+            if test_func():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test_name}测试异常: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"通过: {passed}/{total}")
+    print(f"失败: {total - passed}/{total}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
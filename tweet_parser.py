@@ -0,0 +1,439 @@
+"""
+推文解析模块
+将浏览器中提取的原始推文数据整理为统一的推文记录
+"""
+import re
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Union
+
+
+# 从单个推文 article 元素读取字段的JS函数，页面提取和实时监听共用
+ARTICLE_TO_RECORD_JS = '''
+    (article) => {
+        const textEl = article.querySelector('[data-testid="tweetText"]');
+        const timeEl = article.querySelector('time');
+        const linkEl = timeEl ? timeEl.closest('a') : null;
+        const socialEl = article.querySelector('[data-testid="socialContext"]');
+        const socialLink = socialEl ? socialEl.closest('a') : null;
+        return {
+            text: textEl ? textEl.innerText : null,
+            url: linkEl ? linkEl.href : null,
+            timestamp: timeEl ? timeEl.getAttribute('datetime') : null,
+            social_context: socialEl ? socialEl.innerText : '',
+            social_link: socialLink ? socialLink.getAttribute('href') : null
+        };
+    }
+'''
+
+# 一次 execute_script 调用提取页面上所有可见推文，避免逐个元素的WebDriver往返
+EXTRACT_TWEETS_SCRIPT = '''
+    const toRecord = %s;
+    const articles = document.querySelectorAll('article[data-testid="tweet"]');
+    return Array.from(articles).map(toRecord);
+''' % ARTICLE_TO_RECORD_JS
+
+# 实时模式：在每个新页面上安装 MutationObserver，把时间线中新插入的推文放入 window.__tweetQueue
+# 推文 article 可能先插入、链接后渲染，所以只在出现永久链接后入队，每个 article 只入队一次
+LIVE_OBSERVER_SCRIPT = '''
+    (() => {
+        if (window.__tweetObserverInstalled) return;
+        window.__tweetObserverInstalled = true;
+        window.__tweetQueue = [];
+        const toRecord = %s;
+        const queued = new WeakSet();
+        const maxQueue = 500;
+
+        const enqueue = (article) => {
+            if (queued.has(article) || !article.closest('[data-testid="primaryColumn"]')) return;
+            const record = toRecord(article);
+            if (!record.url) return;
+            queued.add(article);
+            window.__tweetQueue.push(record);
+            if (window.__tweetQueue.length > maxQueue) {
+                window.__tweetQueue.splice(0, window.__tweetQueue.length - maxQueue);
+            }
+        };
+
+        const onAdded = (node) => {
+            if (!(node instanceof Element)) return;
+            const parent = node.closest('article[data-testid="tweet"]');
+            if (parent) {
+                enqueue(parent);
+                return;
+            }
+            node.querySelectorAll('article[data-testid="tweet"]').forEach(enqueue);
+        };
+
+        const start = () => {
+            new MutationObserver(mutations => {
+                for (const mutation of mutations) mutation.addedNodes.forEach(onAdded);
+            }).observe(document.body, {childList: true, subtree: true});
+        };
+
+        if (document.body) start();
+        else document.addEventListener('DOMContentLoaded', start);
+    })();
+''' % ARTICLE_TO_RECORD_JS
+
+# 取出实时队列中的推文；队列为空时在页面内最多等待 arguments[0] 毫秒
+DRAIN_LIVE_QUEUE_SCRIPT = '''
+    const waitMs = arguments[0], done = arguments[arguments.length - 1];
+    const start = Date.now();
+    const check = () => {
+        const queue = window.__tweetQueue || [];
+        if (queue.length || Date.now() - start >= waitMs) {
+            window.__tweetQueue = [];
+            done(queue);
+        } else {
+            setTimeout(check, 200);
+        }
+    };
+    check();
+'''
+
+# socialContext 中表示置顶/转推的关键字（中英文界面）
+PINNED_KEYWORDS = ('pinned', '置顶')
+RETWEET_KEYWORDS = ('reposted', 'retweeted', '转帖', '转推', '已转发')
+
+# 推文永久链接中的数字ID，例如 https://x.com/user/status/1800000000000000000
+STATUS_ID_PATTERN = re.compile(r'/status(?:es)?/(\d+)')
+
+# 链接路径第一段的用户名，例如 https://x.com/user/status/... 或 /user
+HANDLE_PATTERN = re.compile(r'^(?:https?://[^/]+)?/([A-Za-z0-9_]{1,15})(?:[/?#]|$)')
+
+# 列表目标：监听 list:<列表ID> 时一次加载覆盖列表中的全部成员，新推文按作者分别通知
+LIST_TARGET_PREFIX = 'list:'
+LIST_URL_PATTERN = re.compile(r'/lists/(\d+)')
+
+# 搜索目标：监听 search:<查询语句> 的"最新"结果，例如 search:from:a OR from:b
+SEARCH_TARGET_PREFIX = 'search:'
+# 单个搜索查询的最大长度（超过后拆成多个查询）
+MAX_SEARCH_QUERY_LENGTH = 500
+
+# Twitter snowflake ID 的纪元（毫秒），ID 高位存放相对该纪元的毫秒时间戳
+TWITTER_EPOCH_MS = 1288834974657
+
+
+def parse_tweet_id(url: Optional[str]) -> Optional[int]:
+    """
+    从推文永久链接中解析 snowflake ID
+
+    Args:
+        url: 推文链接（绝对或相对）
+
+    Returns:
+        推文ID，链接中没有 /status/<id> 时返回 None
+    """
+    if not url:
+        return None
+    match = STATUS_ID_PATTERN.search(url)
+    return int(match.group(1)) if match else None
+
+
+def parse_handle(url: Optional[str]) -> Optional[str]:
+    """
+    从推文永久链接或主页链接中解析用户名
+
+    Args:
+        url: 链接（绝对或相对）
+
+    Returns:
+        用户名，无法解析时返回 None
+    """
+    if not url:
+        return None
+    match = HANDLE_PATTERN.match(url)
+    if not match or match.group(1) == 'i':
+        return None
+    return match.group(1)
+
+
+def list_target(value: Optional[str]) -> Optional[str]:
+    """
+    将列表ID、列表链接或 list:<ID> 统一为监听目标 list:<ID>
+
+    Returns:
+        监听目标，无法识别时返回 None
+    """
+    value = (value or '').strip()
+    if value.startswith(LIST_TARGET_PREFIX):
+        value = value[len(LIST_TARGET_PREFIX):]
+    match = LIST_URL_PATTERN.search(value)
+    if match:
+        value = match.group(1)
+    return f"{LIST_TARGET_PREFIX}{value}" if value.isdigit() else None
+
+
+def parse_list_target(target: str) -> Optional[str]:
+    """监听目标为列表时返回列表ID，普通用户名返回 None"""
+    if target.startswith(LIST_TARGET_PREFIX):
+        return target[len(LIST_TARGET_PREFIX):]
+    return None
+
+
+def search_target(query: str) -> Optional[str]:
+    """将搜索查询语句转为监听目标 search:<查询语句>，空查询返回 None"""
+    query = (query or '').strip()
+    if query.startswith(SEARCH_TARGET_PREFIX):
+        query = query[len(SEARCH_TARGET_PREFIX):].strip()
+    return f"{SEARCH_TARGET_PREFIX}{query}" if query else None
+
+
+def parse_search_target(target: str) -> Optional[str]:
+    """监听目标为搜索时返回查询语句，其他目标返回 None"""
+    if target.startswith(SEARCH_TARGET_PREFIX):
+        return target[len(SEARCH_TARGET_PREFIX):]
+    return None
+
+
+def search_targets_for_accounts(usernames: List[str], max_length: int = MAX_SEARCH_QUERY_LENGTH) -> List[str]:
+    """
+    把多个账户合并为 from:a OR from:b 形式的搜索目标，一次加载覆盖多个账户
+
+    Args:
+        usernames: Twitter用户名列表
+        max_length: 单个查询的最大长度，超过后拆分为多个查询
+
+    Returns:
+        搜索目标列表
+    """
+    queries, current = [], []
+    for username in usernames:
+        term = f"from:{username.lstrip('@')}"
+        if current and len(' OR '.join(current + [term])) > max_length:
+            queries.append(' OR '.join(current))
+            current = []
+        current.append(term)
+    if current:
+        queries.append(' OR '.join(current))
+    return [f"{SEARCH_TARGET_PREFIX}{query}" for query in queries]
+
+
+def is_aggregate_target(target: str) -> bool:
+    """列表和搜索目标的时间线包含多个作者的推文"""
+    return parse_list_target(target) is not None or parse_search_target(target) is not None
+
+
+def notification_username(target: str, tweet: Dict[str, Any]) -> str:
+    """新推文通知中的用户名：列表和搜索目标使用推文作者，普通账户使用账户名"""
+    if is_aggregate_target(target):
+        return tweet.get('author') or target
+    return target
+
+
+def snowflake_to_datetime(tweet_id: int) -> datetime:
+    """根据 snowflake ID 的时间位计算推文发布时间（UTC）"""
+    timestamp_ms = (tweet_id >> 22) + TWITTER_EPOCH_MS
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+
+
+def normalize_tweet_record(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    将 EXTRACT_TWEETS_SCRIPT 返回的单条原始数据整理为推文记录
+
+    Args:
+        raw: 脚本返回的原始字典
+
+    Returns:
+        包含 id/text/url/timestamp/is_pinned/is_retweet/author/time 的推文记录
+    """
+    # 可能是纯图片/视频推文
+    text = raw.get('text') or "[媒体内容]"
+
+    # 如果是相对链接，转换为绝对链接
+    url = raw.get('url')
+    if url and not url.startswith('http'):
+        url = f"https://twitter.com{url}"
+
+    social_context = (raw.get('social_context') or '').lower()
+
+    # 以链接中的 snowflake ID 作为主键；没有链接时退化为文本哈希
+    tweet_id: Union[int, str, None] = parse_tweet_id(url)
+    timestamp = raw.get('timestamp')
+    if tweet_id is None:
+        tweet_id = hashlib.md5(text.encode()).hexdigest()
+    elif not timestamp:
+        # 发布时间直接从ID中取，无需再查DOM
+        timestamp = snowflake_to_datetime(tweet_id).isoformat()
+
+    # 作者：转推取转推人（socialContext 链接），否则取永久链接中的用户名
+    is_retweet = any(k in social_context for k in RETWEET_KEYWORDS)
+    author = (parse_handle(raw.get('social_link')) if is_retweet else None) or parse_handle(url)
+
+    return {
+        'id': tweet_id,
+        'text': text,
+        'url': url,
+        'timestamp': timestamp,
+        'is_pinned': any(k in social_context for k in PINNED_KEYWORDS),
+        'is_retweet': is_retweet,
+        'author': author,
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def normalize_tweet_records(raw_records: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """整理脚本返回的全部推文，保持页面上的顺序"""
+    if not raw_records:
+        return []
+    return [normalize_tweet_record(raw) for raw in raw_records if isinstance(raw, dict)]
+
+
+def sort_chronologically(tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    将页面顺序（从新到旧）的推文按发布时间从旧到新排列
+
+    全部推文都有 snowflake ID 时按ID排序，否则按页面顺序反转。
+    """
+    ordered = list(reversed(tweets))
+    if all(isinstance(tweet['id'], int) for tweet in ordered):
+        ordered.sort(key=lambda tweet: tweet['id'])
+    return ordered
+
+
+# GraphQL 时间线接口名称（个人主页为 UserTweets，列表为 ListLatestTweetsTimeline，搜索为 SearchTimeline）
+TIMELINE_OPERATIONS = ('UserTweets', 'ListLatestTweetsTimeline', 'SearchTimeline')
+
+
+def _unwrap_tweet_result(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """去掉 TweetWithVisibilityResults 等外层包装，返回真正的 Tweet 对象"""
+    while result and result.get('__typename') != 'Tweet' and 'tweet' in result:
+        result = result['tweet']
+    if not result or 'legacy' not in result:
+        return None
+    return result
+
+
+def _tweet_author(result: Dict[str, Any]) -> Optional[str]:
+    """读取推文作者的用户名（兼容新旧两种字段位置）"""
+    user = (result.get('core') or {}).get('user_results', {}).get('result') or {}
+    return (user.get('core') or {}).get('screen_name') or (user.get('legacy') or {}).get('screen_name')
+
+
+def _tweet_text(result: Dict[str, Any]) -> str:
+    """读取推文全文，长推文优先使用 note_tweet 中的完整文本"""
+    note = (result.get('note_tweet') or {}).get('note_tweet_results', {}).get('result') or {}
+    return note.get('text') or result['legacy'].get('full_text') or ''
+
+
+def _parse_created_at(created_at: Optional[str]) -> Optional[str]:
+    """将 'Wed Oct 10 20:19:24 +0000 2018' 格式转换为ISO时间"""
+    if not created_at:
+        return None
+    try:
+        return datetime.strptime(created_at, '%a %b %d %H:%M:%S %z %Y').isoformat()
+    except ValueError:
+        return None
+
+
+def parse_graphql_tweet(result: Dict[str, Any], is_pinned: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    将 GraphQL 返回的单个推文对象转换为推文记录
+
+    Args:
+        result: tweet_results.result 对象
+        is_pinned: 是否为置顶推文
+
+    Returns:
+        与 normalize_tweet_record 字段一致的推文记录（另含 author 和 media），无法解析时返回 None
+    """
+    tweet = _unwrap_tweet_result(result)
+    if tweet is None:
+        return None
+
+    legacy = tweet['legacy']
+    author = _tweet_author(tweet)
+
+    # 转推：正文、链接和媒体取原推文
+    original = _unwrap_tweet_result((legacy.get('retweeted_status_result') or {}).get('result'))
+    source = original or tweet
+    source_legacy = source['legacy']
+    source_author = _tweet_author(source)
+    source_id = source_legacy.get('id_str') or source.get('rest_id')
+    # 与页面解析一致，以永久链接中的原推文ID作为主键（转推自身的 rest_id 在页面上看不到），
+    # 两种获取方式共用已见推文库时同一条转推不会被当作新推文
+    tweet_id = int(source_id)
+
+    media = [
+        {'type': item.get('type'), 'url': item.get('media_url_https')}
+        for item in (source_legacy.get('extended_entities') or {}).get('media', [])
+    ]
+
+    return {
+        'id': tweet_id,
+        'text': _tweet_text(source) or "[媒体内容]",
+        'url': f"https://x.com/{source_author or 'i'}/status/{source_id}",
+        'timestamp': _parse_created_at(source_legacy.get('created_at')) or snowflake_to_datetime(tweet_id).isoformat(),
+        'is_pinned': is_pinned,
+        'is_retweet': original is not None,
+        'author': author,
+        'media': media,
+        'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
+def _find_timeline_instructions(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """在不同版本的响应结构中查找时间线 instructions 列表"""
+    data = payload.get('data') or {}
+    # 列表时间线：data.list.tweets_timeline.timeline
+    list_timeline = ((data.get('list') or {}).get('tweets_timeline') or {}).get('timeline') or {}
+    if 'instructions' in list_timeline:
+        return list_timeline['instructions']
+    # 搜索时间线：data.search_by_raw_query.search_timeline.timeline
+    search_timeline = ((data.get('search_by_raw_query') or {}).get('search_timeline') or {}).get('timeline') or {}
+    if 'instructions' in search_timeline:
+        return search_timeline['instructions']
+
+    result = ((data.get('user') or {}).get('result') or {})
+    for key in ('timeline_v2', 'timeline'):
+        timeline = (result.get(key) or {}).get('timeline') or {}
+        if 'instructions' in timeline:
+            return timeline['instructions']
+    return []
+
+
+def _entry_tweet_results(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """取出时间线条目中的推文对象（单条推文或对话模块）"""
+    content = entry.get('content') or {}
+    if 'itemContent' in content:
+        items = [content['itemContent']]
+    else:
+        items = [item.get('item', {}).get('itemContent', {}) for item in content.get('items', [])]
+    return [
+        item['tweet_results']['result']
+        for item in items
+        if item.get('tweet_results', {}).get('result')
+    ]
+
+
+def parse_timeline_response(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    解析 UserTweets、ListLatestTweetsTimeline、SearchTimeline 等 GraphQL 时间线响应
+
+    Args:
+        payload: 接口返回的JSON对象
+
+    Returns:
+        推文记录列表，置顶推文在前，其余按时间线顺序（从新到旧）
+    """
+    pinned, tweets = [], []
+    seen_ids = set()
+
+    for instruction in _find_timeline_instructions(payload):
+        instruction_type = instruction.get('type')
+        if instruction_type == 'TimelinePinEntry':
+            entries, target = [instruction.get('entry') or {}], pinned
+        elif instruction_type == 'TimelineAddEntries':
+            entries, target = instruction.get('entries') or [], tweets
+        else:
+            continue
+
+        for entry in entries:
+            for result in _entry_tweet_results(entry):
+                tweet = parse_graphql_tweet(result, is_pinned=target is pinned)
+                if tweet and tweet['id'] not in seen_ids:
+                    seen_ids.add(tweet['id'])
+                    target.append(tweet)
+
+    return pinned + tweets
@@ -0,0 +1,257 @@
+"""
+推文去重存储模块
+记录已经见过的推文ID，用于在每次轮询时找出所有新推文
+"""
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from tweet_parser import sort_chronologically
+from sqlite_store import open_database
+
+TweetId = Union[int, str]
+
+
+class SeenTweetSet:
+    """
+    有容量上限的已见推文ID集合
+
+    基于 OrderedDict 实现LRU淘汰：查询和插入都是 O(1)，
+    超过容量时丢弃最久未出现在时间线上的ID。
+    """
+
+    def __init__(self, capacity: int = 1000):
+        """
+        初始化已见推文集合
+
+        Args:
+            capacity: 最多保留的推文ID数量
+        """
+        self.capacity = max(1, capacity)
+        self._ids: "OrderedDict[TweetId, None]" = OrderedDict()
+
+    def __contains__(self, tweet_id: TweetId) -> bool:
+        return tweet_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, tweet_id: TweetId):
+        """记录一个推文ID；已存在时刷新其位置，避免仍在时间线上的推文被淘汰"""
+        if tweet_id in self._ids:
+            self._ids.move_to_end(tweet_id)
+            return
+        self._ids[tweet_id] = None
+        if len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+
+    def update(self, tweet_ids: Iterable[TweetId]):
+        """批量记录推文ID"""
+        for tweet_id in tweet_ids:
+            self.add(tweet_id)
+
+
+# 已见推文表
+SEEN_TWEETS_SCHEMA = [
+    '''
+    CREATE TABLE IF NOT EXISTS seen_tweets (
+        username TEXT NOT NULL,
+        tweet_id TEXT NOT NULL,
+        seen_at REAL NOT NULL,
+        PRIMARY KEY (username, tweet_id)
+    ) WITHOUT ROWID
+    ''',
+]
+
+
+class TweetStore:
+    """
+    基于SQLite的已见推文持久化存储
+
+    以 (username, tweet_id) 为主键记录见过的推文，进程重启后可以从上次停止的位置继续，
+    并对停机期间发布的推文发送通知，而不是重新记录初始推文。
+    数据库在第一次使用时才打开，使用WAL模式，每次轮询的新ID在一个事务中批量写入。
+    """
+
+    def __init__(self, db_path: str = "data/tweet_state.db"):
+        """
+        初始化推文存储
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
+        # 监控线程写入、主线程关闭可能同时发生
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库连接（延迟到第一次使用时）"""
+        if self._conn is None:
+            self._conn = open_database(self.db_path, SEEN_TWEETS_SCHEMA)
+        return self._conn
+
+    def load_seen(self, username: str, limit: int = 1000) -> List[TweetId]:
+        """
+        读取某个账户最近见过的推文ID
+
+        Args:
+            username: Twitter用户名
+            limit: 最多读取的数量
+
+        Returns:
+            推文ID列表，从旧到新排列
+        """
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT tweet_id FROM seen_tweets WHERE username = ? ORDER BY seen_at DESC LIMIT ?',
+                (username, limit)
+            ).fetchall()
+        # snowflake ID 以文本保存，读回时还原为整数
+        return [int(row[0]) if row[0].isdigit() else row[0] for row in reversed(rows)]
+
+    def add_seen(self, username: str, tweet_ids: Iterable[TweetId]):
+        """在一个事务中批量记录推文ID"""
+        now = time.time()
+        rows = [(username, str(tweet_id), now) for tweet_id in tweet_ids]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO seen_tweets (username, tweet_id, seen_at) VALUES (?, ?, ?)',
+                    rows
+                )
+
+    def prune(self, username: str, keep: int = 1000):
+        """只保留某个账户最近的 keep 条记录"""
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute('''
+                    DELETE FROM seen_tweets WHERE username = ? AND tweet_id NOT IN (
+                        SELECT tweet_id FROM seen_tweets WHERE username = ?
+                        ORDER BY seen_at DESC LIMIT ?
+                    )
+                ''', (username, username, keep))
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class TweetTracker:
+    """
+    单个账户的新推文检测状态
+
+    每次轮询把整页时间线与已见ID集合比对，找出全部新推文。
+    浏览器和HTTP两种监听引擎共用这一逻辑。
+    """
+
+    def __init__(self, username: Optional[str], capacity: int = 1000, store: Optional[TweetStore] = None):
+        """
+        初始化检测状态
+
+        Args:
+            username: Twitter用户名（持久化时的键）
+            capacity: 最多记住的已见推文ID数量
+            store: 已见推文的持久化存储（可选）
+        """
+        self.username = username
+        self.capacity = capacity
+        self.store = store
+        self.seen_tweets = SeenTweetSet(capacity)
+        # 首次记录时时间线上最旧的原创推文ID：更旧的非转推推文只可能是时间线加载更深，而不是新发布
+        self.floor_id: Optional[int] = None
+        self.baseline_recorded = False
+        self._loaded = False
+        # 最近一次轮询看到的完整时间线（供调度器学习发推规律）
+        self.last_tweets: List[Dict[str, Any]] = []
+
+    def load(self):
+        """
+        从持久化存储中恢复去重状态（只在第一次调用时读取）
+
+        存储中已有记录时视为已完成初始记录，停机期间发布的推文会在下次检查时作为新推文通知。
+        """
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.store or not self.username or self.baseline_recorded:
+            return
+
+        try:
+            self.store.prune(self.username, self.capacity)
+            seen_ids = self.store.load_seen(self.username, self.capacity)
+        except Exception as e:
+            print(f"⚠️ 读取已见推文记录失败，将重新记录初始推文: {e}")
+            return
+
+        if seen_ids:
+            self.seen_tweets.update(seen_ids)
+            original_ids = [tweet_id for tweet_id in seen_ids if isinstance(tweet_id, int)]
+            self.floor_id = min(original_ids) if original_ids else None
+            self.baseline_recorded = True
+            print(f"📂 已恢复 @{self.username} 的 {len(seen_ids)} 条已见推文记录")
+
+    def _persist(self, tweet_ids: List[TweetId]):
+        """将本次轮询新见到的推文ID写入持久化存储（一个事务）"""
+        if not self.store or not self.username or not tweet_ids:
+            return
+        try:
+            self.store.add_seen(self.username, tweet_ids)
+        except Exception as e:
+            print(f"⚠️ 保存已见推文记录失败: {e}")
+
+    def diff(self, tweets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        找出时间线上的新推文
+
+        Args:
+            tweets: 页面顺序（从新到旧）的推文记录
+
+        Returns:
+            按发布时间从旧到新排列的新推文列表；首次调用只记录初始推文，返回空列表
+        """
+        self.load()
+        self.last_tweets = tweets
+        if not tweets:
+            return []
+
+        # 首次运行，记录当前时间线上的全部推文
+        if not self.baseline_recorded:
+            baseline_ids = [tweet['id'] for tweet in reversed(tweets)]
+            self.seen_tweets.update(baseline_ids)
+            self._persist(baseline_ids)
+            original_ids = [t['id'] for t in tweets if isinstance(t['id'], int) and not t.get('is_retweet')]
+            self.floor_id = min(original_ids) if original_ids else None
+            self.baseline_recorded = True
+            print(f"📝 记录初始推文 {len(tweets)} 条: {tweets[0]['text'][:50]}...")
+            return []
+
+        new_tweets = []
+        unseen_ids = []
+        for tweet in tweets:
+            tweet_id = tweet['id']
+            if tweet_id in self.seen_tweets:
+                continue
+            unseen_ids.append(tweet_id)
+            if (self.floor_id is not None and isinstance(tweet_id, int)
+                    and not tweet.get('is_retweet') and tweet_id < self.floor_id):
+                continue
+            new_tweets.append(tweet)
+
+        # 刷新仍在时间线上的推文，避免被淘汰后再次当作新推文
+        self.seen_tweets.update(tweet['id'] for tweet in reversed(tweets))
+        self._persist(list(reversed(unseen_ids)))
+
+        new_tweets = sort_chronologically(new_tweets)
+        for tweet in new_tweets:
+            print(f"🆕 发现新推文: {tweet['text'][:50]}...")
+        return new_tweets
@@ -2,22 +2,80 @@
 Twitter监听模块
 使用Selenium控制Chrome浏览器监听Twitter账户新帖子
 """
+import os
 import time
 import json
-from datetime import datetime
-from typing import Optional, Tuple, List, Dict
+import base64
+import threading
+from urllib.parse import quote
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any
+import psutil
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException
+from tweet_parser import (EXTRACT_TWEETS_SCRIPT, LIVE_OBSERVER_SCRIPT, DRAIN_LIVE_QUEUE_SCRIPT,
+                          TIMELINE_OPERATIONS, normalize_tweet_records, parse_timeline_response,
+                          list_target, parse_list_target, parse_search_target, notification_username)
+from tweet_store import TweetStore, TweetTracker
+from poll_scheduler import PollScheduler, poll_sequence
+from driver_cache import resolve_driver_path
 
 
+# 各等待阶段的默认超时时间（秒）
+DEFAULT_WAIT_TIMEOUTS = {
+    'page_ready': 15,  # document.readyState 变为 complete
+    'login': 10,  # 登录后首页元素出现
+    'tweets': 10,  # 第一条推文出现
+    'network_idle': 2,  # 推文出现后等待网络空闲（0 表示不等待）
+    'page_load': 30,  # 页面加载（get/refresh）
+    'poll': 120,  # 单次检查（含导航和重建浏览器）的最长时间，超过后看门狗强制关闭浏览器
+}
+
+# 两次因内存超限重建浏览器之间至少间隔的检查次数：刚重建的浏览器仍超限时不会每次检查都重建
+MEMORY_RECYCLE_MIN_POLLS = 10
+
+# 在页面内等待网络空闲：连续 idleMs 毫秒没有新的资源请求即返回 true，超时返回 false
+NETWORK_IDLE_SCRIPT = '''
+    const idleMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+    const start = Date.now();
+    let last = Date.now();
+    const observer = new PerformanceObserver(() => { last = Date.now(); });
+    observer.observe({type: 'resource', buffered: false});
+    const timer = setInterval(() => {
+        const now = Date.now();
+        if (now - last >= idleMs || now - start >= timeoutMs) {
+            clearInterval(timer);
+            observer.disconnect();
+            done(now - last >= idleMs);
+        }
+    }, 50);
+'''
+
+# 默认屏蔽的资源：图片、视频、字体和统计/广告请求（只读取推文文本和链接，用不到它们）
+DEFAULT_BLOCKED_URLS = [
+    '*pbs.twimg.com/*',  # 头像、媒体缩略图、卡片图片
+    '*video.twimg.com/*',  # 视频分片
+    '*.jpg', '*.jpeg', '*.png', '*.gif', '*.webp', '*.svg',
+    '*.mp4', '*.m3u8', '*.m4s',
+    '*.woff', '*.woff2', '*.ttf', '*.otf',
+    '*/jot/*',  # 客户端事件上报
+    '*ads-twitter.com*', '*ads-api.twitter.com*', '*ads-api.x.com*',
+    '*analytics.twitter.com*', '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+]
+
 class TwitterMonitor:
-    def __init__(self, auth_token: str, headless: bool = False, chrome_driver_path: Optional[str] = None):
+    def __init__(self, auth_token: str, headless: bool = False, chrome_driver_path: Optional[str] = None,
+                 seen_capacity: int = 1000, tweet_store: Optional[TweetStore] = None,
+                 capture_mode: str = "dom", wait_timeouts: Optional[Dict[str, float]] = None,
+                 live_refresh_interval: int = 300, block_resources: bool = True,
+                 blocked_urls: Optional[List[str]] = None, user_data_dir: Optional[str] = None,
+                 max_memory_mb: Optional[float] = None, recycle_after_polls: Optional[int] = None,
+                 transfer_baseline_polls: int = 1):
         """
         初始化Twitter监听器
         
@@ -25,13 +83,85 @@ class TwitterMonitor:
             auth_token: Twitter认证token
             headless: 是否使用无头模式
             chrome_driver_path: ChromeDriver路径
+            seen_capacity: 每个账户最多记住的已见推文ID数量
+            tweet_store: 已见推文的持久化存储（可选），重启后据此继续而不是重新记录初始推文
+            capture_mode: 推文获取方式，"dom" 解析页面元素，"network" 通过CDP读取时间线接口的JSON响应，
+                "live" 由页面内的 MutationObserver 推送新插入的推文，定期整页刷新兜底
+            wait_timeouts: 覆盖各等待阶段的超时时间，键见 DEFAULT_WAIT_TIMEOUTS
+            live_refresh_interval: 实时模式下整页刷新的间隔（秒）
+            block_resources: 是否屏蔽图片、视频、字体和统计请求以节省带宽和CPU
+            blocked_urls: 屏蔽的URL模式（支持 * 通配符），默认为 DEFAULT_BLOCKED_URLS
+            user_data_dir: Chrome用户数据目录（可选），保存登录状态，重启后无需重新注入Token；
+                同一目录同时只能被一个Chrome进程使用
+            max_memory_mb: Chrome进程树（ChromeDriver及其全部子进程）的内存上限（MB），超过后重建浏览器
+            recycle_after_polls: 每检查多少次重建一次浏览器（可选）
+            transfer_baseline_polls: 开启资源屏蔽时，先用多少次整页加载不屏蔽资源来测量传输基准，
+                用于对比屏蔽前后的流量（0 表示不测量）
         """
         self.auth_token = auth_token
         self.headless = headless
         self.chrome_driver_path = chrome_driver_path
+        self.capture_mode = capture_mode
+        self.wait_timeouts = dict(DEFAULT_WAIT_TIMEOUTS, **(wait_timeouts or {}))
+        self.block_resources = block_resources
+        self.blocked_urls = list(DEFAULT_BLOCKED_URLS if blocked_urls is None else blocked_urls)
+        self.user_data_dir = user_data_dir
+        self.script_timeout = self.wait_timeouts['network_idle'] + 5
         self.driver = None
-        self.last_tweet_id = None
-        self.last_tweet_text = None
+        self.monitoring = False
+        
+        # 去重状态：每个账户一个 TweetTracker，tracker 为当前正在检查的账户
+        self.seen_capacity = seen_capacity
+        self.tweet_store = tweet_store
+        self.trackers: Dict[str, TweetTracker] = {}
+        self.tracker: Optional[TweetTracker] = None
+        
+        # 实时模式：每次读取队列最多阻塞的秒数，以及各标签页上次整页刷新的时间
+        self.live_refresh_interval = live_refresh_interval
+        self.live_wait = 0
+        # 单目标实时模式：等待放在页面内的队列读取中，调用方通过 poll_account 的 live_wait 传入（prepare 中设置）
+        self.live_blocking = False
+        self.last_full_refresh: Dict[Optional[str], float] = {}
+        self.current_handle: Optional[str] = None
+        
+        # 最近一次登录/导航/轮询各阶段的耗时（秒）
+        self.stage_timings: Dict[str, float] = {}
+        
+        # WebDriver命令计数（每次获取推文时清零），用于衡量每次轮询的往返次数
+        self.command_count = 0
+        self.last_poll_command_count = 0
+        
+        # 浏览器回收：长时间运行的Chrome内存会持续增长，超过上限或检查次数后重建
+        self.max_memory_mb = max_memory_mb
+        self.recycle_after_polls = recycle_after_polls
+        self.memory_recycle_min_polls = MEMORY_RECYCLE_MIN_POLLS
+        self.polls_since_recycle = 0
+        self.recycle_count = 0
+        self.last_memory_mb = 0.0
+        # 上一个浏览器会话的cookie，重建浏览器后恢复
+        self.session_cookies: List[Dict[str, Any]] = []
+        
+        # 看门狗：当前检查的开始时间（空闲时为 None），超过期限说明浏览器无响应
+        self.poll_started_at: Optional[float] = None
+        self.driver_wedged = False
+        self.watchdog_thread: Optional[threading.Thread] = None
+        # 最近一次成功完成检查的时间（无论是否发现新推文）
+        self.last_successful_poll: Optional[float] = None
+        
+        # 页面传输的字节数（最近一次轮询 / 累计），由 Network.loadingFinished 的 encodedDataLength 累加
+        self.last_poll_bytes = 0
+        self.total_bytes = 0
+        self.pending_bytes = 0
+        self.pending_blocked = 0
+        # 整页加载的传输统计：是否屏蔽资源 -> [字节数, 次数]，用于对比屏蔽前后的流量
+        self.transfer_baseline_polls = transfer_baseline_polls
+        self.page_load_transfer: Dict[bool, List[int]] = {True: [0, 0], False: [0, 0]}
+        
+        # 标签页池：窗口句柄 -> 当前加载的用户名
+        self.tab_accounts: Dict[str, Optional[str]] = {}
+        # 多账户监听时的标签页池和账户列表（prepare 中设置）
+        self.pool_handles: List[str] = []
+        self.pool_usernames: List[str] = []
         
     def setup_driver(self):
         """设置Chrome驱动"""
@@ -55,13 +185,51 @@ class TwitterMonitor:
         # 设置窗口大小
         options.add_argument('--window-size=1920,1080')
         
+        # 持久化用户数据目录：cookie保存在其中，热启动时可跳过Token注入
+        if self.user_data_dir:
+            profile_dir = os.path.abspath(self.user_data_dir)
+            if not os.path.exists(profile_dir):
+                os.makedirs(profile_dir)
+            options.add_argument(f'--user-data-dir={profile_dir}')
+        
+        # 开启性能日志以获取Network事件（网络捕获模式读取接口响应，每次轮询统计传输字节数）
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
         # 创建驱动
         if self.chrome_driver_path:
             service = Service(self.chrome_driver_path)
         else:
-            service = Service(ChromeDriverManager().install())
+            # 使用本地缓存或PATH中的驱动（不访问网络），只有本地没有任何驱动时才限时下载
+            driver_path = resolve_driver_path()
+            if not driver_path:
+                raise RuntimeError("未找到可用的ChromeDriver：请运行 setup_chromedriver.py、"
+                                   "把 chromedriver 放到 PATH 中，或在配置中设置 browser.chrome_driver_path")
+            service = Service(driver_path)
         
         self.driver = webdriver.Chrome(service=service, options=options)
+        self._install_command_counter()
+        
+        # 浏览器卡住时 get/refresh 不会无限等待
+        self.driver.set_page_load_timeout(self.wait_timeouts['page_load'])
+        
+        # 异步脚本（等待网络空闲、实时模式读取队列）的超时需要覆盖最长的等待时间
+        self.driver.set_script_timeout(self.script_timeout)
+        
+        self._configure_tab()
+    
+    def _configure_tab(self):
+        """对当前标签页执行CDP设置（CDP命令只作用于当前标签页，新开的标签页需要重新设置）"""
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        
+        # 屏蔽不需要的资源请求
+        if self.block_resources and self.blocked_urls:
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        
+        # 实时模式：每个新页面加载时安装 MutationObserver
+        if self.capture_mode == 'live':
+            self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
+                'source': LIVE_OBSERVER_SCRIPT
+            })
         
         # 执行CDP命令以隐藏自动化特征
         self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {
@@ -72,14 +240,67 @@ class TwitterMonitor:
             '''
         })
     
+    def _install_command_counter(self):
+        """包装driver.execute，统计发往ChromeDriver的命令数（元素上的调用也经过它）"""
+        original_execute = self.driver.execute
+        
+        def counting_execute(driver_command, params=None):
+            self.command_count += 1
+            return original_execute(driver_command, params)
+        
+        self.driver.execute = counting_execute
+    
+    @contextmanager
+    def _stage(self, name: str):
+        """记录一个阶段的耗时"""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.stage_timings[name] = time.time() - start
+    
+    def _log_stage_timings(self, *names: str):
+        """输出指定阶段的耗时"""
+        parts = [f"{name} {self.stage_timings[name]:.2f}s" for name in names if name in self.stage_timings]
+        if parts:
+            print(f"⏱️ 阶段耗时: {', '.join(parts)}")
+    
+    def _wait_for_document_ready(self):
+        """等待页面 document.readyState 变为 complete"""
+        WebDriverWait(self.driver, self.wait_timeouts['page_ready']).until(
+            lambda driver: driver.execute_script('return document.readyState') == 'complete'
+        )
+    
+    def _wait_for_network_idle(self, idle_ms: int = 300) -> bool:
+        """等待页面网络空闲，超时不视为错误"""
+        timeout = self.wait_timeouts['network_idle']
+        if timeout <= 0:
+            return True
+        try:
+            return bool(self.driver.execute_async_script(NETWORK_IDLE_SCRIPT, idle_ms, int(timeout * 1000)))
+        except TimeoutException:
+            return False
+    
     def login_with_token(self) -> bool:
         """使用token登录Twitter"""
         try:
             print("🔄 正在使用Token登录Twitter...")
             
             # 先访问Twitter主页
-            self.driver.get("https://twitter.com")
-            time.sleep(3)
+            with self._stage('login_page'):
+                self.driver.get("https://twitter.com")
+                self._wait_for_document_ready()
+            
+            # 用户数据目录中已有同一Token的会话：无需注入cookie和刷新
+            if self.user_data_dir and self._has_saved_session():
+                try:
+                    with self._stage('login_check'):
+                        self._wait_for_home()
+                    print("✅ 已复用浏览器配置中的登录状态")
+                    self._log_stage_timings('login_page', 'login_check')
+                    return True
+                except TimeoutException:
+                    print("⚠️ 保存的登录状态已失效，重新使用Token登录")
             
             # 获取当前域名（可能是twitter.com或x.com）
             current_url = self.driver.current_url
@@ -111,31 +332,50 @@ class TwitterMonitor:
                     'path': '/'
                 })
             
-            # 刷新页面应用cookie
-            self.driver.refresh()
-            time.sleep(5)
+            # 重建浏览器时恢复上一个会话的其余cookie（ct0等），继续使用同一会话
+            for cookie in self.session_cookies:
+                if cookie.get('name') == 'auth_token':
+                    continue
+                try:
+                    self.driver.add_cookie({
+                        key: cookie[key] for key in ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'expiry')
+                        if key in cookie
+                    })
+                except Exception:
+                    pass
             
-            # 检查是否登录成功（查找首页元素）
+            # 刷新页面应用cookie，等待登录后的首页元素出现
             try:
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="primaryColumn"]'))
-                )
+                with self._stage('login_check'):
+                    self.driver.refresh()
+                    self._wait_for_home()
                 print("✅ Token登录成功！")
                 return True
             except TimeoutException:
-                # 尝试查找其他登录后的元素
-                try:
-                    self.driver.find_element(By.CSS_SELECTOR, '[role="navigation"]')
-                    print("✅ Token登录成功！")
-                    return True
-                except:
-                    print("❌ Token登录失败，请检查Token是否有效")
-                    return False
+                print("❌ Token登录失败，请检查Token是否有效")
+                return False
+            finally:
+                self._log_stage_timings('login_page', 'login_check')
                 
         except Exception as e:
             print(f"❌ 登录过程出错：{str(e)}")
             return False
     
+    def _has_saved_session(self) -> bool:
+        """当前浏览器配置中是否已保存与配置相同的 auth_token cookie"""
+        try:
+            cookie = self.driver.get_cookie('auth_token')
+        except Exception:
+            return False
+        return bool(cookie) and cookie.get('value') == self.auth_token
+    
+    def _wait_for_home(self):
+        """等待登录后的首页元素出现，超时抛出 TimeoutException"""
+        WebDriverWait(self.driver, self.wait_timeouts['login']).until(EC.any_of(
+            EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="primaryColumn"]')),
+            EC.presence_of_element_located((By.CSS_SELECTOR, '[role="navigation"]'))
+        ))
+    
     def navigate_to_user(self, username: str) -> bool:
         """导航到指定用户的Twitter页面"""
         try:
@@ -147,131 +387,375 @@ class TwitterMonitor:
             # 访问用户主页（支持twitter.com和x.com）
             # 先尝试twitter.com，会自动重定向到x.com
             url = f"https://twitter.com/{username}"
-            self.driver.get(url)
-            time.sleep(5)
-            
-            # 检查是否成功加载用户页面
+            # 推文、"账户不存在"或"推文受保护"任一出现即可判断页面状态
             try:
-                # 等待推文列表加载
-                WebDriverWait(self.driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
-                )
-                print(f"✅ 成功访问 @{username} 的主页")
-                return True
+                with self._stage('navigate'):
+                    self.driver.get(url)
+                    WebDriverWait(self.driver, self.wait_timeouts['tweets']).until(EC.any_of(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]')),
+                        EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'This account doesn')]")),
+                        EC.presence_of_element_located((By.XPATH, "//*[contains(text(), 'These Tweets are protected')]"))
+                    ))
             except TimeoutException:
-                # 检查是否是私密账户或不存在
-                try:
-                    error_element = self.driver.find_element(By.XPATH, "//*[contains(text(), 'This account doesn')]")
-                    print(f"❌ 用户 @{username} 不存在")
-                    return False
-                except:
-                    try:
-                        private_element = self.driver.find_element(By.XPATH, "//*[contains(text(), 'These Tweets are protected')]")
-                        print(f"❌ 用户 @{username} 是私密账户")
-                        return False
-                    except:
-                        print(f"⚠️ 用户 @{username} 可能暂时没有推文")
-                        return True
+                print(f"⚠️ 用户 @{username} 可能暂时没有推文")
+                return True
+            finally:
+                self._log_stage_timings('navigate')
+            
+            if self.driver.find_elements(By.XPATH, "//*[contains(text(), 'This account doesn')]"):
+                print(f"❌ 用户 @{username} 不存在")
+                return False
+            if self.driver.find_elements(By.XPATH, "//*[contains(text(), 'These Tweets are protected')]"):
+                print(f"❌ 用户 @{username} 是私密账户")
+                return False
+            
+            print(f"✅ 成功访问 @{username} 的主页")
+            return True
                         
         except Exception as e:
             print(f"❌ 访问用户页面出错：{str(e)}")
             return False
     
-    def get_latest_tweet(self) -> Optional[Dict[str, str]]:
-        """获取最新的推文"""
+    def navigate_to_list(self, list_id: str) -> bool:
+        """
+        导航到Twitter列表的时间线
+        
+        列表时间线包含全部成员的推文，一次加载即可覆盖整个列表，推文按作者分别通知。
+        
+        Args:
+            list_id: 列表ID
+        """
         try:
-            # 刷新页面以获取最新内容
-            self.driver.refresh()
-            time.sleep(3)
+            print(f"🔄 正在访问列表 {list_id}...")
+            try:
+                with self._stage('navigate'):
+                    self.driver.get(f"https://x.com/i/lists/{list_id}")
+                    WebDriverWait(self.driver, self.wait_timeouts['tweets']).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+                    )
+            except TimeoutException:
+                print(f"⚠️ 列表 {list_id} 可能暂时没有推文或无法访问")
+                return True
+            finally:
+                self._log_stage_timings('navigate')
+            
+            print(f"✅ 成功访问列表 {list_id}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 访问列表出错：{str(e)}")
+            return False
+    
+    def navigate_to_search(self, query: str) -> bool:
+        """
+        导航到搜索结果的"最新"标签页
+        
+        例如 from:a OR from:b 一次加载即可覆盖多个账户（结果包含回复，不含转推），推文按作者分别通知。
+        
+        Args:
+            query: 搜索查询语句
+        """
+        try:
+            print(f"🔄 正在搜索：{query}")
+            try:
+                with self._stage('navigate'):
+                    self.driver.get(f"https://x.com/search?q={quote(query)}&src=typed_query&f=live")
+                    WebDriverWait(self.driver, self.wait_timeouts['tweets']).until(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+                    )
+            except TimeoutException:
+                print(f"⚠️ 搜索 {query} 暂时没有结果")
+                return True
+            finally:
+                self._log_stage_timings('navigate')
             
-            # 等待推文加载
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
-            )
+            print(f"✅ 成功打开搜索：{query}")
+            return True
+            
+        except Exception as e:
+            print(f"❌ 打开搜索页面出错：{str(e)}")
+            return False
+    
+    def navigate_to_target(self, target: str) -> bool:
+        """导航到监听目标：list:<列表ID> 打开列表时间线，search:<查询语句> 打开最新搜索结果，否则打开用户主页"""
+        list_id = parse_list_target(target)
+        if list_id is not None:
+            return self.navigate_to_list(list_id)
+        query = parse_search_target(target)
+        if query is not None:
+            return self.navigate_to_search(query)
+        return self.navigate_to_user(target)
+    
+    def get_visible_tweets(self, refresh: bool = True) -> List[Dict[str, str]]:
+        """
+        获取页面上所有可见的推文
+        
+        所有推文字段通过一次 execute_script 取回，而不是对每个元素分别 find_element。
+        
+        Args:
+            refresh: 是否先刷新页面（刚导航到用户主页时无需再次刷新）
+        
+        Returns:
+            按页面顺序排列的推文记录列表，字段见 tweet_parser.normalize_tweet_record
+        """
+        self.command_count = 0
+        failed = False
+        page_load = False
+        blocking = self.block_resources and bool(self.blocked_urls)
+        try:
+            if self.capture_mode == 'live' and refresh:
+                last_refresh = self.last_full_refresh.get(self.current_handle)
+                if last_refresh and time.time() - last_refresh < self.live_refresh_interval:
+                    return self._drain_live_queue()
             
-            # 获取第一条推文（最新的）
-            tweets = self.driver.find_elements(By.CSS_SELECTOR, '[data-testid="tweet"]')
+            # 整页加载：开启资源屏蔽时，前几次刷新不屏蔽，测量对比用的传输基准
+            page_load = True
+            if blocking and refresh and self.page_load_transfer[False][1] < self.transfer_baseline_polls:
+                self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+                blocking = False
             
-            if tweets:
-                first_tweet = tweets[0]
-                
-                # 获取推文文本
-                try:
-                    tweet_text_element = first_tweet.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]')
-                    tweet_text = tweet_text_element.text
-                except:
-                    # 可能是纯图片/视频推文
-                    tweet_text = "[媒体内容]"
-                
-                # 获取推文链接
-                try:
-                    # 查找时间戳链接（通常是推文的永久链接）
-                    time_element = first_tweet.find_element(By.CSS_SELECTOR, 'time')
-                    tweet_link_element = time_element.find_element(By.XPATH, '..')
-                    tweet_url = tweet_link_element.get_attribute('href')
-                    
-                    # 如果是相对链接，转换为绝对链接
-                    if tweet_url and not tweet_url.startswith('http'):
-                        tweet_url = f"https://twitter.com{tweet_url}"
-                except:
-                    tweet_url = None
-                
-                # 获取推文ID（用于去重）
-                try:
-                    tweet_id = first_tweet.get_attribute('data-testid')
-                    if not tweet_id:
-                        # 使用文本的哈希值作为ID
-                        import hashlib
-                        tweet_id = hashlib.md5(tweet_text.encode()).hexdigest()
-                except:
-                    import hashlib
-                    tweet_id = hashlib.md5(tweet_text.encode()).hexdigest()
-                
-                return {
-                    'id': tweet_id,
-                    'text': tweet_text,
-                    'url': tweet_url,
-                    'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
+            if self.capture_mode == 'network':
+                tweets = self._get_tweets_from_network(refresh)
+                if tweets:
+                    print(f"📊 本次获取推文WebDriver命令数: {self.command_count}（网络捕获）")
+                    return tweets
+                # 没有捕获到时间线接口响应，退回解析页面元素（页面已加载，无需再刷新）
+                print("⚠️ 未捕获到时间线接口响应，改为解析页面")
+                refresh = False
             
-            return None
+            self.stage_timings.pop('refresh', None)
+            
+            # 刷新页面以获取最新内容
+            if refresh:
+                with self._stage('refresh'):
+                    self.driver.refresh()
+            
+            # 等待第一条推文出现，再等时间线请求结束
+            with self._stage('first_tweet'):
+                WebDriverWait(self.driver, self.wait_timeouts['tweets']).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweet"]'))
+                )
+            with self._stage('network_idle'):
+                self._wait_for_network_idle()
+            
+            # 一次往返取回全部推文
+            extract_start = self.command_count
+            with self._stage('extract'):
+                raw_records = self.driver.execute_script(EXTRACT_TWEETS_SCRIPT)
+                tweets = normalize_tweet_records(raw_records)
+            print(f"📊 本次获取推文WebDriver命令数: {self.command_count}"
+                  f"（提取 {self.command_count - extract_start} 次）")
+            self._log_stage_timings('refresh', 'first_tweet', 'network_idle', 'extract')
+            self.last_full_refresh[self.current_handle] = time.time()
+            return tweets
             
         except TimeoutException:
+            failed = True
             print("⏱️ 获取推文超时")
-            return None
+            return []
         except Exception as e:
+            failed = True
             print(f"❌ 获取推文出错：{str(e)}")
-            return None
-    
-    def check_for_new_tweet(self) -> Optional[Dict[str, str]]:
-        """检查是否有新推文"""
-        latest_tweet = self.get_latest_tweet()
-        
-        if latest_tweet:
-            # 首次运行，记录当前最新推文
-            if self.last_tweet_id is None:
-                self.last_tweet_id = latest_tweet['id']
-                self.last_tweet_text = latest_tweet['text']
-                print(f"📝 记录初始推文: {latest_tweet['text'][:50]}...")
-                return None
+            return []
+        finally:
+            if self.block_resources and self.blocked_urls and not blocking:
+                self._restore_blocking()
+            if not failed:
+                self.last_successful_poll = time.time()
+                self._measure_transfer(page_load, blocking)
+            self.last_poll_command_count = self.command_count
+    
+    def _restore_blocking(self):
+        """测量基准的轮询结束后恢复资源屏蔽"""
+        try:
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_urls})
+        except Exception as e:
+            print(f"⚠️ 恢复资源屏蔽失败：{str(e)}")
+    
+    def _measure_transfer(self, page_load: bool, blocking: bool):
+        """
+        统计本次轮询传输的字节数（Network.loadingFinished 的 encodedDataLength 之和，跨域资源同样计入）
+        
+        Args:
+            page_load: 本次轮询是否整页加载（实时模式读取队列时为 False），只有整页加载计入屏蔽前后的对比
+            blocking: 本次轮询是否屏蔽了资源
+        """
+        try:
+            # 读取剩余的事件，字节数在 _read_network_events 中累加
+            self._read_network_events()
+        except Exception:
+            return
+        self.last_poll_bytes, self.pending_bytes = self.pending_bytes, 0
+        blocked_requests, self.pending_blocked = self.pending_blocked, 0
+        self.total_bytes += self.last_poll_bytes
+        
+        if blocking:
+            mode = f"屏蔽 {blocked_requests} 个请求"
+        elif self.block_resources and self.blocked_urls:
+            mode = "未屏蔽资源，测量基准"
+        else:
+            mode = "未屏蔽资源"
+        print(f"📶 本次轮询传输: {self.last_poll_bytes / 1024:.1f} KB"
+              f"（累计 {self.total_bytes / 1024 / 1024:.2f} MB，{mode}）")
+        
+        if not page_load:
+            return
+        stats = self.page_load_transfer[blocking]
+        stats[0] += self.last_poll_bytes
+        stats[1] += 1
+        
+        blocked_bytes, blocked_loads = self.page_load_transfer[True]
+        baseline_bytes, baseline_loads = self.page_load_transfer[False]
+        if blocked_loads and baseline_loads:
+            with_blocking = blocked_bytes / blocked_loads
+            without_blocking = baseline_bytes / baseline_loads
+            saved = (1 - with_blocking / without_blocking) * 100 if without_blocking else 0
+            print(f"📶 整页加载平均传输: 屏蔽后 {with_blocking / 1024:.1f} KB，"
+                  f"不屏蔽 {without_blocking / 1024:.1f} KB（节省 {saved:.0f}%）")
+    
+    def _drain_live_queue(self) -> List[Dict[str, Any]]:
+        """
+        取出页面内 MutationObserver 收集的新推文
+        
+        队列为空时在页面内最多等待 live_wait 秒，有推文插入就立即返回，
+        检测延迟取决于Twitter推送更新的速度而不是轮询间隔。
+        """
+        with self._stage('live_wait'):
+            raw_records = self.driver.execute_async_script(DRAIN_LIVE_QUEUE_SCRIPT, int(self.live_wait * 1000))
+        tweets = normalize_tweet_records(raw_records)
+        if tweets:
+            print(f"📡 实时队列收到 {len(tweets)} 条推文（等待 {self.stage_timings['live_wait']:.2f}s）")
+        return tweets
+    
+    def _read_network_events(self) -> List[Dict[str, Any]]:
+        """读取并清空性能日志中的CDP事件"""
+        events = []
+        for entry in self.driver.get_log('performance'):
+            try:
+                event = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            # 读取的同时统计传输字节数，事件只能读取一次，网络捕获读过的事件也要计入
+            params = event.get('params', {})
+            if event.get('method') == 'Network.loadingFinished':
+                self.pending_bytes += int(params.get('encodedDataLength') or 0)
+            elif event.get('method') == 'Network.loadingFailed' and params.get('blockedReason'):
+                self.pending_blocked += 1
+            events.append(event)
+        return events
+    
+    def _capture_timeline_response(self, timeout: float = 10) -> Optional[Dict[str, Any]]:
+        """
+        等待时间线接口（GraphQL UserTweets）的响应并读取其JSON正文
+        
+        Args:
+            timeout: 最长等待时间（秒）
+        
+        Returns:
+            接口返回的JSON对象，超时返回 None
+        """
+        deadline = time.time() + timeout
+        request_ids = set()
+        
+        while time.time() < deadline:
+            for event in self._read_network_events():
+                method = event.get('method')
+                params = event.get('params', {})
+                
+                if method == 'Network.responseReceived':
+                    path = params.get('response', {}).get('url', '').split('?')[0]
+                    if any(path.endswith(f'/{operation}') for operation in TIMELINE_OPERATIONS):
+                        request_ids.add(params.get('requestId'))
+                
+                # 响应正文只有在加载完成后才能读取
+                elif method == 'Network.loadingFinished' and params.get('requestId') in request_ids:
+                    response = self.driver.execute_cdp_cmd('Network.getResponseBody', {
+                        'requestId': params['requestId']
+                    })
+                    body = response.get('body', '')
+                    if response.get('base64Encoded'):
+                        body = base64.b64decode(body).decode('utf-8')
+                    return json.loads(body)
             
-            # 检查是否是新推文
-            if latest_tweet['id'] != self.last_tweet_id or latest_tweet['text'] != self.last_tweet_text:
-                self.last_tweet_id = latest_tweet['id']
-                self.last_tweet_text = latest_tweet['text']
-                print(f"🆕 发现新推文: {latest_tweet['text'][:50]}...")
-                return latest_tweet
+            time.sleep(0.2)
         
         return None
     
-    def start_monitoring(self, username: str, check_interval: int = 60, callback=None):
+    def _get_tweets_from_network(self, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        刷新页面并从时间线接口的JSON响应中解析推文，不等待页面渲染
+        
+        Args:
+            refresh: 是否先刷新页面；刚导航到用户主页时直接读取导航产生的响应
+        """
+        with self._stage('refresh'):
+            if refresh:
+                # 丢弃上次轮询之后积累的事件
+                self._read_network_events()
+                self.driver.refresh()
+        
+        with self._stage('capture'):
+            payload = self._capture_timeline_response(self.wait_timeouts['tweets'])
+        self._log_stage_timings('refresh', 'capture')
+        return parse_timeline_response(payload) if payload else []
+    
+    def get_latest_tweet(self, refresh: bool = True) -> Optional[Dict[str, str]]:
+        """
+        获取最新的推文
+        
+        Args:
+            refresh: 是否先刷新页面（刚导航到用户主页时无需再次刷新）
+        """
+        tweets = self.get_visible_tweets(refresh)
+        return tweets[0] if tweets else None
+    
+    def select_account(self, username: str) -> TweetTracker:
+        """切换到某个账户的去重状态（首次使用时创建，并从持久化存储恢复）"""
+        username = username.lstrip('@')
+        if username not in self.trackers:
+            self.trackers[username] = TweetTracker(username, self.seen_capacity, self.tweet_store)
+        self.tracker = self.trackers[username]
+        self.tracker.load()
+        return self.tracker
+    
+    def release_account(self, username: str):
+        """丢弃某个账户的去重状态（账户交给其他节点后调用，重新接手时从持久化存储恢复）"""
+        tracker = self.trackers.pop(username.lstrip('@'), None)
+        if tracker is not None and tracker is self.tracker:
+            self.tracker = None
+    
+    def check_for_new_tweets(self, refresh: bool = True) -> List[Dict[str, Any]]:
+        """
+        检查时间线上所有新推文
+        
+        将整页可见推文与已见ID集合比对，两次检查之间发布的多条推文都会被发现，
+        置顶推文也不会挡住后面的新推文。
+        
+        Args:
+            refresh: 是否先刷新页面
+        
+        Returns:
+            按发布时间从旧到新排列的新推文列表
+        """
+        if self.tracker is None:
+            self.tracker = TweetTracker(None, self.seen_capacity)
+        return self.tracker.diff(self.get_visible_tweets(refresh))
+    
+    def check_for_new_tweet(self, refresh: bool = True) -> Optional[Dict[str, Any]]:
+        """检查是否有新推文，只返回其中最新的一条（兼容旧接口）"""
+        new_tweets = self.check_for_new_tweets(refresh)
+        return new_tweets[-1] if new_tweets else None
+    
+    def start_monitoring(self, username: str, check_interval: int = 60, callback=None,
+                         scheduler: Optional[PollScheduler] = None):
         """
         开始监听指定用户
         
         Args:
-            username: Twitter用户名
+            username: Twitter用户名，或 list:<列表ID> 监听整个列表，或 search:<查询语句> 监听最新搜索结果
             check_interval: 检查间隔（秒）
-            callback: 发现新推文时的回调函数
+            callback: 发现新推文时的回调函数，签名为 callback(username, tweet)，列表和搜索模式下 username 为推文作者
+            scheduler: 自适应调度器（可选），提供时按账户发推规律决定检查间隔
         """
         self.monitoring = True
         
@@ -285,25 +769,341 @@ class TwitterMonitor:
                 print("❌ 登录失败，停止监听")
                 return
             
-            # 访问用户页面
-            if not self.navigate_to_user(username):
+            # 访问用户页面（或列表时间线）
+            if not self.navigate_to_target(username):
                 print("❌ 无法访问用户页面，停止监听")
                 return
             
+            # 恢复上次运行时的去重状态
+            self.select_account(username)
+            
+            # 实时模式：读取队列时在页面内阻塞等待，代替固定间隔的休眠
+            live = self.capture_mode == 'live'
+            if live:
+                self.live_wait = check_interval
+                self.script_timeout = (scheduler.max_interval if scheduler else check_interval) + 10
+                self.driver.set_script_timeout(self.script_timeout)
+                print(f"📡 实时模式：每 {self.live_refresh_interval} 秒整页刷新一次作为兜底")
+            
             print(f"🔍 开始监听 @{username}，检查间隔：{check_interval}秒")
+            self._start_watchdog()
             
             # 监听循环
             while self.monitoring:
                 try:
-                    new_tweet = self.check_for_new_tweet()
+                    with self._poll_deadline():
+                        # 浏览器重建后重新打开用户主页
+                        if self.recycle_driver_if_needed() and not self.navigate_to_target(username):
+                            raise Exception(f"重建浏览器后无法访问 @{username} 的主页")
+                        new_tweets = self.check_for_new_tweets()
+                    
+                    if callback:
+                        for new_tweet in new_tweets:
+                            callback(notification_username(username, new_tweet), new_tweet)
                     
-                    if new_tweet and callback:
-                        callback(username, new_tweet)
+                    wait = check_interval
+                    if scheduler:
+                        wait = scheduler.record_poll(username.lstrip('@'), self.tracker.last_tweets)
                     
                     # 等待下次检查
-                    print(f"⏰ 等待 {check_interval} 秒后进行下次检查...")
+                    if live:
+                        self.live_wait = wait
+                    else:
+                        print(f"⏰ 等待 {wait:.0f} 秒后进行下次检查...")
+                        time.sleep(wait)
+                    
+                except KeyboardInterrupt:
+                    print("\n⏹️ 用户中断监听")
+                    break
+                except Exception as e:
+                    print(f"❌ 监听过程出错：{str(e)}")
+                    print(f"🔄 {check_interval} 秒后重试...")
                     time.sleep(check_interval)
                     
+        finally:
+            self.stop_monitoring()
+    
+    def start_monitoring_list(self, list_ref: str, check_interval: int = 60, callback=None,
+                              scheduler: Optional[PollScheduler] = None):
+        """
+        列表模式：监听一个Twitter列表，每次检查只加载一个页面即可覆盖列表中的全部成员
+        
+        Args:
+            list_ref: 列表ID或列表链接（如 https://x.com/i/lists/123）
+            check_interval: 检查间隔（秒）
+            callback: 发现新推文时的回调函数，签名为 callback(username, tweet)，username 为推文作者
+            scheduler: 自适应调度器（可选）
+        """
+        target = list_target(list_ref)
+        if not target:
+            print(f"❌ 无法识别的列表：{list_ref}")
+            return
+        self.start_monitoring(target, check_interval, callback, scheduler)
+    
+    def _driver_processes(self) -> List[psutil.Process]:
+        """ChromeDriver进程及其全部子进程（浏览器、渲染进程等）"""
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            return [root] + root.children(recursive=True)
+        except Exception:
+            return []
+    
+    def get_chrome_memory_mb(self) -> float:
+        """
+        统计ChromeDriver及其全部子进程占用的内存（MB）
+        
+        各进程的RSS都包含共享页，直接相加会重复计算；优先使用 PSS（共享页按进程数分摊，Linux），
+        其次使用 USS（进程独占的内存），无法读取时退回RSS。
+        """
+        total = 0
+        for process in self._driver_processes():
+            try:
+                try:
+                    info = process.memory_full_info()
+                    total += getattr(info, 'pss', info.uss)
+                except psutil.AccessDenied:
+                    total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total / 1024 / 1024
+    
+    def recycle_driver_if_needed(self) -> bool:
+        """
+        每次检查前调用：Chrome内存超过上限或检查次数达到设定值时重建浏览器
+        
+        去重状态保存在 TweetTracker 中，不受影响；会话cookie会带到新浏览器中。
+        上次重建失败（没有可用的浏览器）时也会再次尝试。
+        重建后至少检查 memory_recycle_min_polls 次才再检查内存，避免每次检查都重建、重新登录。
+        
+        Returns:
+            是否重建了浏览器（调用方需要重新打开用户主页）
+        """
+        reason = None
+        if self.driver is None:
+            reason = "上次重建浏览器失败"
+        elif self.driver_wedged:
+            reason = "浏览器无响应已被看门狗关闭"
+        elif self.recycle_after_polls and self.polls_since_recycle >= self.recycle_after_polls:
+            reason = f"已检查 {self.polls_since_recycle} 次"
+        elif self.max_memory_mb and self.polls_since_recycle >= self.memory_recycle_min_polls:
+            self.last_memory_mb = self.get_chrome_memory_mb()
+            if self.last_memory_mb > self.max_memory_mb:
+                reason = f"Chrome内存 {self.last_memory_mb:.0f}MB 超过上限 {self.max_memory_mb:.0f}MB"
+        
+        if reason:
+            print(f"♻️ {reason}，重建浏览器...")
+            self._recycle_driver()
+        
+        self.polls_since_recycle += 1
+        return reason is not None
+    
+    def _recycle_driver(self):
+        """关闭并重新创建浏览器，保留去重状态和会话cookie"""
+        if self.driver:
+            try:
+                self.session_cookies = self.driver.get_cookies()
+            except Exception:
+                pass
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        
+        self.tab_accounts = {}
+        self.last_full_refresh = {}
+        self.current_handle = None
+        self.polls_since_recycle = 0
+        self.driver_wedged = False
+        
+        self.setup_driver()
+        if not self.login_with_token():
+            # 下次检查时再次重建
+            self.driver.quit()
+            self.driver = None
+            raise Exception("重建浏览器后登录失败")
+        self.recycle_count += 1
+        print(f"✅ 浏览器已重建（第 {self.recycle_count} 次）")
+    
+    @contextmanager
+    def _poll_deadline(self):
+        """标记一次检查的开始和结束，供看门狗判断浏览器是否卡住"""
+        self.poll_started_at = time.time()
+        try:
+            yield
+        finally:
+            self.poll_started_at = None
+    
+    def _start_watchdog(self):
+        """启动看门狗线程（已在运行时不重复启动）"""
+        if self.watchdog_thread and self.watchdog_thread.is_alive():
+            return
+        self.watchdog_thread = threading.Thread(target=self._watchdog_loop, daemon=True)
+        self.watchdog_thread.start()
+    
+    def _watchdog_loop(self):
+        """
+        单次检查超过期限仍未完成时强制结束Chrome进程树
+        
+        卡在 refresh/find_elements 中的WebDriver调用会因连接断开而立即失败，
+        监听线程随后在 recycle_driver_if_needed 中重建浏览器。
+        实时模式下读取队列本身会阻塞 live_wait 秒，期限相应延长。
+        """
+        while self.monitoring:
+            started = self.poll_started_at
+            deadline = self.wait_timeouts['poll'] + self.live_wait
+            if started and not self.driver_wedged and time.time() - started > deadline:
+                print(f"🐕 单次检查超过 {deadline:.0f} 秒未完成，强制关闭无响应的浏览器")
+                self.driver_wedged = True
+                for process in reversed(self._driver_processes()):
+                    try:
+                        process.kill()
+                    except (psutil.NoSuchProcess, psutil.AccessDenied):
+                        pass
+            time.sleep(1)
+    
+    def _open_tab_pool(self, size: int) -> List[str]:
+        """
+        打开固定大小的标签页池
+        
+        Args:
+            size: 标签页数量（至少为1，复用当前窗口作为第一个标签页）
+        
+        Returns:
+            窗口句柄列表
+        """
+        handles = [self.driver.current_window_handle]
+        while len(handles) < size:
+            self.driver.switch_to.new_window('tab')
+            self._configure_tab()
+            handles.append(self.driver.current_window_handle)
+        
+        self.tab_accounts = {handle: None for handle in handles}
+        print(f"🗂️ 已打开 {len(handles)} 个标签页")
+        return handles
+    
+    def _check_account_in_tab(self, handle: str, username: str) -> List[Dict[str, Any]]:
+        """
+        在指定标签页中检查某个账户的新推文
+        
+        标签页已加载该账户时只刷新；否则先导航过去（导航本身已加载最新内容，无需再刷新）。
+        每个账户的去重状态单独保存在各自的 TweetTracker 中。
+        """
+        self.driver.switch_to.window(handle)
+        self.current_handle = handle
+        
+        refresh = True
+        if self.tab_accounts.get(handle) != username:
+            if not self.navigate_to_target(username):
+                self.tab_accounts[handle] = None
+                return []
+            self.tab_accounts[handle] = username
+            refresh = False
+        
+        self.select_account(username)
+        return self.check_for_new_tweets(refresh)
+    
+    def prepare(self, usernames: List[str], max_tabs: int = 4) -> List[str]:
+        """
+        为多账户监听做准备：启动浏览器、登录、打开标签页池并启动看门狗
+        
+        Args:
+            usernames: Twitter用户名列表
+            max_tabs: 标签页池大小上限
+        
+        Returns:
+            去重后的用户名列表；登录失败时为空列表
+        """
+        usernames = [u.strip().lstrip('@') for u in usernames if u and u.strip()]
+        # 去重并保持顺序
+        usernames = list(dict.fromkeys(usernames))
+        if not usernames:
+            print("❌ 未指定要监听的用户")
+            return []
+        
+        self.monitoring = True
+        
+        # 设置驱动
+        if not self.driver:
+            self.setup_driver()
+        
+        # 登录
+        if not self.login_with_token():
+            print("❌ 登录失败，停止监听")
+            return []
+        
+        self.pool_usernames = usernames
+        self.pool_handles = self._open_tab_pool(max(1, min(max_tabs, len(usernames))))
+        # 多个目标时阻塞读取一个标签页的队列会推迟其他目标的检查，只在单目标时使用
+        self.live_blocking = self.capture_mode == 'live' and len(usernames) == 1
+        if self.live_blocking:
+            print(f"📡 实时模式：每 {self.live_refresh_interval} 秒整页刷新一次作为兜底")
+        self._start_watchdog()
+        return usernames
+    
+    def poll_account(self, username: str, live_wait: float = 0) -> List[Dict[str, Any]]:
+        """
+        在标签页池中检查一个账户（需先调用 prepare）
+        
+        Args:
+            username: Twitter用户名
+            live_wait: 单目标实时模式（live_blocking）下读取队列最多阻塞的秒数，通常为距下次检查的间隔
+        
+        Returns:
+            按发布时间从旧到新排列的新推文列表
+        """
+        self.live_wait = live_wait if self.live_blocking else 0
+        with self._poll_deadline():
+            # 浏览器重建后标签页池需要重新打开
+            if self.recycle_driver_if_needed():
+                self.pool_handles = self._open_tab_pool(len(self.pool_handles))
+            # 异步脚本的超时需要覆盖读取队列的等待时间
+            if self.live_wait + 10 > self.script_timeout:
+                self.script_timeout = self.live_wait + 10
+                self.driver.set_script_timeout(self.script_timeout)
+            handle = self.pool_handles[self.pool_usernames.index(username) % len(self.pool_handles)]
+            return self._check_account_in_tab(handle, username)
+    
+    def start_monitoring_many(self, usernames: List[str], check_interval: int = 60, callback=None,
+                              max_tabs: int = 4, scheduler: Optional[PollScheduler] = None):
+        """
+        在同一个浏览器中监听多个用户
+        
+        只登录一次，打开最多 max_tabs 个标签页并在其间轮转检查各账户。
+        账户数不超过标签页数时每个账户独占一个标签页，只需刷新；
+        否则标签页按轮转顺序重新导航，内存占用随标签页数而非账户数增长。
+        
+        Args:
+            usernames: Twitter用户名列表
+            check_interval: 每轮检查之间的间隔（秒）
+            callback: 发现新推文时的回调函数，签名为 callback(username, tweet)
+            max_tabs: 标签页池大小上限
+            scheduler: 自适应调度器（可选），提供时按各账户的发推规律安排检查顺序和间隔
+        """
+        try:
+            usernames = self.prepare(usernames, max_tabs)
+            if not usernames:
+                return
+            
+            print(f"🔍 开始监听 {len(usernames)} 个账户（{len(self.pool_handles)} 个标签页），检查间隔：{check_interval}秒")
+            
+            # 监听循环
+            sequence = poll_sequence(usernames, check_interval, scheduler)
+            while self.monitoring:
+                try:
+                    for username in sequence:
+                        if not self.monitoring:
+                            break
+                        
+                        new_tweets = self.poll_account(username)
+                        
+                        if callback:
+                            for new_tweet in new_tweets:
+                                callback(notification_username(username, new_tweet), new_tweet)
+                        
+                        if scheduler:
+                            scheduler.record_poll(username, self.tracker.last_tweets)
+                    
                 except KeyboardInterrupt:
                     print("\n⏹️ 用户中断监听")
                     break
@@ -325,3 +1125,9 @@ class TwitterMonitor:
             except:
                 pass
             self.driver = None
+        self.tab_accounts = {}
+        self.pool_handles = []
+        self.last_full_refresh = {}
+        self.current_handle = None
+        if self.tweet_store:
+            self.tweet_store.close()